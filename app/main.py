@@ -1,17 +1,26 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from binance.client import Client
-import pandas as pd
 import numpy as np
-from typing import Optional
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # binance.client ağır bir import ve kurulurken borsaya ping atar; modül yüklenirken değil açılışta yapılır
+    from binance.client import Client
+    app.state.client = Client(os.getenv('BINANCE_TEST_API_KEY'), os.getenv('BINANCE_TEST_API_SECRET'), testnet=True)
+    yield
+    app.state.client.close_connection()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,59 +31,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Binance client
-api_key = os.getenv('BINANCE_TEST_API_KEY')
-api_secret = os.getenv('BINANCE_TEST_API_SECRET')
-client = Client(api_key, api_secret, testnet=True)
+MAX_KLINES_PER_REQUEST = 1000
+ATR_PERIOD = 14
 
-def calculate_atr(high, low, close, period=14):
-    tr1 = pd.DataFrame(high - low)
-    tr2 = pd.DataFrame(abs(high - close.shift()))
-    tr3 = pd.DataFrame(abs(low - close.shift()))
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
+
+def calculate_atr(high, low, close, period=ATR_PERIOD):
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    # fmax NaN'ları atlar; ilk mumda TR = high - low olur
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = np.full(len(tr), np.nan)
+    if len(tr) >= period:
+        atr[period - 1:] = np.lib.stride_tricks.sliding_window_view(tr, period).mean(axis=1)
     return atr
 
+def fetch_klines(client, symbol, interval, limit):
+    # Binance tek istekte en fazla 1000 mum döndürür; geriye doğru sayfala
+    klines = []
+    end_time = None
+    while len(klines) < limit:
+        params = {"symbol": symbol, "interval": interval, "limit": min(MAX_KLINES_PER_REQUEST, limit - len(klines))}
+        if end_time is not None:
+            params["endTime"] = end_time
+        page = client.get_klines(**params)
+        if not page:
+            break
+        klines = page + klines
+        end_time = page[0][0] - 1
+        if len(page) < params["limit"]:
+            break
+    return klines
+
 @app.get("/api/v1/atr-analysis")
-async def get_atr_analysis(symbol: str, interval: str = "1h"):
+async def get_atr_analysis(symbol: str, interval: str = "1h",
+                           limit: int = Query(100, ge=ATR_PERIOD + 1, le=10000)):
     try:
-        # Get klines data from Binance
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=100)
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 
-                                         'close_time', 'quote_asset_volume', 'number_of_trades',
-                                         'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'])
+        # Get klines data from Binance; sayfalı senkron istekler event loop'u bloklamasın
+        klines = await run_in_threadpool(fetch_klines, app.state.client, symbol, interval, limit)
+        if len(klines) < ATR_PERIOD:
+            raise HTTPException(status_code=422,
+                                detail=f"Not enough klines for ATR({ATR_PERIOD}): {len(klines)}")
         
-        # Convert price columns to float
-        for col in ['open', 'high', 'low', 'close']:
-            df[col] = df[col].astype(float)
+        # Sadece gereken kolonları sayısal dizilere çevir
+        raw = np.array(klines, dtype=object)
+        times = raw[:, 0].astype(np.int64)
+        ohlcv = raw[:, 1:6].astype(np.float64)
+        open_, high, low, close, volume = ohlcv.T
         
         # Calculate ATR
-        atr = calculate_atr(df['high'], df['low'], df['close'])
-        current_atr = atr.iloc[-1]
+        atr = calculate_atr(high, low, close)
+        current_atr = float(atr[-1])
         
-        # Generate signals based on ATR
-        signals = []
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1] + current_atr:
-                signals.append({
-                    'time': df['timestamp'].iloc[i],
-                    'type': 'buy',
-                    'price': df['close'].iloc[i]
-                })
-            elif df['close'].iloc[i] < df['close'].iloc[i-1] - current_atr:
-                signals.append({
-                    'time': df['timestamp'].iloc[i],
-                    'type': 'sell',
-                    'price': df['close'].iloc[i]
-                })
+        # Generate signals based on ATR (dizi karşılaştırmaları ile)
+        buy = close[1:] > close[:-1] + current_atr
+        sell = close[1:] < close[:-1] - current_atr
+        signal_index = np.flatnonzero(buy | sell) + 1
+        signals = [
+            {'time': time, 'type': 'buy' if is_buy else 'sell', 'price': price}
+            for time, is_buy, price in zip(
+                times[signal_index].tolist(),
+                buy[signal_index - 1].tolist(),
+                close[signal_index].tolist()
+            )
+        ]
         
         return {
-            "klines": klines,
+            "candles": {
+                "time": times.tolist(),
+                "open": open_.tolist(),
+                "high": high.tolist(),
+                "low": low.tolist(),
+                "close": close.tolist(),
+                "volume": volume.tolist()
+            },
             "atr": current_atr,
             "signals": signals
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
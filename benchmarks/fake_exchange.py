@@ -0,0 +1,243 @@
+"""UMFutures REST yüzeyini taklit eden, gecikmesi ayarlanabilir yerel borsa sunucusu"""
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+
+# Yol -> (sembollü ağırlık, sembolsüz ağırlık); gerçek borsanın X-MBX-USED-WEIGHT-1M sayımına yakın
+WEIGHTS = {
+    "/fapi/v1/premiumIndex": (1, 10),
+    "/fapi/v1/openOrders": (1, 40),
+    "/fapi/v1/batchOrders": (5, 5),
+    "/fapi/v3/account": (5, 5),
+    "/fapi/v3/balance": (5, 5),
+    "/fapi/v3/positionRisk": (5, 5),
+}
+
+
+def request_weight(path: str, params: Dict) -> int:
+    if path == "/fapi/v1/klines":
+        limit = int(params.get("limit", 500))
+        return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+    with_symbol, without_symbol = WEIGHTS.get(path, (1, 1))
+    return with_symbol if "symbol" in params else without_symbol
+
+
+def synthetic_kline(symbol: str, interval: str, open_time: int) -> List:
+    """Aynı (sembol, aralık, zaman) için her zaman aynı mumu üretir"""
+    interval_ms = INTERVAL_MS[interval]
+    rng = random.Random(f"{symbol}:{interval}:{open_time}")
+    base = 100 + 20 * math.sin(open_time / interval_ms / 50)
+    open_ = base + rng.uniform(-1, 1)
+    close = base + rng.uniform(-1, 1)
+    high = max(open_, close) + rng.uniform(0, 1)
+    low = min(open_, close) - rng.uniform(0, 1)
+    return [open_time, f"{open_:.2f}", f"{high:.2f}", f"{low:.2f}", f"{close:.2f}", "100.0",
+            open_time + interval_ms - 1, "10000.0", 100, "50.0", "5000.0", "0"]
+
+
+class FakeExchange:
+    """Sembol listesi, gecikme ve sayaçları tutan sahte borsa durumu"""
+
+    def __init__(self, symbols: Optional[List[str]] = None, latency: float = 0.0,
+                 path_latency: Optional[Dict[str, float]] = None):
+        self.symbols = symbols or ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        self.latency = latency
+        self.path_latency = path_latency or {}
+        self.requests: Dict[str, int] = {}
+        self.order_id = 0
+        # Dakika başında sıfırlanan, istemciye X-MBX-USED-WEIGHT-1M olarak bildirilen ağırlık
+        self.used_weight = 0
+        self._weight_minute = 0
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_weight(self, weight: int) -> int:
+        """Ağırlığı içinde bulunulan dakikaya ekler, dakikanın toplamını döndürür"""
+        minute = int(time.time() // 60)
+        with self.lock:
+            if minute != self._weight_minute:
+                self._weight_minute = minute
+                self.used_weight = 0
+            self.used_weight += weight
+            return self.used_weight
+
+    def mark_price(self, symbol: str) -> float:
+        interval_ms = INTERVAL_MS["1m"]
+        now = int(time.time() * 1000) // interval_ms * interval_ms
+        return float(synthetic_kline(symbol, "1m", now)[4])
+
+    def klines(self, params: Dict) -> List[List]:
+        symbol = params["symbol"]
+        interval = params["interval"]
+        interval_ms = INTERVAL_MS[interval]
+        limit = min(int(params.get("limit", 500)), 1500)
+        now_open = int(time.time() * 1000) // interval_ms * interval_ms
+        if "startTime" in params:
+            start = -(-int(params["startTime"]) // interval_ms) * interval_ms
+        else:
+            end = int(params.get("endTime", now_open))
+            start = min(end // interval_ms * interval_ms, now_open) - (limit - 1) * interval_ms
+        if "endTime" in params:
+            now_open = min(now_open, int(params["endTime"]) // interval_ms * interval_ms)
+        return [synthetic_kline(symbol, interval, t)
+                for t in range(start, now_open + 1, interval_ms)][:limit]
+
+    def exchange_info(self) -> Dict:
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [],
+            "symbols": [
+                {
+                    "symbol": symbol,
+                    "status": "TRADING",
+                    "filters": [
+                        {"filterType": "PRICE_FILTER", "minPrice": "0.10", "maxPrice": "1000000", "tickSize": "0.10"},
+                        {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+                        {"filterType": "MARKET_LOT_SIZE", "minQty": "0.001", "maxQty": "120", "stepSize": "0.001"},
+                        {"filterType": "MIN_NOTIONAL", "notional": "5"},
+                    ],
+                }
+                for symbol in self.symbols
+            ],
+        }
+
+    def new_order(self, params: Dict) -> Dict:
+        with self.lock:
+            self.order_id += 1
+            order_id = self.order_id
+        price = self.mark_price(params.get("symbol", self.symbols[0]))
+        filled = params.get("type") == "MARKET"
+        return {
+            "orderId": order_id,
+            "symbol": params.get("symbol"),
+            "status": "FILLED" if filled else "NEW",
+            "side": params.get("side"),
+            "type": params.get("type"),
+            "origQty": params.get("quantity", "0"),
+            "executedQty": params.get("quantity", "0") if filled else "0",
+            "avgPrice": f"{price:.2f}" if filled else "0",
+            "stopPrice": params.get("stopPrice", "0"),
+            "updateTime": int(time.time() * 1000),
+        }
+
+    def route(self, method: str, path: str, params: Dict):
+        if path == "/fapi/v1/klines":
+            return self.klines(params)
+        if path == "/fapi/v1/premiumIndex":
+            if "symbol" in params:
+                return {"symbol": params["symbol"], "markPrice": f"{self.mark_price(params['symbol']):.2f}",
+                        "time": int(time.time() * 1000)}
+            return [{"symbol": s, "markPrice": f"{self.mark_price(s):.2f}"} for s in self.symbols]
+        if path == "/fapi/v1/exchangeInfo":
+            return self.exchange_info()
+        if path == "/fapi/v1/time":
+            return {"serverTime": int(time.time() * 1000)}
+        if path == "/fapi/v3/balance":
+            return [{"asset": "USDT", "balance": "10000.0", "availableBalance": "10000.0"}]
+        if path == "/fapi/v3/account":
+            return {"totalWalletBalance": "10000.0", "availableBalance": "10000.0",
+                    "assets": [{"asset": "USDT", "walletBalance": "10000.0"}], "positions": []}
+        if path == "/fapi/v3/positionRisk":
+            symbol = params.get("symbol", self.symbols[0])
+            return [{"symbol": symbol, "positionAmt": "0", "entryPrice": "0", "positionSide": "BOTH"}]
+        if path == "/fapi/v1/order" and method == "POST":
+            return self.new_order(params)
+        if path == "/fapi/v1/batchOrders" and method == "POST":
+            return [self.new_order(order) for order in json.loads(params["batchOrders"])]
+        if path == "/fapi/v1/openOrders":
+            return []
+        if path == "/fapi/v1/listenKey":
+            return {"listenKey": "fake-listen-key"}
+        return {"code": 200, "msg": "success"}
+
+
+def _make_handler(exchange: FakeExchange):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Başlık ve gövde ayrı yazıldığı için Nagle + gecikmeli ACK 40 ms ekler
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _handle(self, method: str):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                params.update({key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()})
+
+            with exchange.lock:
+                exchange.requests[url.path] = exchange.requests.get(url.path, 0) + 1
+            used_weight = exchange.add_weight(request_weight(url.path, params))
+            delay = exchange.path_latency.get(url.path, exchange.latency)
+            if delay:
+                time.sleep(delay)
+
+            body = json.dumps(exchange.route(method, url.path, params)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-MBX-USED-WEIGHT-1M", str(used_weight))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_PUT(self):
+            self._handle("PUT")
+
+        def do_DELETE(self):
+            self._handle("DELETE")
+
+    return Handler
+
+
+def start_fake_exchange(exchange: Optional[FakeExchange] = None, host: str = "127.0.0.1",
+                        port: int = 0) -> FakeExchange:
+    """Sunucuyu arka plan thread'inde başlatır"""
+    exchange = exchange or FakeExchange()
+    exchange.server = ThreadingHTTPServer((host, port), _make_handler(exchange))
+    exchange.server.daemon_threads = True
+    threading.Thread(target=exchange.server.serve_forever, daemon=True).start()
+    return exchange
+
+
+def stop_fake_exchange(exchange: FakeExchange):
+    if exchange.server is not None:
+        exchange.server.shutdown()
+        exchange.server.server_close()
+        exchange.server = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local UMFutures stand-in")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = start_fake_exchange(FakeExchange(latency=args.latency), port=args.port)
+    print(f"Fake exchange listening on {fake.base_url}")
+    threading.Event().wait()
@@ -0,0 +1,271 @@
+"""Gösterge matematiği ve FastAPI uç noktaları için tekrarlanabilir benchmark paketi
+
+Kullanım:
+    python -m benchmarks.run_benchmarks --latency 0.005 --concurrency 16 --duration 5
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<önceki>.json
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_exchange import FakeExchange, start_fake_exchange, stop_fake_exchange  # noqa: E402
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Saniye cinsinden örnekleri mikro saniyelik özet istatistiğe çevirir"""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_us": sum(ordered) / len(ordered) * 1e6,
+        "p50_us": percentile(ordered, 50) * 1e6,
+        "p99_us": percentile(ordered, 99) * 1e6,
+        "min_us": ordered[0] * 1e6,
+    }
+
+
+def microbench(fn: Callable, repeat: int, warmup: int = 5) -> Dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def async_microbench(fn: Callable, repeat: int, warmup: int = 5) -> Dict:
+    async def run():
+        for _ in range(warmup):
+            await fn()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return summarize(asyncio.run(run()))
+
+
+def run_micro(exchange: FakeExchange, repeat: int) -> Dict:
+    import numpy as np
+    from src.app.services.atr_calculator import calculate_atr, get_atr_signals
+    from src.app.services.atr_engine import ATREngine, StreamingATR
+    from src.app.services.atr_scanner import compute_atr_matrix
+    from src.app.services.client_pool import client_pool
+    from src.app.services.trading_bot import TradingBot
+
+    client = client_pool.default()
+    klines_100 = exchange.klines({"symbol": "BTCUSDT", "interval": "1h", "limit": 100})
+    klines_1000 = exchange.klines({"symbol": "BTCUSDT", "interval": "1h", "limit": 1000})
+
+    state = StreamingATR(14)
+    counter = iter(range(10 ** 12))
+    engine = ATREngine()
+    engine.ingest_klines("BTCUSDT", "1h", klines_100)
+
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(0, 1, (200, 100)).cumsum(axis=1)
+    high = close + rng.uniform(0, 1, close.shape)
+    low = close - rng.uniform(0, 1, close.shape)
+
+    bot = TradingBot("BTCUSDT", client=client)
+
+    return {
+        "calculate_atr[100]": microbench(lambda: calculate_atr(klines_100), repeat),
+        "calculate_atr[1000]": microbench(lambda: calculate_atr(klines_1000), max(repeat // 5, 10)),
+        "streaming_atr.update": microbench(lambda: state.update(next(counter), 101.0, 99.0, 100.0), repeat * 10),
+        "atr_engine.ingest_klines[100, no new bars]": microbench(
+            lambda: engine.ingest_klines("BTCUSDT", "1h", klines_100), repeat),
+        "compute_atr_matrix[200x100]": microbench(lambda: compute_atr_matrix(high, low, close), repeat),
+        "get_atr_signals": microbench(lambda: get_atr_signals("BTCUSDT", "1h", client=client), repeat),
+        "trading_bot.calculate_position_size": async_microbench(bot.calculate_position_size, repeat),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api_server(port: int):
+    import uvicorn
+    from src.app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    return server, thread
+
+
+def load_test(port: int, method: str, path: str, body: Optional[Dict], concurrency: int,
+              duration: float) -> Dict:
+    """Her işçi kendi keep-alive bağlantısıyla süre boyunca istek atar"""
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload is not None else {}
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(value for values, _ in results for value in values)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+    }
+
+
+ENDPOINTS = [
+    ("GET", "/api/v1/test-market-data?symbol=BTCUSDT", None),
+    ("GET", "/api/v1/atr-analysis?symbol=BTCUSDT&interval=1h", None),
+    ("POST", "/api/v1/atr-scan", {"symbols": ["BTCUSDT", "ETHUSDT", "SOLUSDT"], "intervals": ["1h", "4h"]}),
+    ("GET", "/api/v1/positions?symbol=BTCUSDT", None),
+    ("GET", "/api/v1/test-balance", None),
+    ("POST", "/api/v1/market-order?symbol=BTCUSDT&side=BUY&quantity=0.001", None),
+]
+
+
+def run_endpoints(concurrency: int, duration: float) -> Dict:
+    from src.app.services.rate_limiter import request_scheduler
+
+    port = _free_port()
+    server, thread = start_api_server(port)
+    results = {}
+    try:
+        for method, path, body in ENDPOINTS:
+            # Önceki uç noktanın harcadığı ağırlık sonraki ölçümü bekletmesin
+            request_scheduler.reset()
+            results[f"{method} {path}"] = load_test(port, method, path, body, concurrency, duration)
+        return results
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict, baseline: Dict):
+    """Aynı anahtarlı ölçümleri önceki sonuçla oran olarak yazdırır"""
+    for section, key in (("micro", "p50_us"), ("endpoints", "p50_ms"), ("endpoints", "throughput_rps")):
+        for name, values in current.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if previous and previous.get(key):
+                print(f"{section:9} {key:15} {values[key] / previous[key]:6.2f}x  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.002, help="fake exchange latency per request (s)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--binance-limits", action="store_true",
+                        help="keep the real weight/order limits; the fake exchange enforces none, so by default "
+                             "they are raised to keep the rate limiter out of the latency numbers")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="previous results file")
+    args = parser.parse_args()
+
+    # Depo ve log dosyaları geçici dizine yazılır; uygulama modülleri bu ayarlarla yüklenir
+    workdir = tempfile.mkdtemp(prefix="trading-bot-bench-")
+    output = os.path.abspath(args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results", f"{git_commit() or 'local'}.json"))
+    os.chdir(workdir)
+    exchange = start_fake_exchange(FakeExchange(latency=args.latency))
+    os.environ["BINANCE_FUTURES_BASE_URL"] = exchange.base_url
+    os.environ["BINANCE_TEST_API_KEY"] = "bench-key"
+    os.environ["BINANCE_TEST_API_SECRET"] = "bench-secret"
+    os.environ["KLINE_STORE_DIR"] = os.path.join(workdir, "klines")
+    if not args.binance_limits:
+        for name in ("EXCHANGE_WEIGHT_LIMIT", "EXCHANGE_ORDER_LIMIT_10S", "EXCHANGE_ORDER_LIMIT_1M"):
+            os.environ[name] = "1000000"
+    os.environ.pop("STREAM_SYMBOLS", None)
+    logging.getLogger("trading_bot").setLevel(logging.WARNING)
+
+    try:
+        results = {
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+            "micro": run_micro(exchange, args.repeat),
+        }
+        if not args.skip_endpoints:
+            results["endpoints"] = run_endpoints(args.concurrency, args.duration)
+        results["exchange_requests"] = dict(exchange.requests)
+    finally:
+        stop_fake_exchange(exchange)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({k: results[k] for k in ("micro", "endpoints") if k in results}, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""API sürecinin soğuk açılışında modül başına import süresi dökümü
+
+Temiz bir yorumlayıcıda `python -X importtime` ile uygulamayı import eder ve çıktıyı
+paket ve modül bazında özetler.
+
+Kullanım:
+    python -m benchmarks.startup_report --top 20
+    python -m benchmarks.startup_report --module app.main --json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       412 |       1893 |   numpy.core"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure_imports(module: str) -> List[Dict]:
+    """Her import edilen modül için öz ve kümülatif süreyi (ms) ve iç içelik derinliğini döndürür"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2,
+            })
+    return modules
+
+
+def summarize(modules: List[Dict], top: int) -> Dict:
+    by_package: Dict[str, float] = defaultdict(float)
+    for entry in modules:
+        by_package[entry["module"].split(".")[0]] += entry["self_ms"]
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": round(sum(entry["self_ms"] for entry in modules), 1),
+        "module_count": len(modules),
+        "packages": [{"package": name, "self_ms": round(ms, 1)} for name, ms in packages[:top]],
+        "modules": sorted(modules, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top],
+    }
+
+
+def print_report(module: str, summary: Dict):
+    print(f"import {module}: {summary['total_ms']:.1f} ms, {summary['module_count']} modules")
+    print("\nBy package (self time)")
+    for entry in summary["packages"]:
+        print(f"  {entry['self_ms']:9.1f} ms  {entry['package']}")
+    print("\nSlowest modules (cumulative time)")
+    for entry in summary["modules"]:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['self_ms']:8.1f} ms self  {entry['module']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.app.main", help="module to import")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = summarize(measure_imports(args.module), args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(args.module, summary)
+
+
+if __name__ == "__main__":
+    main()
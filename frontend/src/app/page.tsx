@@ -19,18 +19,19 @@ export default function Home() {
         const response = await axios.get(`/api/v1/atr-analysis?symbol=${symbol}&interval=1h`)
         console.log('API Response:', response.data)
         
-        if (!response.data.klines || !Array.isArray(response.data.klines)) {
-          console.error('Invalid klines data:', response.data.klines)
+        const candles = response.data.candles
+        if (!candles || !Array.isArray(candles.time)) {
+          console.error('Invalid candle data:', candles)
           return
         }
 
-        // Mum verilerini formatla
-        const formattedData = response.data.klines.map((k: any) => ({
-          time: k[0],
-          open: parseFloat(k[1]),
-          high: parseFloat(k[2]),
-          low: parseFloat(k[3]),
-          close: parseFloat(k[4]),
+        // Kolon bazlı mum verilerini formatla
+        const formattedData = candles.time.map((time: number, i: number) => ({
+          time,
+          open: candles.open[i],
+          high: candles.high[i],
+          low: candles.low[i],
+          close: candles.close[i],
           atr: response.data.atr
         }))
         console.log('Formatted candle data:', formattedData)
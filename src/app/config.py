@@ -0,0 +1,152 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+TESTNET_BASE_URL = "https://testnet.binancefuture.com"
+STREAM_BASE_URL = "wss://stream.binancefuture.com"
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """.env ve ortam değişkenlerinden süreç başında bir kez okunan ayarlar"""
+
+    # Borsa bağlantısı
+    api_key: Optional[str]
+    api_secret: Optional[str]
+    futures_base_url: str
+    exchange_pool_max_clients: int
+    exchange_pool_max_connections: int
+    exchange_timeout: float
+    execution_backend: str
+    exchange_weight_limit: int
+    exchange_order_limit_10s: int
+    exchange_order_limit_1m: int
+    rate_market_share: float
+    rate_diagnostic_share: float
+    rate_burst: float
+    rate_max_wait: float
+
+    # Thread ve süreç havuzları
+    order_executor_workers: int
+    order_call_timeout: float
+    market_executor_workers: int
+    market_call_timeout: float
+    backtest_workers: int
+
+    # Piyasa ve kullanıcı veri akışları
+    stream_symbols: List[str]
+    stream_intervals: List[str]
+    market_stream_url: str
+    market_cache_max_age: float
+    user_stream_enabled: bool
+    user_stream_url: str
+    listen_key_keepalive: float
+    account_reconcile_interval: float
+
+    # Önbellekler ve depolar
+    symbol_metadata_ttl: float
+    symbol_metadata_min_refresh: float
+    kline_store_dir: str
+    analysis_price_ttl: float
+    resample_enabled: bool
+    resample_base_max_age: float
+    history_dir: str
+    history_workers: int
+
+    # Zamanlayıcı
+    scheduler_max_concurrency: int
+    scheduler_close_delay: float
+
+    # Anlık bildirimler (WebSocket/SSE)
+    push_queue_size: int
+    push_refresh_interval: float
+    push_heartbeat_interval: float
+    push_max_topics: int
+
+    # Kağıt hesap
+    paper_balance: float
+    paper_fee_rate: float
+    paper_leverage: int
+
+    # Loglama
+    log_format: str
+    log_queue_size: int
+    log_max_bytes: int
+    log_retention_days: int
+    log_batch_size: int
+    log_flush_interval: float
+
+    # Açılış
+    startup_warmup_timeout: float
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        load_dotenv()
+        env = os.getenv
+        market_stream_url = env("MARKET_STREAM_URL", STREAM_BASE_URL)
+        return cls(
+            api_key=env("BINANCE_TEST_API_KEY"),
+            api_secret=env("BINANCE_TEST_API_SECRET"),
+            futures_base_url=env("BINANCE_FUTURES_BASE_URL", TESTNET_BASE_URL),
+            exchange_pool_max_clients=int(env("EXCHANGE_POOL_MAX_CLIENTS", "8")),
+            exchange_pool_max_connections=int(env("EXCHANGE_POOL_MAX_CONNECTIONS", "10")),
+            exchange_timeout=float(env("EXCHANGE_TIMEOUT", "10")),
+            execution_backend=env("EXECUTION_BACKEND", "exchange").lower(),
+            exchange_weight_limit=int(env("EXCHANGE_WEIGHT_LIMIT", "2400")),
+            exchange_order_limit_10s=int(env("EXCHANGE_ORDER_LIMIT_10S", "300")),
+            exchange_order_limit_1m=int(env("EXCHANGE_ORDER_LIMIT_1M", "1200")),
+            rate_market_share=float(env("RATE_MARKET_SHARE", "0.85")),
+            rate_diagnostic_share=float(env("RATE_DIAGNOSTIC_SHARE", "0.6")),
+            rate_burst=float(env("RATE_BURST", "0.5")),
+            rate_max_wait=float(env("RATE_MAX_WAIT", "5")),
+            order_executor_workers=int(env("ORDER_EXECUTOR_WORKERS", "4")),
+            order_call_timeout=float(env("ORDER_CALL_TIMEOUT", "15")),
+            market_executor_workers=int(env("MARKET_EXECUTOR_WORKERS", "16")),
+            market_call_timeout=float(env("MARKET_CALL_TIMEOUT", "15")),
+            backtest_workers=int(env("BACKTEST_WORKERS", str(os.cpu_count() or 1))),
+            stream_symbols=_csv(env("STREAM_SYMBOLS", "")),
+            stream_intervals=_csv(env("STREAM_INTERVALS", "1h")),
+            market_stream_url=market_stream_url,
+            market_cache_max_age=float(env("MARKET_CACHE_MAX_AGE", "5")),
+            user_stream_enabled=_flag(env("USER_STREAM_ENABLED", "false")),
+            user_stream_url=env("USER_STREAM_URL", market_stream_url),
+            listen_key_keepalive=float(env("LISTEN_KEY_KEEPALIVE", "1800")),
+            account_reconcile_interval=float(env("ACCOUNT_RECONCILE_INTERVAL", "300")),
+            symbol_metadata_ttl=float(env("SYMBOL_METADATA_TTL", "3600")),
+            symbol_metadata_min_refresh=float(env("SYMBOL_METADATA_MIN_REFRESH", "60")),
+            kline_store_dir=env("KLINE_STORE_DIR", os.path.join("data", "klines")),
+            analysis_price_ttl=float(env("ANALYSIS_PRICE_TTL", "2")),
+            resample_enabled=_flag(env("RESAMPLE_FROM_1M", "true")),
+            resample_base_max_age=float(env("RESAMPLE_BASE_MAX_AGE", "1")),
+            history_dir=env("HISTORY_DIR", os.path.join("data", "history")),
+            history_workers=int(env("HISTORY_WORKERS", "4")),
+            scheduler_max_concurrency=int(env("SCHEDULER_MAX_CONCURRENCY", "16")),
+            scheduler_close_delay=float(env("SCHEDULER_CLOSE_DELAY", "1.0")),
+            push_queue_size=int(env("PUSH_QUEUE_SIZE", "64")),
+            push_refresh_interval=float(env("PUSH_REFRESH_INTERVAL", "5")),
+            push_heartbeat_interval=float(env("PUSH_HEARTBEAT_INTERVAL", "15")),
+            push_max_topics=int(env("PUSH_MAX_TOPICS", "256")),
+            paper_balance=float(env("PAPER_BALANCE", "10000")),
+            paper_fee_rate=float(env("PAPER_FEE_RATE", "0.0004")),
+            paper_leverage=int(env("PAPER_LEVERAGE", "20")),
+            log_format=env("LOG_FORMAT", "text").lower(),
+            log_queue_size=int(env("LOG_QUEUE_SIZE", "100000")),
+            log_max_bytes=int(env("LOG_MAX_BYTES", str(100 * 1024 * 1024))),
+            log_retention_days=int(env("LOG_RETENTION_DAYS", "0")),
+            log_batch_size=int(env("LOG_BATCH_SIZE", "256")),
+            log_flush_interval=float(env("LOG_FLUSH_INTERVAL", "0.5")),
+            startup_warmup_timeout=float(env("STARTUP_WARMUP_TIMEOUT", "10")),
+        )
+
+
+settings = Settings.from_env()
@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING, Any
+
+from ..config import settings
+from ..services.client_pool import client_pool
+from ..services.paper_exchange import paper_exchange
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures as ExchangeClient
+else:
+    # FastAPI imzaları çalışma anında değerlendirir; SDK yalnızca ilk istemciyle yüklenir
+    ExchangeClient = Any
+
+
+def get_client() -> "ExchangeClient":
+    """Router'lar için paylaşılan exchange istemcisi"""
+    # "paper": emirler yerel eşleştirme motorunda, piyasa verisi test ağından
+    if settings.execution_backend == "paper":
+        return paper_exchange(market_data=client_pool.default())
+    return client_pool.default()
@@ -1,12 +1,138 @@
+# Import süresi ölçülebilsin diye ilk sırada
+from .utils.startup import startup_report
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import trading
-import os
-from dotenv import load_dotenv
+from .config import settings
+from .routers import stream, trading
+from .services.client_pool import client_pool
+from .services.executor import market_executor, order_executor
+from .services.symbol_metadata import symbol_metadata
+from .services.market_stream import create_market_stream, market_cache
+from .services.kline_store import kline_store
+from .services.resampler import resampler
+from .services.backtest import shutdown_process_pool
+from .services.strategy_scheduler import strategy_scheduler
+from .services.account_state import create_user_stream
+from .services.response_cache import analysis_cache
+from .services.metrics import MetricsMiddleware, registry
+from .services.rate_limiter import request_scheduler
+from .services.push_hub import push_hub
+from .services.history_downloader import history_downloader
+from .utils.logger import logger, queue_handler
 
-load_dotenv()
+startup_report.record("import", time.time() - startup_report.started_at)
 
-app = FastAPI()
+
+def persist_closed_kline(symbol: str, interval: str, kline: dict):
+    kline_store.append_stream_kline(symbol, interval, kline)
+    # 1m mumu depoya yazıldıktan sonra türetilmiş aralıklar ilerletilir
+    resampler.on_base_kline(symbol, interval, kline)
+
+
+def store_closed_kline(symbol: str, interval: str, kline: dict):
+    # Disk yazımı ve seri kilidi event loop'u bekletmesin
+    asyncio.ensure_future(market_executor.run(persist_closed_kline, symbol, interval, kline))
+
+
+async def _warm_up_step(name: str, fn):
+    started = time.perf_counter()
+    try:
+        await market_executor.run(fn)
+    except Exception as e:
+        startup_report.record(name, time.perf_counter() - started, error=str(e))
+        logger.warning("Startup warm-up step %s failed: %s", name, e)
+    else:
+        startup_report.record(name, time.perf_counter() - started)
+
+
+async def warm_up():
+    """İstemci bağlantısı ve sembol filtreleri ilk istekten önce, birbirini beklemeden hazırlanır
+
+    Hatalar açılışı durdurmaz; ilgili servis ilk kullanımda yeniden dener.
+    """
+    started = time.perf_counter()
+    steps = asyncio.gather(
+        # SDK importu, bağlantı havuzu ve TLS el sıkışması
+        _warm_up_step("exchange_client", lambda: client_pool.default().time()),
+        _warm_up_step("symbol_metadata", lambda: symbol_metadata.refresh(client_pool.default())),
+    )
+    try:
+        await asyncio.wait_for(steps, timeout=settings.startup_warmup_timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Startup warm-up did not finish within %ss", settings.startup_warmup_timeout)
+    startup_report.record("warm_up", time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up()
+    # Sembol filtreleri arka planda tazelenir; pozisyon hesabı sadece sözlükten okur
+    metadata_task = asyncio.create_task(symbol_metadata.refresh_forever(client_pool.default))
+    # Akış yapılandırıldıysa fiyatlar ve kapanan mumlar WebSocket'ten gelir
+    app.state.market_stream = create_market_stream()
+    if app.state.market_stream is not None:
+        market_cache.add_kline_listener(store_closed_kline)
+        app.state.market_stream.start()
+    # Bakiye, pozisyon ve açık emirler kullanıcı veri akışından bellekte tutulur
+    app.state.user_stream = create_user_stream(client_pool.default)
+    if app.state.user_stream is not None:
+        app.state.user_stream.start()
+    startup_report.mark_ready()
+    report = startup_report.as_dict()
+    logger.info("Startup finished in %ss: %s", report["total_seconds"],
+                {name: phase["seconds"] for name, phase in report["phases"].items()})
+    yield
+    await push_hub.stop()
+    await strategy_scheduler.stop()
+    if app.state.user_stream is not None:
+        await app.state.user_stream.stop()
+    if app.state.market_stream is not None:
+        await app.state.market_stream.stop()
+    metadata_task.cancel()
+    # Kapanışta thread havuzlarını ve keep-alive bağlantılarını serbest bırak
+    order_executor.shutdown()
+    market_executor.shutdown()
+    history_downloader.shutdown()
+    shutdown_process_pool()
+    client_pool.close()
+
+
+def runtime_metrics():
+    connections = client_pool.connection_stats()
+    yield ("exchange_connections_opened_total", "counter", "HTTP connections opened to the exchange",
+           [({}, connections["opened"])])
+    yield ("exchange_connections_reused_total", "counter", "Exchange requests served on a kept-alive connection",
+           [({}, connections["reused"])])
+    cache = analysis_cache.stats()
+    yield ("analysis_cache_requests_total", "counter", "ATR analysis cache lookups by outcome",
+           [({"outcome": outcome}, cache[outcome]) for outcome in ("hits", "misses", "coalesced", "errors")])
+    limits = request_scheduler.status()
+    yield ("exchange_weight_used", "gauge", "Request weight used in the current minute",
+           [({}, limits["used_weight"])])
+    yield ("exchange_weight_headroom", "gauge", "Request weight left in the current minute",
+           [({}, limits["headroom"])])
+    yield ("exchange_requests_queued", "gauge", "Exchange requests waiting for rate-limit budget",
+           [({"priority": priority}, count) for priority, count in limits["queued"].items()])
+    push = push_hub.status()
+    yield ("push_connections", "gauge", "Open WebSocket/SSE push connections",
+           [({}, push["connections"])])
+    yield ("push_topics", "gauge", "Push topics with at least one subscriber",
+           [({}, len(push["topics"]))])
+    yield ("push_messages_dropped_total", "counter", "Push messages dropped for slow subscribers",
+           [({}, push["dropped"])])
+    yield ("log_records_dropped_total", "counter", "Log records dropped because the log queue was full",
+           [({}, queue_handler.dropped)])
+
+
+registry.register_collector(runtime_metrics)
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,7 +143,66 @@ app.add_middleware(
 )
 
 app.include_router(trading.router, prefix="/api/v1")
+app.include_router(stream.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
-    return {"message": "Trading Bot API"} 
\ No newline at end of file
+    return {"message": "Trading Bot API"} 
+
+@app.get("/connection-stats")
+async def connection_stats():
+    return {
+        "status": "success",
+        "connections": client_pool.connection_stats()
+    }
+
+@app.get("/rate-limits")
+async def rate_limits():
+    return {
+        "status": "success",
+        "limits": request_scheduler.status()
+    }
+
+@app.get("/market-stream")
+async def market_stream_status():
+    stream = app.state.market_stream
+    return {
+        "status": "success",
+        "enabled": stream is not None,
+        "stream": stream.status() if stream is not None else None
+    }
+
+@app.get("/account-stream")
+async def account_stream_status():
+    stream = app.state.user_stream
+    return {
+        "status": "success",
+        "enabled": stream is not None,
+        "stream": stream.status() if stream is not None else None
+    }
+
+@app.get("/push-stats")
+async def push_stats():
+    return {
+        "status": "success",
+        "push": push_hub.status()
+    }
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return {
+        "status": "success",
+        "analysis": analysis_cache.stats(),
+        "resampler": resampler.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/startup-report")
+async def startup_report_status():
+    return {
+        "status": "success",
+        "startup": startup_report.as_dict()
+    }
@@ -17,13 +17,14 @@ export default function Home() {
         // ATR analizi ve sinyalleri al
         const response = await axios.get(`/api/v1/atr-analysis?symbol=${symbol}&interval=1h`)
         
-        // Mum verilerini formatla
-        const formattedData = response.data.klines.map((k: any) => ({
-          time: new Date(k[0]).toISOString(),
-          open: parseFloat(k[1]),
-          high: parseFloat(k[2]),
-          low: parseFloat(k[3]),
-          close: parseFloat(k[4]),
+        // Kolon bazlı mum verilerini formatla
+        const candles = response.data.candles
+        const formattedData = candles.time.map((time: number, i: number) => ({
+          time: new Date(time).toISOString(),
+          open: candles.open[i],
+          high: candles.high[i],
+          low: candles.low[i],
+          close: candles.close[i],
           atr: response.data.atr
         }))
 
@@ -0,0 +1,104 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..dependencies.exchange import ExchangeClient, get_client
+from ..services.push_hub import Subscriber, push_hub, topic_name
+from ..utils.json_response import encode_json
+from ..utils.logger import logger
+
+
+router = APIRouter()
+
+
+def _subscribe(subscriber: Subscriber, topics: List[str], client: ExchangeClient) -> List[str]:
+    """Konulardan biri geçersizse bu istekte eklenenler geri alınır"""
+    names, added = [], []
+    try:
+        for topic in topics:
+            if not isinstance(topic, str):
+                raise ValueError(f"Invalid topic: {topic!r}")
+            known = topic_name(topic) in subscriber.topics
+            names.append(push_hub.subscribe(subscriber, topic, client))
+            if not known:
+                added.append(names[-1])
+    except ValueError:
+        for name in added:
+            push_hub.unsubscribe(subscriber, name)
+        raise
+    return names
+
+
+# EventSource ile dinlenir: /api/v1/stream/events?topics=atr:BTCUSDT:1h&topics=positions:BTCUSDT
+@router.get("/stream/events")
+async def stream_events(topics: List[str] = Query(..., min_length=1),
+                        client: ExchangeClient = Depends(get_client)):
+    subscriber = push_hub.connect()
+    try:
+        _subscribe(subscriber, topics, client)
+    except ValueError as e:
+        push_hub.disconnect(subscriber)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            # Bağlantı koparsa tarayıcı 3 saniye sonra yeniden bağlanır ve anlık görüntüyü alır
+            yield "retry: 3000\n\n"
+            while True:
+                message = await subscriber.get(timeout=settings.push_heartbeat_interval)
+                yield ": keepalive\n\n" if message is None else f"data: {message}\n\n"
+        finally:
+            push_hub.disconnect(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# İstemci {"action": "subscribe" | "unsubscribe", "topics": [...]} gönderir
+@router.websocket("/stream/ws")
+async def stream_socket(websocket: WebSocket, client: ExchangeClient = Depends(get_client)):
+    await websocket.accept()
+    subscriber = push_hub.connect()
+
+    async def send_messages():
+        while True:
+            message = await subscriber.get(timeout=settings.push_heartbeat_interval)
+            await websocket.send_text('{"type":"heartbeat"}' if message is None else message)
+
+    def reply(message: dict):
+        subscriber.put(encode_json(message), control=True)
+
+    sender = asyncio.create_task(send_messages())
+    try:
+        initial = websocket.query_params.getlist("topics")
+        if initial:
+            try:
+                reply({"type": "subscribed", "topics": _subscribe(subscriber, initial, client)})
+            except ValueError as e:
+                reply({"type": "error", "message": str(e)})
+        while True:
+            request = await websocket.receive_json()
+            action = request.get("action") if isinstance(request, dict) else None
+            topics = request.get("topics") if isinstance(request, dict) else None
+            if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+                reply({"type": "error", "message": "Expected {\"action\": \"subscribe\"|\"unsubscribe\", \"topics\": [...]}"})
+                continue
+            try:
+                if action == "subscribe":
+                    reply({"type": "subscribed", "topics": _subscribe(subscriber, topics, client)})
+                else:
+                    for topic in topics:
+                        push_hub.unsubscribe(subscriber, topic)
+                    reply({"type": "unsubscribed", "topics": topics})
+            except ValueError as e:
+                reply({"type": "error", "message": str(e)})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Stream socket error: %s", e)
+    finally:
+        sender.cancel()
+        push_hub.disconnect(subscriber)
@@ -1,41 +1,59 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict
-from ..services.atr_calculator import calculate_atr, get_atr_signals
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Optional
+from ..services.atr_calculator import get_atr_signals, get_atr_signals_cached
 from ..services.trading_bot import TradingBot
-from binance.um_futures import UMFutures
-import os
-from dotenv import load_dotenv
+from ..services.atr_engine import atr_engine
+from ..services.resampler import resampler
+from ..services.atr_scanner import scan_atr
+from ..services.indicators import IndicatorPipeline
+from ..services.entry_filter import EntryFilter
+from ..services.executor import market_executor, order_executor
+from ..services.market_stream import get_mark_price, market_cache
+from ..schemas.atr import ATRScanRequest, HistoryDownloadRequest, IndicatorRequest
+from ..schemas.backtest import BacktestRequest
+from ..schemas.orders import BulkCancelRequest, BulkOrderRequest
+from ..services.order_batcher import cancel_orders, place_orders, submit_order
+from ..schemas.scheduler import SchedulerStartRequest, SchedulerStopRequest
+from ..services.strategy_scheduler import strategy_scheduler
+from ..services.account_state import get_account, get_positions as get_account_positions
+from ..services.backtest import run_backtest_async
+from ..services.history_downloader import history_downloader, parse_date
+from ..services.log_query import LogLevel, log_paths, query_logs, tail_lines
+from ..services.rate_limiter import DIAGNOSTIC, exchange_priority
+from ..dependencies.exchange import ExchangeClient, get_client
+from ..utils.json_response import NumpyJSONResponse
 from ..utils.logger import logger  # Logger'ı import et
 from datetime import datetime
 
-load_dotenv()
 
 router = APIRouter()
 
 @router.post("/start-trading")
-async def start_trading(symbol: str, atr_multiplier: float = 2.5) -> Dict:
+async def start_trading(symbol: str, atr_multiplier: float = 2.5,
+                        client: ExchangeClient = Depends(get_client)) -> Dict:
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        # Son fiyat verilerini al
-        klines = client.get_klines(
-            symbol=symbol,
-            interval=Client.KLINE_INTERVAL_1HOUR,
-            limit=100
+        # Son fiyat verilerini yerel depodan al, eksik mumları tamamla
+        closed, forming = await market_executor.run(
+            resampler.sync, client, symbol, "1h", 100,
+            live_kline=market_cache.get_kline(symbol, "1h")
         )
         
         # ATR hesapla
-        atr = calculate_atr(klines)
+        atr = atr_engine.ingest(
+            symbol, "1h",
+            open_time=closed['open_time'],
+            high=closed['high'],
+            low=closed['low'],
+            close=closed['close'],
+            forming_high=float(forming[2]),
+            forming_low=float(forming[3])
+        )['atr']
         
         # Trading bot başlat
-        bot = TradingBot(symbol, atr_multiplier)
-        current_price = float(client.get_symbol_ticker(symbol=symbol)['price'])
+        bot = TradingBot(symbol, atr_multiplier, client=client)
+        current_price = await get_mark_price(client, symbol)
         
-        result = await bot.execute_strategy(current_price, atr)
+        result = await bot.check_and_enter_position(current_price, atr)
         
         return {
             "status": "success",
@@ -48,16 +66,11 @@ async def start_trading(symbol: str, atr_multiplier: float = 2.5) -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/test-balance")
-async def test_balance():
+async def test_balance(client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
         # Futures hesap bilgilerini al
-        account = client.account()
+        with exchange_priority(DIAGNOSTIC):
+            account = await get_account(client)
         
         return {
             "status": "success",
@@ -68,38 +81,27 @@ async def test_balance():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/test-market-data")
-async def test_market_data(symbol: str = "BTCUSDT"):
+async def test_market_data(symbol: str = "BTCUSDT", client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
         # Futures fiyat bilgisini al
-        ticker = client.mark_price(symbol)
+        with exchange_priority(DIAGNOSTIC):
+            price = await get_mark_price(client, symbol)
         
         return {
             "status": "success",
             "message": "Test market data retrieved",
-            "price": ticker['markPrice']
+            "price": price
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Mevcut pozisyonları kontrol et
 @router.get("/positions")
-async def get_positions(symbol: str = "BTCUSDT"):
+async def get_positions(symbol: str = "BTCUSDT", client: ExchangeClient = Depends(get_client)):
     try:
-        logger.info(f"Getting positions for {symbol}")
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        positions = client.get_position_risk(symbol=symbol)
-        logger.info(f"Positions retrieved: {positions}")
+        logger.info("Getting positions for %s", symbol)
+        positions = await get_account_positions(client, symbol)
+        logger.info("Positions retrieved for %s: %s", symbol, len(positions))
         
         return {
             "status": "success",
@@ -107,20 +109,16 @@ async def get_positions(symbol: str = "BTCUSDT"):
             "positions": positions
         }
     except Exception as e:
-        logger.error(f"Error getting positions: {str(e)}")
+        logger.error("Error getting positions: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Kaldıraç ayarla
 @router.post("/set-leverage")
-async def set_leverage(symbol: str = "BTCUSDT", leverage: int = 5):
+async def set_leverage(symbol: str = "BTCUSDT", leverage: int = 5,
+                       client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        response = client.change_leverage(
+        response = await order_executor.run(
+            client.change_leverage,
             symbol=symbol,
             leverage=leverage
         )
@@ -135,15 +133,11 @@ async def set_leverage(symbol: str = "BTCUSDT", leverage: int = 5):
 
 # Marjin tipi değiştir (ISOLATED veya CROSSED)
 @router.post("/change-margin-type")
-async def change_margin_type(symbol: str = "BTCUSDT", margin_type: str = "ISOLATED"):
+async def change_margin_type(symbol: str = "BTCUSDT", margin_type: str = "ISOLATED",
+                             client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        response = client.change_margin_type(
+        response = await order_executor.run(
+            client.change_margin_type,
             symbol=symbol,
             marginType=margin_type
         )
@@ -158,15 +152,9 @@ async def change_margin_type(symbol: str = "BTCUSDT", margin_type: str = "ISOLAT
 
 # Tüm açık emirleri iptal et
 @router.delete("/cancel-orders")
-async def cancel_all_orders(symbol: str = "BTCUSDT"):
+async def cancel_all_orders(symbol: str = "BTCUSDT", client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        response = client.cancel_open_orders(symbol=symbol)
+        response = await order_executor.run(client.cancel_open_orders, symbol=symbol)
         
         return {
             "status": "success",
@@ -181,23 +169,19 @@ async def cancel_all_orders(symbol: str = "BTCUSDT"):
 async def place_market_order(
     symbol: str = "BTCUSDT",
     side: str = "BUY",
-    quantity: float = 0.001
+    quantity: float = 0.001,
+    client: ExchangeClient = Depends(get_client)
 ):
     try:
-        logger.info(f"Placing market order: {side} {quantity} {symbol}")
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
-        order = client.new_order(
+        logger.info("Placing market order: %s %s %s", side, quantity, symbol)
+        order = await submit_order(
+            client,
             symbol=symbol,
             side=side,
             type="MARKET",
             quantity=quantity
         )
-        logger.info(f"Order placed successfully: {order}")
+        logger.info("Order placed successfully: %s %s", order.get("orderId"), order.get("status"))
         
         return {
             "status": "success",
@@ -205,7 +189,7 @@ async def place_market_order(
             "order": order
         }
     except Exception as e:
-        logger.error(f"Error placing market order: {str(e)}")
+        logger.error("Error placing market order: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Stop-limit emri ver
@@ -215,18 +199,13 @@ async def place_stop_limit_order(
     side: str = "SELL",
     quantity: float = 0.001,
     stop_price: float = None,
-    limit_price: float = None
+    limit_price: float = None,
+    client: ExchangeClient = Depends(get_client)
 ):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        
         # Eğer fiyatlar belirtilmemişse mevcut fiyattan hesapla
         if not stop_price or not limit_price:
-            current_price = float(client.mark_price(symbol)['markPrice'])
+            current_price = await get_mark_price(client, symbol)
             if side == "SELL":
                 stop_price = current_price * 0.99  # %1 altında
                 limit_price = stop_price * 0.99
@@ -234,7 +213,8 @@ async def place_stop_limit_order(
                 stop_price = current_price * 1.01  # %1 üstünde
                 limit_price = stop_price * 1.01
         
-        order = client.new_order(
+        order = await submit_order(
+            client,
             symbol=symbol,
             side=side,
             type="STOP",
@@ -252,94 +232,236 @@ async def place_stop_limit_order(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/logs")
-async def get_logs(lines: int = 100):
+# Birden çok sembolde tek çağrıyla emir ver
+@router.post("/bulk-orders")
+async def place_bulk_orders(request: BulkOrderRequest, client: ExchangeClient = Depends(get_client)):
     try:
-        log_directory = "logs"
-        today = datetime.now().strftime('%Y%m%d')
-        log_file = f"{log_directory}/trading_{today}.log"
+        logger.info("Placing %s bulk orders", len(request.orders))
+        results = await place_orders(client, [order.model_dump() for order in request.orders])
+        failed = sum(1 for result in results if "orderId" not in result)
         
-        if not os.path.exists(log_file):
+        return {
+            "status": "success" if not failed else "partial",
+            "placed": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+    except Exception as e:
+        logger.error("Bulk order error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Birden çok sembolde tek çağrıyla emir iptal et
+@router.delete("/bulk-orders")
+async def cancel_bulk_orders(request: BulkCancelRequest, client: ExchangeClient = Depends(get_client)):
+    try:
+        logger.info("Cancelling orders for %s", list(request.orders))
+        results = await cancel_orders(client, request.orders)
+        
+        return {
+            "status": "success",
+            "results": results
+        }
+    except Exception as e:
+        logger.error("Bulk cancel error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/logs")
+async def get_logs(
+    lines: int = 100,
+    day: Optional[str] = None,
+    level: Optional[LogLevel] = None,
+    symbol: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None
+):
+    try:
+        log_day = datetime.strptime(day, '%Y%m%d').date() if day else None
+        
+        # Filtre yoksa dosyanın sonundan geriye doğru sadece son n satır okunur
+        if not any([level, symbol, start, end, cursor]):
+            log_files = log_paths(log_day or datetime.now().date())
+            if not log_files:
+                return {
+                    "status": "error",
+                    "message": "No logs found for today" if not day else f"No logs found for {day}"
+                }
+            logs = await market_executor.run(tail_lines, log_files, lines)
             return {
-                "status": "error",
-                "message": "No logs found for today"
+                "status": "success",
+                "logs": logs
             }
-            
-        # Son n satır logu oku
-        with open(log_file, 'r') as f:
-            logs = f.readlines()[-lines:]
-            
+        
+        result = await market_executor.run(
+            query_logs, log_day, level, start, end, symbol, lines, cursor
+        )
         return {
             "status": "success",
-            "logs": logs
+            "logs": result["records"],
+            "next_cursor": result["next_cursor"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/error-logs")
-async def get_error_logs(lines: int = 100):
+async def get_error_logs(
+    lines: int = 100,
+    day: Optional[str] = None,
+    level: LogLevel = "ERROR",
+    symbol: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None
+):
     try:
-        log_directory = "logs"
-        today = datetime.now().strftime('%Y%m%d')
-        log_file = f"{log_directory}/trading_{today}.log"
+        log_day = datetime.strptime(day, '%Y%m%d').date() if day else None
         
-        if not os.path.exists(log_file):
-            return {
-                "status": "error",
-                "message": "No logs found for today"
-            }
-            
-        # Hata loglarını filtrele
-        with open(log_file, 'r') as f:
-            all_logs = f.readlines()
-            error_logs = [log for log in all_logs if "ERROR" in log][-lines:]
-            
+        # ERROR/WARNING kayıtları bayt ofset index'inden okunur
+        result = await market_executor.run(
+            query_logs, log_day, level, start, end, symbol, lines, cursor
+        )
         return {
             "status": "success",
-            "error_logs": error_logs
+            "error_logs": result["records"],
+            "next_cursor": result["next_cursor"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/atr-analysis")
+@router.get("/atr-analysis", response_class=NumpyJSONResponse)
 async def get_atr_analysis(
     symbol: str = "BTCUSDT",
     interval: str = "1h",
-    period: int = 14
+    period: int = 14,
+    client: ExchangeClient = Depends(get_client)
 ):
     try:
-        logger.info(f"Getting ATR analysis for {symbol}")
+        logger.info("Getting ATR analysis for %s", symbol)
         
-        result = get_atr_signals(symbol, interval, period)
+        # Aynı mum içindeki tekrar eden istekler önbellekten ya da süren hesaplamadan karşılanır
+        result = await get_atr_signals_cached(client, symbol, interval, period)
         
-        if result["status"] == "error":
-            logger.error(f"Error in ATR analysis: {result['message']}")
-            raise HTTPException(status_code=500, detail=result['message'])
-            
-        logger.info(f"ATR analysis completed: {result}")
-        return result
+        logger.info("ATR analysis completed for %s: %s (atr=%s)", symbol, result.get("status"), result.get("atr"))
+        return NumpyJSONResponse(result)
+        
+    except Exception as e:
+        logger.error("Error in ATR analysis: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/atr-scan", response_class=NumpyJSONResponse)
+async def scan_atr_analysis(request: ATRScanRequest, client: ExchangeClient = Depends(get_client)):
+    try:
+        logger.info("Scanning ATR for %s symbols on %s", len(request.symbols), request.intervals)
+        
+        results = await scan_atr(
+            client,
+            request.symbols,
+            request.intervals,
+            period=request.period,
+            limit=request.limit
+        )
+        
+        return NumpyJSONResponse({
+            "status": "success",
+            "count": len(results),
+            "errors": sum(1 for item in results if item["status"] == "error"),
+            "results": results
+        })
+    except Exception as e:
+        logger.error("Error in ATR scan: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Gösterge kümesi tek grafikte çözülür; ortak ara değerler bir kez hesaplanır
+@router.post("/indicators", response_class=NumpyJSONResponse)
+async def compute_indicators(request: IndicatorRequest, client: ExchangeClient = Depends(get_client)):
+    try:
+        pipeline = IndicatorPipeline(request.indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        closed, _ = await market_executor.run(
+            resampler.sync, client, request.symbol, request.interval, request.limit,
+            live_kline=market_cache.get_kline(request.symbol, request.interval)
+        )
         
+        return NumpyJSONResponse({
+            "status": "success",
+            "symbol": request.symbol,
+            "interval": request.interval,
+            "open_time": closed["open_time"],
+            "indicators": pipeline.evaluate(closed)
+        })
     except Exception as e:
-        logger.error(f"Error in ATR analysis: {str(e)}")
+        logger.error("Error computing indicators: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Uzun geçmişi arka planda parça parça indirir; yeniden çalıştırmada yalnızca eksikler çekilir
+@router.post("/history/download")
+async def start_history_download(request: HistoryDownloadRequest):
+    try:
+        started = history_downloader.start(
+            request.symbols, request.intervals, parse_date(request.start),
+            parse_date(request.end) if request.end else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not started:
+        raise HTTPException(status_code=409, detail="A history download is already running")
+    return {
+        "status": "success",
+        "message": "History download started",
+        "progress": history_downloader.status()
+    }
+
+@router.get("/history/download")
+async def history_download_status():
+    return {
+        "status": "success",
+        "progress": history_downloader.status()
+    }
+
+@router.post("/backtest", response_class=NumpyJSONResponse)
+async def backtest(request: BacktestRequest):
+    try:
+        logger.info("Running backtest for %s on %s", request.symbols, request.intervals)
+        
+        results = await run_backtest_async(
+            request.symbols,
+            request.intervals,
+            request.periods,
+            request.atr_multipliers,
+            fee_rate=request.fee_rate,
+            start_time=request.start_time,
+            end_time=request.end_time
+        )
+        
+        return NumpyJSONResponse({
+            "status": "success",
+            "count": len(results),
+            "results": results
+        })
+    except Exception as e:
+        logger.error("Backtest error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/auto-trade")
 async def start_auto_trading(
     symbol: str = "BTCUSDT",
     atr_multiplier: float = 2.5,
-    interval: str = "1h"
+    interval: str = "1h",
+    client: ExchangeClient = Depends(get_client)
 ):
     try:
-        logger.info(f"Starting auto trading for {symbol}")
+        logger.info("Starting auto trading for %s", symbol)
         
         # ATR hesapla
-        atr_data = get_atr_signals(symbol, interval)
+        atr_data = await market_executor.run(get_atr_signals, symbol, interval, client=client)
         
         if atr_data["status"] == "error":
             raise HTTPException(status_code=500, detail=atr_data["message"])
             
         # Trading bot başlat
-        bot = TradingBot(symbol, atr_multiplier)
+        bot = TradingBot(symbol, atr_multiplier, client=client)
         
         # Pozisyon kontrolü ve açma
         result = await bot.check_and_enter_position(
@@ -357,20 +479,64 @@ async def start_auto_trading(
         }
         
     except Exception as e:
-        logger.error(f"Auto trading error: {str(e)}")
+        logger.error("Auto trading error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/test-connection")
-async def test_connection():
+# Botları her mum kapanışında süreç içinde çalıştır
+@router.post("/scheduler/start")
+async def start_scheduler(request: SchedulerStartRequest, client: ExchangeClient = Depends(get_client)):
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
+        logger.info("Scheduling %s symbols on %s", len(request.symbols), request.intervals)
+        for interval in request.intervals:
+            for symbol in request.symbols:
+                strategy_scheduler.add(client, symbol, interval, request.atr_multiplier, request.period,
+                                       entry_filter=EntryFilter() if request.entry_filter else None)
         
+        return {
+            "status": "success",
+            "message": "Scheduler started",
+            "scheduler": strategy_scheduler.status()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Scheduler start error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/scheduler/stop")
+async def stop_scheduler(request: Optional[SchedulerStopRequest] = None):
+    try:
+        if request is None or (request.symbols is None and request.interval is None):
+            await strategy_scheduler.stop()
+            removed = None
+        else:
+            removed = 0
+            for symbol in request.symbols or [None]:
+                removed += await strategy_scheduler.remove(symbol, request.interval)
+        
+        return {
+            "status": "success",
+            "message": "Scheduler stopped",
+            "removed": removed,
+            "scheduler": strategy_scheduler.status()
+        }
+    except Exception as e:
+        logger.error("Scheduler stop error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scheduler/status")
+async def scheduler_status():
+    return {
+        "status": "success",
+        "scheduler": strategy_scheduler.status()
+    }
+
+@router.get("/test-connection")
+async def test_connection(client: ExchangeClient = Depends(get_client)):
+    try:
         # Test bağlantısı
-        time = client.time()
+        with exchange_priority(DIAGNOSTIC):
+            time = await market_executor.run(client.time)
         
         return {
             "status": "success",
@@ -378,5 +544,5 @@ async def test_connection():
             "server_time": time
         }
     except Exception as e:
-        logger.error(f"Connection test error: {str(e)}")
+        logger.error("Connection test error: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
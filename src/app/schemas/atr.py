@@ -0,0 +1,26 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ATRScanRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=500)
+    intervals: List[str] = Field(default_factory=lambda: ["1h"], min_length=1)
+    period: int = Field(14, ge=1)
+    limit: int = Field(100, ge=2, le=1500)
+
+
+class IndicatorRequest(BaseModel):
+    symbol: str = "BTCUSDT"
+    interval: str = "1h"
+    # "atr:14", "ema:50", "rsi:14", "bollinger:20:2", "keltner:20:2:10", "atr_percentile:14:100"
+    indicators: List[str] = Field(..., min_length=1, max_length=50)
+    limit: int = Field(200, ge=2, le=1500)
+
+
+class HistoryDownloadRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=500)
+    intervals: List[str] = Field(default_factory=lambda: ["1h"], min_length=1)
+    # "2021-01-01" ya da epoch ms (UTC); end boşsa şu ana kadar
+    start: str
+    end: Optional[str] = None
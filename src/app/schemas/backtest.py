@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BacktestRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1)
+    intervals: List[str] = Field(default_factory=lambda: ["1h"], min_length=1)
+    periods: List[int] = Field(default_factory=lambda: [14], min_length=1)
+    atr_multipliers: List[float] = Field(default_factory=lambda: [1.5, 2.0, 2.5, 3.0], min_length=1)
+    fee_rate: float = Field(0.0004, ge=0)
+    start_time: Optional[int] = None
+    end_time: Optional[int] = None
@@ -0,0 +1,23 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class OrderSpec(BaseModel):
+    symbol: str
+    side: str
+    type: str = "MARKET"
+    quantity: float = Field(..., gt=0)
+    price: Optional[float] = None
+    stopPrice: Optional[float] = None
+    reduceOnly: Optional[bool] = None
+    timeInForce: Optional[str] = None
+
+
+class BulkOrderRequest(BaseModel):
+    orders: List[OrderSpec] = Field(..., min_length=1, max_length=100)
+
+
+class BulkCancelRequest(BaseModel):
+    # Sembol -> emir kimlikleri; boş liste ya da null sembolün tüm açık emirlerini iptal eder
+    orders: Dict[str, Optional[List[int]]] = Field(..., min_length=1)
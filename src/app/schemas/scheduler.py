@@ -0,0 +1,18 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SchedulerStartRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=1000)
+    intervals: List[str] = Field(default_factory=lambda: ["1h"], min_length=1)
+    atr_multiplier: float = Field(2.5, gt=0)
+    period: int = Field(14, ge=1)
+    # Açıksa girişler EMA/RSI/Keltner/Bollinger ve ATR yüzdeliği koşullarından geçer
+    entry_filter: bool = False
+
+
+class SchedulerStopRequest(BaseModel):
+    # Boş bırakılırsa tüm botlar durdurulur
+    symbols: Optional[List[str]] = None
+    interval: Optional[str] = None
@@ -0,0 +1,417 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import websockets
+
+from ..config import STREAM_BASE_URL, settings
+from .executor import market_executor
+from .rate_limiter import DIAGNOSTIC, exchange_priority
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+OPEN_ORDER_STATUSES = ("NEW", "PARTIALLY_FILLED")
+MAX_CLOSED_ORDERS = 1000
+
+# /fapi/v3/positionRisk alanları; akışta ilk kez görülen pozisyon bu değerlerle başlar
+POSITION_DEFAULTS = {
+    "positionAmt": "0", "entryPrice": "0", "breakEvenPrice": "0", "markPrice": "0",
+    "unRealizedProfit": "0", "liquidationPrice": "0", "isolatedMargin": "0", "notional": "0",
+    "marginAsset": "USDT", "isolatedWallet": "0", "initialMargin": "0", "maintMargin": "0",
+    "positionInitialMargin": "0", "openOrderInitialMargin": "0", "adl": 0, "bidNotional": "0",
+    "askNotional": "0", "updateTime": 0,
+}
+# /fapi/v3/account varlık alanları
+ASSET_DEFAULTS = {
+    "walletBalance": "0", "unrealizedProfit": "0", "marginBalance": "0", "maintMargin": "0",
+    "initialMargin": "0", "positionInitialMargin": "0", "openOrderInitialMargin": "0",
+    "crossWalletBalance": "0", "crossUnPnl": "0", "availableBalance": "0", "maxWithdrawAmount": "0",
+    "updateTime": 0,
+}
+# /fapi/v3/account pozisyon alanı -> positionRisk alanı
+ACCOUNT_POSITION_FIELDS = {
+    "symbol": "symbol", "positionSide": "positionSide", "positionAmt": "positionAmt",
+    "unrealizedProfit": "unRealizedProfit", "isolatedMargin": "isolatedMargin", "notional": "notional",
+    "isolatedWallet": "isolatedWallet", "initialMargin": "initialMargin", "maintMargin": "maintMargin",
+    "updateTime": "updateTime",
+}
+
+
+class ListenKeyExpired(Exception):
+    pass
+
+
+class AccountState:
+    """Bakiye, pozisyon ve açık emirlerin bellekteki kopyası
+
+    REST ile bir kez doldurulur, kullanıcı veri akışı olaylarıyla artımlı güncellenir. Akış bağlı
+    değilken `live` False olur ve okuyan taraf REST'e düşer. Okumalar REST yanıtlarıyla aynı alanları
+    döndürür; akışın taşımadığı alanlar (marj, mark fiyatı) son uzlaştırmadaki değerleridir.
+    """
+
+    def __init__(self):
+        self._summary: Dict = {}
+        self._balances: Dict[str, Dict] = {}
+        # Anlık görüntüdeki cüzdan bakiyeleri; kullanılabilir bakiye bunlara göre kaydırılır
+        self._seed_wallets: Dict[str, float] = {}
+        self._positions: Dict[Tuple[str, str], Dict] = {}
+        self._orders: Dict[int, Dict] = {}
+        # Anlık görüntü alınırken kapanan emirler yeniden eklenmesin diye tutulur
+        self._closed_orders: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._seed_started_ms = 0
+        self.seeded = False
+        self.connected = False
+        self.events = 0
+        self.reconciled_at: Optional[float] = None
+        self.last_drift = 0
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def live(self) -> bool:
+        return self.seeded and self.connected
+
+    def begin_seed(self):
+        """Anlık görüntü isteklerinden hemen önce çağrılır"""
+        self._seed_started_ms = int(time.time() * 1000)
+
+    def seed(self, account: Dict, positions: List[Dict], orders: List[Dict]) -> int:
+        """REST anlık görüntüsünü uygular; görüntü alınırken gelen olay güncellemeleri korunur
+
+        Değişen kayıt sayısını döndürür (uzlaştırmada sapma ölçüsü).
+        """
+        summary = {key: value for key, value in account.items() if key not in ("assets", "positions")}
+        balances = {asset["asset"]: dict(asset) for asset in account.get("assets", [])}
+        position_map = {(p["symbol"], p.get("positionSide", "BOTH")): dict(p) for p in positions}
+        order_map = {int(o["orderId"]): dict(o) for o in orders}
+        with self._lock:
+            started = self._seed_started_ms
+            drift = 0
+            for asset, entry in self._balances.items():
+                if entry.get("updateTime", 0) > started:
+                    balances[asset] = entry
+                elif balances.get(asset, {}).get("walletBalance") != entry.get("walletBalance"):
+                    drift += 1
+            for key, entry in self._positions.items():
+                if entry.get("updateTime", 0) > started:
+                    position_map[key] = entry
+                elif float(position_map.get(key, {}).get("positionAmt", 0)) != float(entry.get("positionAmt", 0)):
+                    drift += 1
+            for order_id in list(order_map):
+                if order_id in self._closed_orders:
+                    del order_map[order_id]
+            for order_id, order in self._orders.items():
+                if order.get("updateTime", 0) > started:
+                    order_map[order_id] = order
+            drift += len(set(order_map) ^ set(self._orders))
+            if not self.seeded:
+                drift = 0
+            self._summary = summary
+            self._balances = balances
+            self._seed_wallets = {asset: float(entry.get("walletBalance", 0)) for asset, entry in balances.items()}
+            self._positions = position_map
+            self._orders = order_map
+            self.seeded = True
+            self.reconciled_at = time.time()
+            self.last_drift = drift
+        self._notify()
+        return drift
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Olay uygulandıktan ya da uzlaştırmadan sonra çağrılacak fonksiyonu kaydeder"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error("Account state listener error: %s", e)
+
+    def apply_event(self, event: Dict):
+        event_type = event.get("e")
+        if event_type == "ACCOUNT_UPDATE":
+            self._apply_account_update(event)
+        elif event_type == "ORDER_TRADE_UPDATE":
+            self._apply_order_update(event)
+        elif event_type == "listenKeyExpired":
+            raise ListenKeyExpired()
+        self.events += 1
+        if event_type in ("ACCOUNT_UPDATE", "ORDER_TRADE_UPDATE"):
+            self._notify()
+
+    def _apply_account_update(self, event: Dict):
+        update_time = int(event.get("T", event.get("E", 0)))
+        data = event["a"]
+        with self._lock:
+            for balance in data.get("B", []):
+                entry = self._balances.get(balance["a"])
+                if entry is None:
+                    entry = self._balances[balance["a"]] = {"asset": balance["a"], **ASSET_DEFAULTS}
+                entry["walletBalance"] = balance["wb"]
+                entry["crossWalletBalance"] = balance["cw"]
+                entry["updateTime"] = update_time
+            for position in data.get("P", []):
+                key = (position["s"], position.get("ps", "BOTH"))
+                entry = self._positions.get(key)
+                if entry is None:
+                    entry = self._positions[key] = {"symbol": key[0], "positionSide": key[1], **POSITION_DEFAULTS}
+                if entry.get("updateTime", 0) > update_time:
+                    continue
+                entry.update({
+                    "positionAmt": position["pa"],
+                    "entryPrice": position["ep"],
+                    "breakEvenPrice": position.get("bep", entry.get("breakEvenPrice")),
+                    "unRealizedProfit": position["up"],
+                    "isolatedWallet": position.get("iw", entry.get("isolatedWallet")),
+                    "updateTime": update_time,
+                })
+
+    def _apply_order_update(self, event: Dict):
+        order = event["o"]
+        order_id = int(order["i"])
+        update_time = int(order.get("T", event.get("T", 0)))
+        with self._lock:
+            if order["X"] in OPEN_ORDER_STATUSES:
+                self._orders[order_id] = {
+                    "orderId": order_id,
+                    "symbol": order["s"],
+                    "clientOrderId": order["c"],
+                    "side": order["S"],
+                    "type": order["o"],
+                    "origQty": order["q"],
+                    "executedQty": order["z"],
+                    "price": order["p"],
+                    "stopPrice": order["sp"],
+                    "reduceOnly": order.get("R", False),
+                    "positionSide": order.get("ps", "BOTH"),
+                    "status": order["X"],
+                    "updateTime": update_time,
+                }
+            else:
+                self._orders.pop(order_id, None)
+                self._closed_orders[order_id] = update_time
+                if len(self._closed_orders) > MAX_CLOSED_ORDERS:
+                    # En eski yarıyı at
+                    for stale in list(self._closed_orders)[:MAX_CLOSED_ORDERS // 2]:
+                        del self._closed_orders[stale]
+
+    def balance(self, asset: str = "USDT") -> Optional[float]:
+        with self._lock:
+            entry = self._balances.get(asset)
+            return None if entry is None else float(entry["walletBalance"])
+
+    def _visible_positions(self, symbol: Optional[str] = None) -> List[Dict]:
+        """REST v3 gibi yalnızca pozisyonu ya da açık emri olan semboller; _lock tutulurken çağrılır"""
+        order_symbols = {order["symbol"] for order in self._orders.values()}
+        visible = [dict(entry) for (position_symbol, _), entry in self._positions.items()
+                   if (symbol is None or position_symbol == symbol)
+                   and (float(entry.get("positionAmt", 0)) != 0 or position_symbol in order_symbols)]
+        listed = {entry["symbol"] for entry in visible}
+        for order_symbol in sorted(order_symbols - listed):
+            if symbol is None or order_symbol == symbol:
+                visible.append({"symbol": order_symbol, "positionSide": "BOTH", **POSITION_DEFAULTS})
+        return visible
+
+    def account(self) -> Dict:
+        """/fapi/v3/account biçiminde hesap; cüzdana bağlı toplamlar akıştaki bakiyelerden hesaplanır"""
+        with self._lock:
+            positions = self._visible_positions()
+            assets = [dict(entry) for entry in self._balances.values()]
+            wallet = sum(float(entry.get("walletBalance", 0)) for entry in assets)
+            cross_wallet = sum(float(entry.get("crossWalletBalance", 0)) for entry in assets)
+            wallet_change = wallet - sum(self._seed_wallets.values())
+            unrealized = sum(float(entry.get("unRealizedProfit", 0)) for entry in self._positions.values())
+            derived = {
+                "totalWalletBalance": wallet,
+                "totalCrossWalletBalance": cross_wallet,
+                "totalUnrealizedProfit": unrealized,
+                "totalMarginBalance": wallet + unrealized,
+                "availableBalance": float(self._summary.get("availableBalance", 0)) + wallet_change,
+                "maxWithdrawAmount": float(self._summary.get("maxWithdrawAmount", 0)) + wallet_change,
+            }
+            # Yalnızca REST yanıtında bulunan alanlar güncellenir; iki yolun alan kümesi aynı kalır
+            account = dict(self._summary)
+            account.update({key: str(value) for key, value in derived.items() if key in self._summary})
+            account["assets"] = assets
+            account["positions"] = [
+                {field: position.get(source) for field, source in ACCOUNT_POSITION_FIELDS.items()}
+                for position in positions
+            ]
+            return account
+
+    def positions(self, symbol: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            return self._visible_positions(symbol)
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            return [dict(order) for order in self._orders.values() if symbol is None or order["symbol"] == symbol]
+
+    def status(self) -> Dict:
+        with self._lock:
+            counts = {"balances": len(self._balances), "positions": len(self._positions),
+                      "open_orders": len(self._orders)}
+        return {
+            "live": self.live,
+            "connected": self.connected,
+            "events": self.events,
+            "reconciled_at": self.reconciled_at,
+            "last_drift": self.last_drift,
+            **counts,
+        }
+
+
+class UserDataStream:
+    """Listen key ile kullanıcı veri akışına bağlanır, anahtarı canlı tutar ve düzenli uzlaştırır"""
+
+    def __init__(self, state: AccountState, client_factory: Callable[[], "UMFutures"],
+                 base_url: str = STREAM_BASE_URL, keepalive_interval: float = 1800.0,
+                 reconcile_interval: float = 300.0, min_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.state = state
+        self.client_factory = client_factory
+        self.base_url = base_url.rstrip("/")
+        self.keepalive_interval = keepalive_interval
+        self.reconcile_interval = reconcile_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def reconcile(self) -> int:
+        client = self.client_factory()
+        self.state.begin_seed()
+        account, positions, orders = await asyncio.gather(
+            market_executor.run(client.account),
+            market_executor.run(client.get_position_risk),
+            market_executor.run(client.get_orders)
+        )
+        drift = self.state.seed(account, positions, orders)
+        if drift:
+            logger.warning("Account state reconciled with %s drifted entries", drift)
+        return drift
+
+    async def _keepalive(self, listen_key: str):
+        client = self.client_factory()
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await market_executor.run(client.renew_listen_key, listen_key)
+            logger.info("Listen key renewed")
+
+    async def _reconcile_forever(self):
+        # Düzenli uzlaştırma arka plan işidir; emirlerin ve piyasa verisinin bütçesini kullanmaz
+        with exchange_priority(DIAGNOSTIC):
+            while True:
+                await asyncio.sleep(self.reconcile_interval)
+                try:
+                    await self.reconcile()
+                except Exception as e:
+                    logger.error("Account state reconciliation error: %s", e)
+
+    async def _consume(self):
+        client = self.client_factory()
+        listen_key = (await market_executor.run(client.new_listen_key))["listenKey"]
+        async with websockets.connect(f"{self.base_url}/ws/{listen_key}", ping_interval=20,
+                                      close_timeout=5) as ws:
+            # Olaylar kaçmasın diye anlık görüntü bağlantı kurulduktan sonra alınır
+            await self.reconcile()
+            self.state.connected = True
+            logger.info("User data stream connected")
+            helpers = [asyncio.create_task(self._keepalive(listen_key)),
+                       asyncio.create_task(self._reconcile_forever())]
+            try:
+                async for raw in ws:
+                    self.state.apply_event(json.loads(raw))
+            finally:
+                for helper in helpers:
+                    helper.cancel()
+
+    async def run(self):
+        backoff = self.min_backoff
+        while True:
+            started = time.monotonic()
+            try:
+                await self._consume()
+            except asyncio.CancelledError:
+                raise
+            except ListenKeyExpired:
+                logger.warning("Listen key expired, reconnecting")
+            except Exception as e:
+                logger.error("User data stream error: %s", e)
+            finally:
+                self.state.connected = False
+
+            if time.monotonic() - started > self.max_backoff:
+                backoff = self.min_backoff
+            self.reconnects += 1
+            await asyncio.sleep(backoff * (1 + random.random() * 0.2))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict:
+        return {"reconnects": self.reconnects, **self.state.status()}
+
+
+account_state = AccountState()
+
+
+def create_user_stream(client_factory: Callable[[], "UMFutures"]) -> Optional[UserDataStream]:
+    """USER_STREAM_ENABLED açıksa kullanıcı veri akışını oluşturur"""
+    if not settings.user_stream_enabled:
+        return None
+    return UserDataStream(
+        account_state, client_factory,
+        base_url=settings.user_stream_url,
+        keepalive_interval=settings.listen_key_keepalive,
+        reconcile_interval=settings.account_reconcile_interval,
+    )
+
+
+async def get_balance(client: "UMFutures", asset: str = "USDT") -> float:
+    """Akış canlıysa bellekten, değilse /fapi/v3/balance'tan okur"""
+    if account_state.live:
+        balance = account_state.balance(asset)
+        if balance is not None:
+            return balance
+    balances = await market_executor.run(client.balance)
+    return float(next(item for item in balances if item['asset'] == asset)['balance'])
+
+
+async def get_positions(client: "UMFutures", symbol: Optional[str] = None) -> List[Dict]:
+    if account_state.live:
+        return account_state.positions(symbol)
+    if symbol is None:
+        return await market_executor.run(client.get_position_risk)
+    return await market_executor.run(client.get_position_risk, symbol=symbol)
+
+
+async def get_account(client: "UMFutures") -> Dict:
+    if account_state.live:
+        return account_state.account()
+    return await market_executor.run(client.account)
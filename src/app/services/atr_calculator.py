@@ -1,75 +1,160 @@
-import pandas as pd
 import numpy as np
-from typing import List, Dict
-from binance.um_futures import UMFutures
-import os
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Dict, List, Optional
+import time
+from ..config import settings
+from .client_pool import client_pool
+from .atr_engine import atr_engine
+from .executor import market_executor
+from .atr_scanner import compute_atr_matrix
+from .kline_store import INTERVAL_MS, kline_decoder, next_candle_close
+from .market_stream import market_cache, mark_price
+from .metrics import timed_indicator
+from .resampler import resampler
+from .response_cache import analysis_cache
 
-load_dotenv()
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
 
-def calculate_atr(klines: List[List], period: int = 14) -> float:
+
+# Fiyata bağlı alanların (current_price, TP/SL, oluşan mum ATR'si) önbellekte kalma süresi
+ANALYSIS_PRICE_TTL = settings.analysis_price_ttl
+
+@timed_indicator("atr")
+def calculate_atr(klines: List[List], period: int = 14) -> Dict:
     """ATR değerini hesaplar"""
-    # Klines verisini DataFrame'e çevir
-    df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote', 'ignored'])
-    
-    # String değerleri float'a çevir
-    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype(float)
-    
-    # True Range hesaplama
-    df['tr1'] = df['high'] - df['low']
-    df['tr2'] = abs(df['high'] - df['close'].shift())
-    df['tr3'] = abs(df['low'] - df['close'].shift())
-    df['tr'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
+    # Yalnızca high/low/close kolonlarını float64 tampona çöz
+    columns = kline_decoder.decode(klines, ("high", "low", "close"))
     
-    # ATR hesaplama
-    df['atr'] = df['tr'].rolling(window=period).mean()
+    # True Range ve ATR (ilk mumda TR = high - low)
+    tr, atr = compute_atr_matrix(columns['high'][None, :], columns['low'][None, :],
+                                 columns['close'][None, :], period)
     
     return {
-        "atr": df['atr'].iloc[-1],
-        "tr_values": df['tr'].tolist(),
-        "atr_values": df['atr'].tolist()
+        "atr": float(atr[0, -1]) if atr.shape[1] else float("nan"),
+        "tr_values": tr[0],
+        "atr_values": atr[0]
     }
 
-def get_atr_signals(symbol: str = "BTCUSDT", interval: str = "1h", period: int = 14, limit: int = 100):
+def get_atr_signals(symbol: str = "BTCUSDT", interval: str = "1h", period: int = 14, limit: int = 100,
+                    client: Optional["UMFutures"] = None):
     """ATR sinyalleri hesaplar"""
     try:
-        client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
+        if client is None:
+            client = client_pool.default()
         
-        # Mum verilerini al
-        klines = client.klines(symbol, interval, limit=limit)
+        # Yerel depodan oku, borsadan yalnızca eksik mumları çek
+        closed, forming = resampler.sync(client, symbol, interval, limit,
+                                       live_kline=market_cache.get_kline(symbol, interval))
         
-        # ATR hesapla
-        atr_data = calculate_atr(klines, period)
+        # ATR'yi yalnızca yeni kapanan mumlarla artımlı güncelle
+        atr_data = atr_engine.ingest(
+            symbol, interval,
+            open_time=closed['open_time'],
+            high=closed['high'],
+            low=closed['low'],
+            close=closed['close'],
+            forming_high=float(forming[2]),
+            forming_low=float(forming[3]),
+            period=period
+        )
         
         # Mevcut fiyat
-        current_price = float(client.mark_price(symbol)['markPrice'])
+        current_price = mark_price(client, symbol)
         
-        # Sinyal seviyeleri
-        take_profit = current_price + (atr_data['atr'] * 2.5)  # 2.5 ATR üstü
-        stop_loss = current_price - atr_data['atr']  # 1 ATR altı
-        
-        return {
-            "status": "success",
-            "symbol": symbol,
-            "current_price": current_price,
-            "atr": atr_data['atr'],
-            "signals": {
-                "take_profit": take_profit,
-                "stop_loss": stop_loss,
-                "risk_reward_ratio": 2.5  # (TP - Entry) / (Entry - SL)
-            },
-            "analysis": {
-                "tr_values": atr_data['tr_values'][-5:],  # Son 5 TR değeri
-                "atr_values": atr_data['atr_values'][-5:],  # Son 5 ATR değeri
-                "volatility_status": "HIGH" if atr_data['atr'] > np.mean(atr_data['atr_values']) else "LOW"
-            }
-        }
+        return _build_signals(symbol, current_price, atr_data['atr'], atr_data['tr_values'], atr_data['atr_values'])
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
-        } 
\ No newline at end of file
+        }
+
+
+def _build_signals(symbol: str, current_price: float, atr: float, tr_values: List[float],
+                   atr_values: List[float]) -> Dict:
+    # Sinyal seviyeleri
+    take_profit = current_price + (atr * 2.5)  # 2.5 ATR üstü
+    stop_loss = current_price - atr  # 1 ATR altı
+    
+    return {
+        "status": "success",
+        "symbol": symbol,
+        "current_price": current_price,
+        "atr": atr,
+        "signals": {
+            "take_profit": take_profit,
+            "stop_loss": stop_loss,
+            "risk_reward_ratio": 2.5  # (TP - Entry) / (Entry - SL)
+        },
+        "analysis": {
+            "tr_values": tr_values[-5:],  # Son 5 TR değeri
+            "atr_values": atr_values[-5:],  # Son 5 ATR değeri
+            "volatility_status": "HIGH" if atr > np.nanmean(atr_values) else "LOW"
+        }
+    }
+
+
+def _closed_candles(client: "UMFutures", symbol: str, interval: str, period: int, limit: int) -> Dict:
+    """Kapanmış mumların TR/ATR geçmişi; bir sonraki mum kapanışına kadar değişmez"""
+    closed, forming = resampler.sync(client, symbol, interval, limit,
+                                     live_kline=market_cache.get_kline(symbol, interval))
+    atr_data = atr_engine.ingest(
+        symbol, interval,
+        open_time=closed['open_time'],
+        high=closed['high'],
+        low=closed['low'],
+        close=closed['close'],
+        forming_high=float(forming[2]),
+        forming_low=float(forming[3]),
+        period=period
+    )
+    # Son eleman oluşan mumun önizlemesidir; fiyat aşamasında yeniden hesaplanır
+    return {
+        "tr_values": atr_data['tr_values'][:-1],
+        "atr_values": atr_data['atr_values'][:-1],
+        "forming": forming,
+        "fetched_at": time.time()
+    }
+
+
+def _live_signals(client: "UMFutures", symbol: str, interval: str, period: int, closed: Dict) -> Dict:
+    """Oluşan mum ve işaret fiyatıyla ATR önizlemesini ve TP/SL seviyelerini hesaplar"""
+    forming = closed["forming"]
+    kline = market_cache.get_kline(symbol, interval)
+    if kline is not None and kline["open_time"] == int(forming[0]):
+        high, low = kline["high"], kline["low"]
+    elif time.time() - closed["fetched_at"] <= ANALYSIS_PRICE_TTL:
+        high, low = float(forming[2]), float(forming[3])
+    else:
+        latest = resampler.forming(client, symbol, interval)
+        high, low = float(latest[2]), float(latest[3])
+
+    state = atr_engine.get_state(symbol, interval, period)
+    with state.lock:
+        tr, atr = state.preview(high, low)
+    return _build_signals(symbol, mark_price(client, symbol), atr,
+                          closed["tr_values"] + [tr], closed["atr_values"] + [atr])
+
+
+async def get_atr_signals_cached(client: "UMFutures", symbol: str = "BTCUSDT", interval: str = "1h",
+                                 period: int = 14, limit: int = 100) -> Dict:
+    """get_atr_signals'ın önbellekli hali
+
+    Kapanmış mum kısmı bir sonraki mum sınırına kadar, fiyata bağlı kısım ANALYSIS_PRICE_TTL
+    saniye boyunca saklanır. Aynı anahtar için eşzamanlı istekler tek hesaplamayı bekler.
+    """
+    if interval in INTERVAL_MS:
+        boundary = next_candle_close(interval, int(time.time() * 1000)) / 1000
+    else:
+        boundary = time.time() + ANALYSIS_PRICE_TTL
+    key = (symbol, interval, period, limit)
+
+    async def compute_closed():
+        closed = await market_executor.run(_closed_candles, client, symbol, interval, period, limit)
+        return closed, boundary
+
+    async def compute_live():
+        closed = await analysis_cache.get_or_compute(("closed",) + key, compute_closed)
+        result = await market_executor.run(_live_signals, client, symbol, interval, period, closed)
+        return result, min(time.time() + ANALYSIS_PRICE_TTL, boundary)
+
+    return await analysis_cache.get_or_compute(("live",) + key, compute_live)
@@ -0,0 +1,171 @@
+import bisect
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .kline_store import INTERVAL_MS
+from .metrics import timed_indicator
+
+SMOOTHING_METHODS = ("sma", "wilder")
+
+
+class StreamingATR:
+    """Tek bir sembol/aralık/periyot için her kapanan mumda O(1) güncellenen ATR"""
+
+    def __init__(self, period: int = 14, smoothing: str = "sma", history: int = 100):
+        if smoothing not in SMOOTHING_METHODS:
+            raise ValueError(f"Unknown ATR smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.prev_close: Optional[float] = None
+        self.last_open_time: Optional[int] = None
+        self.atr = math.nan
+        self.count = 0
+        self.tr_history: deque = deque(maxlen=history)
+        self.atr_history: deque = deque(maxlen=history)
+        self.lock = threading.Lock()
+        # SMA için son `period` TR değeri ve bunların toplamı
+        self._window: deque = deque(maxlen=period)
+        self._sum = 0.0
+        self._updates_since_resync = 0
+
+    def reset(self):
+        self.prev_close = None
+        self.last_open_time = None
+        self.atr = math.nan
+        self.count = 0
+        self.tr_history.clear()
+        self.atr_history.clear()
+        self._window.clear()
+        self._sum = 0.0
+        self._updates_since_resync = 0
+
+    def _true_range(self, high: float, low: float) -> float:
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def _next_atr(self, tr: float) -> float:
+        """Durumu değiştirmeden bir sonraki ATR değerini hesaplar"""
+        period = self.period
+        if self.smoothing == "wilder" and self.count >= period:
+            return (self.atr * (period - 1) + tr) / period
+        if len(self._window) == period:
+            return (self._sum - self._window[0] + tr) / period
+        if len(self._window) + 1 == period:
+            return (self._sum + tr) / period
+        return math.nan
+
+    def update(self, open_time: int, high: float, low: float, close: float) -> float:
+        """Kapanan mumu işler; daha önce görülen mumlar yok sayılır"""
+        if self.last_open_time is not None and open_time <= self.last_open_time:
+            return self.atr
+
+        tr = self._true_range(high, low)
+        self.atr = self._next_atr(tr)
+
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+        self._window.append(tr)
+        self._sum += tr
+        # Kayan toplamdaki float hatası birikmesin diye periyotta bir yeniden topla
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.period:
+            self._sum = math.fsum(self._window)
+            self._updates_since_resync = 0
+
+        self.prev_close = close
+        self.last_open_time = open_time
+        self.count += 1
+        self.tr_history.append(tr)
+        self.atr_history.append(self.atr)
+        return self.atr
+
+    def preview(self, high: float, low: float) -> Tuple[float, float]:
+        """Henüz kapanmamış mum için TR ve ATR değerini döndürür"""
+        tr = self._true_range(high, low)
+        return tr, self._next_atr(tr)
+
+
+class ATREngine:
+    """(sembol, aralık, periyot, yumuşatma) başına ATR durumlarını tutar"""
+
+    def __init__(self, history: int = 100):
+        self.history = history
+        self._states: Dict[Tuple[str, str, int, str], StreamingATR] = {}
+        self._lock = threading.Lock()
+
+    def get_state(self, symbol: str, interval: str, period: int = 14,
+                  smoothing: str = "sma") -> StreamingATR:
+        key = (symbol, interval, period, smoothing)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = StreamingATR(period, smoothing, self.history)
+                self._states[key] = state
+            return state
+
+    def update(self, symbol: str, interval: str, open_time: int, high: float, low: float,
+               close: float, period: int = 14, smoothing: str = "sma") -> float:
+        """Kapanan tek bir mumu ilgili duruma uygular"""
+        state = self.get_state(symbol, interval, period, smoothing)
+        with state.lock:
+            return state.update(open_time, high, low, close)
+
+    def ingest_klines(self, symbol: str, interval: str, klines: List[List], period: int = 14,
+                      smoothing: str = "sma") -> Dict:
+        """Borsa mumlarından yalnızca yeni kapananları işler, son mumu önizler"""
+        closed, forming = klines[:-1], klines[-1]
+        return self.ingest(
+            symbol, interval,
+            open_time=[int(k[0]) for k in closed],
+            high=[float(k[2]) for k in closed],
+            low=[float(k[3]) for k in closed],
+            close=[float(k[4]) for k in closed],
+            forming_high=float(forming[2]),
+            forming_low=float(forming[3]),
+            period=period,
+            smoothing=smoothing
+        )
+
+    @timed_indicator("atr_ingest")
+    def ingest(self, symbol: str, interval: str, open_time: Sequence[int], high: Sequence[float],
+               low: Sequence[float], close: Sequence[float], forming_high: float, forming_low: float,
+               period: int = 14, smoothing: str = "sma") -> Dict:
+        """Kapanmış mum kolonlarından yeni olanları işler, oluşan mumu önizler
+
+        Durum kesintisiz geçmiş boyunca taşındığından sonuç, aynı geçmişin tamamı üzerinde
+        calculate_atr ile hesaplananın son `len(open_time)` + 1 değerine eşittir.
+        """
+        state = self.get_state(symbol, interval, period, smoothing)
+        count = len(open_time)
+        step = INTERVAL_MS.get(interval) or (int(open_time[1]) - int(open_time[0]) if count > 1 else 0)
+        with state.lock:
+            # Pencere bilinen son mumdan sonra başlıyorsa ve bitişik değilse arada boşluk vardır; baştan kur
+            if (state.last_open_time is not None and count
+                    and int(open_time[0]) > state.last_open_time + step):
+                state.reset()
+            start = 0
+            if state.last_open_time is not None:
+                start = bisect.bisect_right(open_time, state.last_open_time)
+            for i in range(start, count):
+                state.update(int(open_time[i]), float(high[i]), float(low[i]), float(close[i]))
+
+            tr, atr = state.preview(forming_high, forming_low)
+            tr_values = list(state.tr_history)[-count:] if count else []
+            atr_values = list(state.atr_history)[-count:] if count else []
+
+        tr_values.append(tr)
+        atr_values.append(atr)
+        return {
+            "atr": atr,
+            "tr_values": tr_values,
+            "atr_values": atr_values
+        }
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+atr_engine = ATREngine()
@@ -0,0 +1,118 @@
+import asyncio
+import warnings
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .executor import market_executor
+from .resampler import resampler
+from .market_stream import market_cache
+from .metrics import timed_indicator
+from .indicators import true_range
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+RISK_REWARD_RATIO = 2.5
+
+
+@timed_indicator("atr_matrix")
+def compute_atr_matrix(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       period: int = 14) -> Tuple[np.ndarray, np.ndarray]:
+    """(seri, mum) şeklindeki dizilerde TR ve basit ortalamalı ATR'yi tek seferde hesaplar"""
+    # Gösterge grafiğindeki TR düğümüyle aynı tanım; ilk mumda TR = high - low
+    tr = true_range(high, low, close)
+
+    atr = np.full_like(tr, np.nan)
+    if tr.shape[1] >= period:
+        atr[:, period - 1:] = sliding_window_view(tr, period, axis=1).mean(axis=-1)
+    return tr, atr
+
+
+def _fetch_series(client: "UMFutures", symbol: str, interval: str, limit: int) -> Dict[str, np.ndarray]:
+    closed, forming = resampler.sync(client, symbol, interval, limit,
+                                     live_kline=market_cache.get_kline(symbol, interval))
+    return {
+        name: np.append(closed[name], float(forming[index]))
+        for name, index in (("high", 2), ("low", 3), ("close", 4))
+    }
+
+
+async def scan_atr(client: "UMFutures", symbols: List[str], intervals: List[str], period: int = 14,
+                   limit: int = 100, max_concurrency: int = 16) -> List[Dict]:
+    """Birden çok sembol/aralık için ATR sinyallerini vektörel olarak hesaplar"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    pairs = [(symbol.upper(), interval) for symbol in symbols for interval in intervals]
+
+    async def fetch(symbol: str, interval: str):
+        async with semaphore:
+            return await market_executor.run(_fetch_series, client, symbol, interval, limit)
+
+    async def fetch_marks() -> Dict[str, float]:
+        # Akıştaki fiyatlar tazeyse REST atlanır; değilse tüm fiyatlar tek çağrıda gelir
+        cached = {symbol: market_cache.get_mark_price(symbol) for symbol, _ in pairs}
+        if all(price is not None for price in cached.values()):
+            return cached
+        marks = await market_executor.run(client.mark_price)
+        return {item["symbol"]: float(item["markPrice"]) for item in marks}
+
+    fetched = await asyncio.gather(fetch_marks(), *(fetch(s, i) for s, i in pairs), return_exceptions=True)
+    mark_prices, series = fetched[0], fetched[1:]
+    if isinstance(mark_prices, Exception):
+        raise mark_prices
+
+    results: List[Dict] = [None] * len(pairs)
+    rows = []
+    for index, ((symbol, interval), data) in enumerate(zip(pairs, series)):
+        if isinstance(data, Exception):
+            results[index] = {"status": "error", "symbol": symbol, "interval": interval, "message": str(data)}
+        elif symbol not in mark_prices:
+            results[index] = {"status": "error", "symbol": symbol, "interval": interval,
+                              "message": f"No mark price for {symbol}"}
+        else:
+            rows.append((index, data))
+
+    if rows:
+        # Kısa serileri soldan NaN ile doldurarak 2 boyutlu dizilere yerleştir
+        width = max(len(data["close"]) for _, data in rows)
+        packed = {name: np.full((len(rows), width), np.nan) for name in ("high", "low", "close")}
+        for row, (_, data) in enumerate(rows):
+            for name, matrix in packed.items():
+                matrix[row, width - len(data[name]):] = data[name]
+
+        tr, atr = compute_atr_matrix(packed["high"], packed["low"], packed["close"], period)
+        last_atr = atr[:, -1]
+        with warnings.catch_warnings():
+            # Tamamı NaN olan satırlar (periyottan kısa seriler) için uyarı beklenir
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean_atr = np.nanmean(atr, axis=1)
+        high_volatility = last_atr > mean_atr
+
+        prices = np.array([mark_prices[pairs[index][0]] for index, _ in rows])
+        take_profit = prices + last_atr * RISK_REWARD_RATIO
+        stop_loss = prices - last_atr
+
+        for row, (index, _) in enumerate(rows):
+            symbol, interval = pairs[index]
+            results[index] = {
+                "status": "success",
+                "symbol": symbol,
+                "interval": interval,
+                "current_price": float(prices[row]),
+                "atr": None if np.isnan(last_atr[row]) else float(last_atr[row]),
+                "signals": {
+                    "take_profit": None if np.isnan(take_profit[row]) else float(take_profit[row]),
+                    "stop_loss": None if np.isnan(stop_loss[row]) else float(stop_loss[row]),
+                    "risk_reward_ratio": RISK_REWARD_RATIO
+                },
+                "analysis": {
+                    "tr_values": tr[row, -5:],
+                    "atr_values": atr[row, -5:],
+                    "volatility_status": "HIGH" if high_volatility[row] else "LOW"
+                }
+            }
+
+    logger.info("ATR scan completed: %s/%s series", len(rows), len(pairs))
+    return results
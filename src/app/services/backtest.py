@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .atr_scanner import compute_atr_matrix
+from .kline_store import KlineSeries, kline_store
+
+DEFAULT_FEE_RATE = 0.0004  # Binance futures taker ücreti
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _new_process_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    # fork, uygulamanın thread'leri (log yazıcısı, executor'lar) ve kilitleri varken güvenli değil
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _find_exit(high: np.ndarray, low: np.ndarray, start: int, take_profit: float,
+               stop_loss: float) -> Tuple[int, float]:
+    """TP ya da SL'ye ilk değen mumu büyüyen pencerelerle vektörel arar"""
+    n = len(high)
+    window = 64
+    i = start
+    while i < n:
+        j = min(n, i + window)
+        hit_sl = low[i:j] <= stop_loss
+        hit = hit_sl | (high[i:j] >= take_profit)
+        if hit.any():
+            k = int(np.argmax(hit))
+            # Aynı mumda ikisi de tetiklenirse muhafazakâr davranıp SL kabul edilir
+            return i + k, stop_loss if hit_sl[k] else take_profit
+        i = j
+        window *= 2
+    return -1, np.nan
+
+
+def simulate(high: np.ndarray, low: np.ndarray, close: np.ndarray, atr: np.ndarray,
+             atr_multiplier: float, fee_rate: float = DEFAULT_FEE_RATE) -> Dict:
+    """TradingBot.check_and_enter_position kurallarını geçmiş mumlar üzerinde oynatır"""
+    returns = []
+    n = len(close)
+    valid = np.flatnonzero(~np.isnan(atr))
+    i = int(valid[0]) if len(valid) else n
+    while i < n - 1:
+        # Pozisyon yokken mum kapanışında long aç; TP = giriş + ATR * çarpan, SL = giriş - ATR
+        entry = close[i]
+        exit_index, exit_price = _find_exit(high, low, i + 1, entry + atr[i] * atr_multiplier, entry - atr[i])
+        if exit_index < 0:
+            break
+        returns.append((exit_price - entry) / entry - 2 * fee_rate)
+        i = exit_index
+
+    returns = np.asarray(returns)
+    if len(returns) == 0:
+        return {"trades": 0, "pnl": 0.0, "total_return": 0.0, "max_drawdown": 0.0, "win_rate": None}
+
+    equity = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+    return {
+        "trades": int(len(returns)),
+        "pnl": float(returns.sum()),
+        "total_return": float(equity[-1] - 1),
+        "max_drawdown": float((1 - equity / peak).max()),
+        "win_rate": float((returns > 0).mean())
+    }
+
+
+def _run_task(task: Tuple) -> List[Dict]:
+    """Tek (sembol, aralık, periyot) için tüm çarpanları çalıştırır; süreç havuzunda koşar"""
+    store_root, symbol, interval, period, multipliers, fee_rate, start_time, end_time = task
+    base = {"symbol": symbol, "interval": interval, "period": period}
+    series = KlineSeries(os.path.join(store_root, symbol, interval))
+    columns = series.columns()
+    open_time = columns["open_time"]
+    lo = np.searchsorted(open_time, start_time) if start_time is not None else 0
+    hi = np.searchsorted(open_time, end_time, side="right") if end_time is not None else len(open_time)
+    if hi - lo <= period:
+        return [{**base, "atr_multiplier": m, "status": "error",
+                 "message": f"Not enough stored candles for {symbol} {interval}"} for m in multipliers]
+
+    high = np.asarray(columns["high"][lo:hi])
+    low = np.asarray(columns["low"][lo:hi])
+    close = np.asarray(columns["close"][lo:hi])
+    # ATR bir kez hesaplanır, tüm çarpanlar aynı diziyi kullanır
+    _, atr = compute_atr_matrix(high[None, :], low[None, :], close[None, :], period)
+    atr = atr[0]
+    return [
+        {**base, "atr_multiplier": m, "status": "success", "bars": int(hi - lo),
+         **simulate(high, low, close, atr, m, fee_rate)}
+        for m in multipliers
+    ]
+
+
+def _build_tasks(symbols: List[str], intervals: List[str], periods: List[int], multipliers: List[float],
+                 fee_rate: float, start_time: Optional[int], end_time: Optional[int]) -> List[Tuple]:
+    return [
+        (kline_store.root, symbol.upper(), interval, period, list(multipliers), fee_rate, start_time, end_time)
+        for symbol in symbols for interval in intervals for period in periods
+    ]
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = _new_process_pool(settings.backtest_workers)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def run_backtest(symbols: List[str], intervals: List[str], periods: List[int], multipliers: List[float],
+                 fee_rate: float = DEFAULT_FEE_RATE, start_time: Optional[int] = None,
+                 end_time: Optional[int] = None, max_workers: Optional[int] = None) -> List[Dict]:
+    """Parametre ızgarasını süreç havuzunda çalıştırır"""
+    tasks = _build_tasks(symbols, intervals, periods, multipliers, fee_rate, start_time, end_time)
+    with _new_process_pool(max_workers) as pool:
+        return [row for rows in pool.map(_run_task, tasks) for row in rows]
+
+
+async def run_backtest_async(symbols: List[str], intervals: List[str], periods: List[int],
+                             multipliers: List[float], fee_rate: float = DEFAULT_FEE_RATE,
+                             start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[Dict]:
+    """Event loop'u bloklamadan paylaşılan süreç havuzunu kullanır"""
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    tasks = _build_tasks(symbols, intervals, periods, multipliers, fee_rate, start_time, end_time)
+    results = await asyncio.gather(*(loop.run_in_executor(pool, _run_task, task) for task in tasks))
+    return [row for rows in results for row in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ATR TP/SL parameter sweep over stored candles")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--intervals", nargs="+", default=["1h"])
+    parser.add_argument("--periods", nargs="+", type=int, default=[14])
+    parser.add_argument("--multipliers", nargs="+", type=float, default=[1.5, 2.0, 2.5, 3.0])
+    parser.add_argument("--fee-rate", type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = run_backtest(args.symbols, args.intervals, args.periods, args.multipliers,
+                        fee_rate=args.fee_rate, max_workers=args.workers)
+    print(json.dumps(rows, indent=2))
@@ -0,0 +1,209 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from ..config import TESTNET_BASE_URL, settings
+from ..utils.logger import logger
+from .metrics import timed_exchange_call
+from .rate_limiter import ORDER, RequestScheduler, current_priority, request_cost, request_scheduler
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+class ConnectionStats:
+    """Açılan ve yeniden kullanılan HTTP bağlantılarını sayar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def record_open(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": max(self.requests - self.opened, 0),
+                "requests": self.requests,
+            }
+
+
+def _counting_pool_classes(stats: ConnectionStats) -> Dict[str, type]:
+    # urllib3 her yeni TCP/TLS bağlantısı için _new_conn çağırır
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            stats.record_open()
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            stats.record_open()
+            return super()._new_conn()
+
+    return {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """Keep-alive bağlantıları sınırlı bir havuzda tutan, sayan ve hız sınırı bütçesinden geçiren adaptör"""
+
+    def __init__(self, stats: ConnectionStats, scheduler: Optional[RequestScheduler] = None, **kwargs):
+        self.stats = stats
+        self.scheduler = scheduler
+        # Süren istek sayısı; havuzdan çıkarılan istemcinin bağlantıları son istek bitince kapatılır
+        self._active = 0
+        self._close_pending = False
+        self._active_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+    def send(self, request, **kwargs):
+        with self._active_lock:
+            self._active += 1
+        try:
+            return self._send(request, **kwargs)
+        finally:
+            with self._active_lock:
+                self._active -= 1
+                close = self._close_pending and self._active == 0
+            if close:
+                super().close()
+
+    def _send(self, request, **kwargs):
+        if self.scheduler is None:
+            self.stats.record_request()
+            return super().send(request, **kwargs)
+
+        weight, orders, order_priority = request_cost(request.method, request.url)
+        self.scheduler.acquire(ORDER if order_priority else current_priority(), weight, orders)
+        sent_at = time.time()
+        self.stats.record_request()
+        try:
+            response = super().send(request, **kwargs)
+        except BaseException:
+            self.scheduler.record_response(None, {}, weight, sent_at)
+            raise
+        self.scheduler.record_response(response.status_code, response.headers, weight, sent_at)
+        return response
+
+    def close_when_idle(self):
+        """Süren istek yoksa hemen, varsa sonuncusu bitince bağlantıları kapatır"""
+        with self._active_lock:
+            self._close_pending = True
+            if self._active:
+                return
+        super().close()
+
+
+@functools.lru_cache(maxsize=None)
+def _client_class() -> type:
+    """binance SDK'sı ağır; ilk istemci oluşturulurken yüklenir"""
+    from binance.um_futures import UMFutures
+
+    # binance.um_futures.market/account/... modüllerinden gelen REST uç noktası metotları
+    api_methods = frozenset(
+        name for name, value in vars(UMFutures).items()
+        if callable(value) and getattr(value, "__module__", "").startswith("binance.um_futures.")
+    )
+
+    class InstrumentedUMFutures(UMFutures):
+        """REST uç noktası çağrılarının süresini metot adıyla kaydeden istemci"""
+
+    # Sarmalayıcılar sınıf oluşturulurken bir kez kurulur; çağrı yolunda kapanış üretilmez
+    for name in api_methods:
+        setattr(InstrumentedUMFutures, name, timed_exchange_call(name, vars(UMFutures)[name]))
+    return InstrumentedUMFutures
+
+
+class ClientPool:
+    """Kimlik bilgisine göre anahtarlanmış, süreç genelinde paylaşılan UMFutures havuzu"""
+
+    def __init__(self, max_clients: int = 8, max_connections: int = 10, timeout: Optional[float] = 10,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.max_clients = max_clients
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.stats = ConnectionStats()
+        self._clients: "OrderedDict[Tuple[Optional[str], Optional[str], str], UMFutures]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _create_client(self, key: Optional[str], secret: Optional[str], base_url: str) -> "UMFutures":
+        client = _client_class()(key=key, secret=secret, base_url=base_url, timeout=self.timeout)
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            scheduler=self.scheduler,
+            pool_connections=1,
+            pool_maxsize=self.max_connections,
+            pool_block=True,
+        )
+        client.session.mount("https://", adapter)
+        client.session.mount("http://", adapter)
+        return client
+
+    def get(self, key: Optional[str] = None, secret: Optional[str] = None,
+            base_url: str = TESTNET_BASE_URL) -> "UMFutures":
+        """Aynı kimlik bilgileri için aynı istemciyi döndürür"""
+        pool_key = (key, secret, base_url)
+        with self._lock:
+            client = self._clients.get(pool_key)
+            if client is not None:
+                self._clients.move_to_end(pool_key)
+                return client
+
+            client = self._create_client(key, secret, base_url)
+            self._clients[pool_key] = client
+            if len(self._clients) > self.max_clients:
+                # En uzun süredir kullanılmayan istemci çıkarılır; elinde tutan çağıranların süren
+                # istekleri kesilmesin diye bağlantıları istekler bitince kapatılır
+                _, evicted = self._clients.popitem(last=False)
+                for adapter in evicted.session.adapters.values():
+                    if isinstance(adapter, CountingHTTPAdapter):
+                        adapter.close_when_idle()
+            logger.info("Exchange client created for %s (%s pooled)", base_url, len(self._clients))
+            return client
+
+    def default(self) -> "UMFutures":
+        """Ortam değişkenlerindeki test ağı kimlik bilgileriyle istemci döndürür"""
+        return self.get(
+            key=settings.api_key,
+            secret=settings.api_secret,
+            base_url=settings.futures_base_url,
+        )
+
+    def connection_stats(self) -> Dict[str, int]:
+        stats = self.stats.snapshot()
+        with self._lock:
+            stats["clients"] = len(self._clients)
+        return stats
+
+    def close(self):
+        """Tüm oturumları kapatır"""
+        with self._lock:
+            for client in self._clients.values():
+                client.session.close()
+            self._clients.clear()
+        logger.info("Exchange client pool closed")
+
+
+client_pool = ClientPool(
+    max_clients=settings.exchange_pool_max_clients,
+    max_connections=settings.exchange_pool_max_connections,
+    timeout=settings.exchange_timeout,
+    scheduler=request_scheduler,
+)
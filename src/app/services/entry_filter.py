@@ -0,0 +1,68 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .indicators import IndicatorPipeline
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """TradingBot long girişleri için gösterge koşulları
+
+    Giriş ancak fiyat trend EMA'sının üstündeyken, RSI aşırı alım bölgesinde değilken, fiyat
+    Keltner ve Bollinger üst bantlarını aşmamışken ve ATR yüzdeliği izin verilen oynaklık
+    rejimindeyken yapılır. Göstergeler kapanmış mumlardan tek bir pipeline ile hesaplanır.
+    """
+    trend_ema: int = 50
+    rsi_period: int = 14
+    rsi_max: float = 70.0
+    bollinger_period: int = 20
+    bollinger_multiplier: float = 2.0
+    keltner_period: int = 20
+    keltner_multiplier: float = 2.0
+    keltner_atr_period: int = 10
+    atr_period: int = 14
+    regime_lookback: int = 100
+    # ATR, son `regime_lookback` mumdaki değerlerinin bu yüzdelikleri arasında olmalı
+    min_atr_percentile: float = 0.1
+    max_atr_percentile: float = 0.9
+
+    @property
+    def specs(self) -> Tuple[str, ...]:
+        return (
+            f"ema:{self.trend_ema}",
+            f"rsi:{self.rsi_period}",
+            f"bollinger:{self.bollinger_period}:{self.bollinger_multiplier}",
+            f"keltner:{self.keltner_period}:{self.keltner_multiplier}:{self.keltner_atr_period}",
+            f"atr_percentile:{self.atr_period}:{self.regime_lookback}",
+        )
+
+    @property
+    def min_bars(self) -> int:
+        return IndicatorPipeline(self.specs).min_bars
+
+    def regime(self, percentile: float) -> str:
+        if percentile < self.min_atr_percentile:
+            return "low"
+        if percentile > self.max_atr_percentile:
+            return "high"
+        return "normal"
+
+    def check(self, values: Dict[str, Dict[str, float]], price: float) -> Optional[str]:
+        """Giriş engellenirse nedenini, uygunsa None döndürür"""
+        ema, rsi, bollinger, keltner, atr_percentile = (values[spec] for spec in self.specs)
+        if any(math.isnan(value) for fields in (ema, rsi, bollinger, keltner, atr_percentile)
+               for value in fields.values()):
+            return "insufficient history"
+        if price <= ema["ema"]:
+            return f"price {price} below trend EMA {ema['ema']:.8g}"
+        if rsi["rsi"] >= self.rsi_max:
+            return f"RSI {rsi['rsi']:.2f} overbought"
+        if price >= keltner["upper"]:
+            return f"price {price} above Keltner upper band {keltner['upper']:.8g}"
+        if price >= bollinger["upper"]:
+            return f"price {price} above Bollinger upper band {bollinger['upper']:.8g}"
+        regime = self.regime(atr_percentile["percentile"])
+        if regime != "normal":
+            return f"{regime} volatility regime (ATR percentile {atr_percentile['percentile']:.2f})"
+        return None
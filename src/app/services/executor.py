@@ -0,0 +1,62 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from ..config import settings
+from .rate_limiter import MARKET, ORDER, context_with_priority
+from ..utils.logger import logger
+
+
+class BlockingExecutor:
+    """Senkron exchange çağrılarını sınırlı bir thread havuzunda, event loop'u bloklamadan çalıştırır"""
+
+    def __init__(self, name: str, max_workers: int, default_timeout: Optional[float] = None,
+                 priority: int = MARKET):
+        self.name = name
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.priority = priority
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._pool
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """fn'i havuzda çalıştırır; zaman aşımında bekleyen çağıranı serbest bırakır"""
+        loop = asyncio.get_running_loop()
+        timeout = self.default_timeout if timeout is None else timeout
+        # Hız sınırı önceliği ve son tarih bağlamla birlikte thread'e taşınır; çağıran zaman aşımıyla
+        # ayrıldıktan sonra havuzda sırası gelen çağrı borsaya istek göndermez
+        deadline = time.time() + timeout if timeout is not None else None
+        context = context_with_priority(self.priority, deadline)
+        future = loop.run_in_executor(self._get_pool(), context.run, functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # Çalışmaya başlamış thread durdurulamaz; HTTP zaman aşımı onu serbest bırakır
+            name = getattr(fn, "__name__", repr(fn))
+            logger.warning("%s call %s timed out after %ss", self.name, name, timeout)
+            raise TimeoutError(f"Exchange call {name} timed out after {timeout}s")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Emirler ayrı havuzda çalışır; yoğun piyasa verisi trafiği emirleri bekletmez
+order_executor = BlockingExecutor(
+    "exchange-orders",
+    max_workers=settings.order_executor_workers,
+    default_timeout=settings.order_call_timeout,
+    priority=ORDER,
+)
+market_executor = BlockingExecutor(
+    "exchange-market",
+    max_workers=settings.market_executor_workers,
+    default_timeout=settings.market_call_timeout,
+)
@@ -0,0 +1,309 @@
+"""Yıllara yayılan mum geçmişini çok sembol/aralık için parça parça indirir
+
+Her (sembol, aralık) geçmişi takvim parçalarına bölünür: 1h altı aralıklarda ay, diğerlerinde
+yıl. Parçalar sıkıştırılmış .npz dosyalarına (kline_store ile aynı kolonlar) yazılır ve np.load ile
+doğrudan okunur. İlerleme checkpoint.json'da tutulur; tamamlanan parçalar tekrar indirilmez,
+yarım kalan parça son mumundan devam eder.
+
+Kullanım:
+    python -m src.app.services.history_downloader --symbols BTCUSDT,ETHUSDT --intervals 1m,1h \\
+        --start 2021-01-01 [--end 2024-01-01] [--workers 4] [--dir data/history]
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from ..utils.logger import logger
+from .client_pool import client_pool
+from .executor import BlockingExecutor
+from .kline_store import COLUMNS, INTERVAL_MS, MAX_KLINES_PER_REQUEST, klines_to_columns
+from .rate_limiter import DIAGNOSTIC
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def _utc(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def _ms(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+
+def parse_date(value: str) -> int:
+    """"2021-01-01" ya da epoch ms -> epoch ms (UTC)"""
+    if value.isdigit():
+        return int(value)
+    return _ms(datetime.fromisoformat(value).replace(tzinfo=timezone.utc))
+
+
+@dataclass
+class Chunk:
+    """Tek dosyaya yazılan takvim parçası; [start, end) aralığındaki mumlar"""
+    symbol: str
+    interval: str
+    name: str
+    start: int
+    end: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}/{self.interval}/{self.name}"
+
+
+def chunk_bounds(interval: str, start: int, end: int) -> List[Chunk]:
+    """[start, end) aralığını kesen takvim parçalarının sınırları (sembol boş)"""
+    monthly = INTERVAL_MS[interval] < INTERVAL_MS["1h"]
+    chunks = []
+    moment = _utc(start)
+    moment = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if not monthly:
+        moment = moment.replace(month=1)
+    while _ms(moment) < end:
+        if monthly:
+            following = moment.replace(year=moment.year + moment.month // 12, month=moment.month % 12 + 1)
+            name = moment.strftime("%Y-%m")
+        else:
+            following = moment.replace(year=moment.year + 1)
+            name = moment.strftime("%Y")
+        chunks.append(Chunk("", interval, name, _ms(moment), _ms(following)))
+        moment = following
+    return chunks
+
+
+class HistoryDownloader:
+    """Eksik parçaları eşzamanlı indirir; istekler hız sınırı bütçesinden tanılama önceliğiyle geçer"""
+
+    def __init__(self, root: str, client_factory: Callable[[], "UMFutures"], workers: int = 4):
+        self.root = root
+        self.client_factory = client_factory
+        # Uzun süren indirme piyasa/emir havuzlarını meşgul etmez; bütçeyi canlı trafiğe bırakır
+        self.executor = BlockingExecutor("history-download", max_workers=workers, priority=DIAGNOSTIC)
+        self._lock = threading.Lock()
+        self._checkpoint: Optional[Dict[str, Dict]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict = {}
+
+    # Checkpoint
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.root, CHECKPOINT_FILE)
+
+    def _load_checkpoint(self) -> Dict[str, Dict]:
+        with self._lock:
+            if self._checkpoint is None:
+                try:
+                    with open(self.checkpoint_path) as f:
+                        self._checkpoint = json.load(f)
+                except FileNotFoundError:
+                    self._checkpoint = {}
+            return self._checkpoint
+
+    def _save_chunk_state(self, chunk: Chunk, state: Dict):
+        """Parça dosyası yazıldıktan sonra çağrılır; yarım yazılmış checkpoint kalmaz"""
+        with self._lock:
+            self._checkpoint[chunk.key] = state
+            os.makedirs(self.root, exist_ok=True)
+            tmp = self.checkpoint_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._checkpoint, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.checkpoint_path)
+
+    # Parça dosyaları
+
+    def chunk_path(self, chunk: Chunk) -> str:
+        return os.path.join(self.root, chunk.symbol, chunk.interval, f"{chunk.name}.npz")
+
+    def _read_chunk(self, chunk: Chunk) -> Optional[Dict[str, np.ndarray]]:
+        path = self.chunk_path(chunk)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name, _, _ in COLUMNS}
+
+    def _write_chunk(self, chunk: Chunk, columns: Dict[str, np.ndarray]):
+        path = self.chunk_path(chunk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp, path)
+
+    # İndirme
+
+    def plan(self, symbols: List[str], intervals: List[str], start: int, end: int) -> List[Chunk]:
+        """Tamamlanmamış parçalar"""
+        checkpoint = self._load_checkpoint()
+        chunks = []
+        for interval in intervals:
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval for history download: {interval}")
+            for bounds in chunk_bounds(interval, start, end):
+                for symbol in symbols:
+                    chunk = Chunk(symbol.upper(), interval, bounds.name, bounds.start, bounds.end)
+                    if not checkpoint.get(chunk.key, {}).get("complete"):
+                        chunks.append(chunk)
+        return chunks
+
+    def _download_chunk(self, chunk: Chunk) -> int:
+        """Parçanın eksik kuyruğunu sayfalar halinde çeker; eklenen mum sayısını döndürür"""
+        interval_ms = INTERVAL_MS[chunk.interval]
+        state = self._load_checkpoint().get(chunk.key, {})
+        existing = self._read_chunk(chunk) if state.get("rows") else None
+        cursor = chunk.start
+        if existing is not None and len(existing["open_time"]):
+            cursor = int(existing["open_time"][-1]) + interval_ms
+
+        client = self.client_factory()
+        now_ms = int(time.time() * 1000)
+        klines: List[List] = []
+        while cursor < chunk.end:
+            page = client.klines(chunk.symbol, chunk.interval, startTime=cursor, endTime=chunk.end - 1,
+                                 limit=MAX_KLINES_PER_REQUEST)
+            # Yalnızca kapanmış mumlar yazılır
+            closed = [k for k in page if int(k[6]) < now_ms and chunk.start <= int(k[0]) < chunk.end]
+            klines.extend(closed)
+            if len(page) < MAX_KLINES_PER_REQUEST or len(closed) < len(page):
+                break
+            cursor = int(page[-1][0]) + interval_ms
+
+        columns = klines_to_columns(klines) if klines else None
+        if columns is not None:
+            if existing is not None:
+                columns = {name: np.concatenate((existing[name], columns[name])) for name in columns}
+            self._write_chunk(chunk, columns)
+        else:
+            columns = existing
+
+        rows = len(columns["open_time"]) if columns is not None else 0
+        gaps = int((np.diff(columns["open_time"]) != interval_ms).sum()) if rows else 0
+        # Parça tamamen geçmişte kaldıysa bir daha istenmez (listelemeden önceki boş parçalar dahil)
+        complete = chunk.end <= now_ms - interval_ms
+        self._save_chunk_state(chunk, {
+            "complete": complete,
+            "rows": rows,
+            "gaps": gaps,
+            "first_open_time": int(columns["open_time"][0]) if rows else None,
+            "last_open_time": int(columns["open_time"][-1]) if rows else None,
+        })
+        with self._lock:
+            self.progress["done"] += 1
+            self.progress["klines"] += len(klines)
+        return len(klines)
+
+    async def download(self, symbols: List[str], intervals: List[str], start: int,
+                       end: Optional[int] = None) -> Dict:
+        """Eksik parçaları indirir; parça hataları diğerlerini durdurmaz ve özet döner"""
+        end = end if end is not None else int(time.time() * 1000)
+        chunks = self.plan(symbols, intervals, start, end)
+        started = time.perf_counter()
+        with self._lock:
+            self.progress = {"running": True, "chunks": len(chunks), "done": 0, "failed": 0, "klines": 0,
+                             "started_at": time.time(), "errors": []}
+        logger.info("History download: %s chunks for %s symbols on %s", len(chunks), len(symbols), intervals)
+
+        async def run(chunk: Chunk):
+            try:
+                await self.executor.run(self._download_chunk, chunk)
+            except Exception as e:
+                logger.error("History chunk %s failed: %s", chunk.key, e)
+                with self._lock:
+                    self.progress["failed"] += 1
+                    self.progress["errors"].append({"chunk": chunk.key, "error": str(e)})
+
+        try:
+            await asyncio.gather(*(run(chunk) for chunk in chunks))
+        finally:
+            with self._lock:
+                self.progress["running"] = False
+                self.progress["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("History download finished: %s", {k: v for k, v in self.progress.items() if k != "errors"})
+        return dict(self.progress)
+
+    def start(self, symbols: List[str], intervals: List[str], start: int, end: Optional[int] = None) -> bool:
+        """İndirmeyi arka planda başlatır; süren bir indirme varsa False döner"""
+        if self._task is not None and not self._task.done():
+            return False
+        for interval in intervals:
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval for history download: {interval}")
+        with self._lock:
+            self.progress = {"running": True}
+        self._task = asyncio.create_task(self.download(symbols, intervals, start, end))
+        return True
+
+    def status(self) -> Dict:
+        with self._lock:
+            return dict(self.progress)
+
+    def load(self, symbol: str, interval: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """İndirilmiş parçaları birleştirip kolon dizileri olarak döndürür"""
+        directory = os.path.join(self.root, symbol.upper(), interval)
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".npz")) \
+            if os.path.isdir(directory) else []
+        parts = []
+        for name in names:
+            with np.load(os.path.join(directory, name)) as data:
+                parts.append({column: data[column] for column, _, _ in COLUMNS})
+        columns = {
+            name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype=dtype)
+            for name, _, dtype in COLUMNS
+        }
+        mask = np.ones(len(columns["open_time"]), dtype=bool)
+        if start is not None:
+            mask &= columns["open_time"] >= start
+        if end is not None:
+            mask &= columns["open_time"] < end
+        return {name: column[mask] for name, column in columns.items()} if not mask.all() else columns
+
+    def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.executor.shutdown()
+
+
+history_downloader = HistoryDownloader(settings.history_dir, client_pool.default,
+                                       workers=settings.history_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", required=True, help="comma separated, e.g. BTCUSDT,ETHUSDT")
+    parser.add_argument("--intervals", default="1h", help="comma separated, e.g. 1m,1h")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD or epoch ms (UTC)")
+    parser.add_argument("--end", help="YYYY-MM-DD or epoch ms (UTC), default now")
+    parser.add_argument("--workers", type=int, default=settings.history_workers)
+    parser.add_argument("--dir", default=settings.history_dir, help="output directory")
+    args = parser.parse_args()
+
+    downloader = HistoryDownloader(args.dir, client_pool.default, workers=args.workers)
+    try:
+        summary = asyncio.run(downloader.download(
+            [symbol for symbol in args.symbols.split(",") if symbol],
+            [interval for interval in args.intervals.split(",") if interval],
+            parse_date(args.start),
+            parse_date(args.end) if args.end else None,
+        ))
+    finally:
+        downloader.shutdown()
+        client_pool.close()
+    print(json.dumps(summary, indent=2))
+    raise SystemExit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,497 @@
+import bisect
+import math
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .metrics import timed_indicator
+
+# Düğümlerin okuyabileceği mum kolonları
+SOURCE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Özyinelemeli ortalamalar bu uzunlukta bloklarla vektörel çözülür; beta^-64 float64 sınırında kalır
+_BLOCK = 64
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Son eksende TR; ilk mumda önceki kapanış olmadığından TR = high - low"""
+    prev_close = np.empty_like(close)
+    prev_close[..., 0] = np.nan
+    prev_close[..., 1:] = close[..., :-1]
+    # fmax NaN'ları atlar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _first_valid(values: np.ndarray) -> Optional[int]:
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else None
+
+
+def _rolling(values: np.ndarray, period: int, reduce: Callable) -> np.ndarray:
+    """Baştaki NaN'lardan sonraki kesintisiz bölgede `period` uzunluklu pencere indirgemesi"""
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    if first is None or len(values) - first < period:
+        return out
+    out[first + period - 1:] = reduce(sliding_window_view(values[first:], period), axis=-1)
+    return out
+
+
+def _recursive_mean(values: np.ndarray, alpha: float, period: int) -> np.ndarray:
+    """y = (1 - alpha) * y_prev + alpha * x; ilk `period` geçerli değerin ortalamasıyla başlar"""
+    out = np.full(len(values), np.nan)
+    first = _first_valid(values)
+    if first is None or len(values) - first < period:
+        return out
+    seed_at = first + period - 1
+    level = float(values[first:seed_at + 1].mean())
+    out[seed_at] = level
+    rest = values[seed_at + 1:]
+    beta = 1.0 - alpha
+    if beta == 0:
+        out[seed_at + 1:] = rest
+        return out
+    # Blok içinde y_k = beta^k * (y_0 + alpha * sum(x_j / beta^j))
+    for start in range(0, len(rest), _BLOCK):
+        block = rest[start:start + _BLOCK]
+        decay = beta ** np.arange(1, len(block) + 1)
+        levels = decay * (level + alpha * np.cumsum(block / decay))
+        out[seed_at + 1 + start:seed_at + 1 + start + len(block)] = levels
+        level = float(levels[-1])
+    return out
+
+
+class Node:
+    """Hesap grafiğindeki bir ara değer; toplu (vektörel) ve artımlı (tek mum) değerlendirilir
+
+    `batch` tüm mum dizisini, `step` yalnızca yeni kapanan mumu işler ve düğümün kendi durumunu
+    günceller. Aynı anahtarlı düğümler grafikte bir kez bulunur; böylece TR, tipik fiyat ve kayan
+    ortalamalar onları kullanan tüm göstergeler için bir kez hesaplanır.
+    """
+    name = ""
+
+    def __init__(self, *inputs: str, params: Tuple = ()):
+        self.inputs = inputs
+        self.params = params
+        self.key = f"{self.name}({','.join(map(str, inputs + params))})" if inputs or params else self.name
+
+    def batch(self, *inputs: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def step(self, *inputs: float) -> float:
+        raise NotImplementedError
+
+
+class PrevClose(Node):
+    name = "prev_close"
+
+    def __init__(self):
+        super().__init__()
+        self.inputs = ("close",)
+        self._last = math.nan
+
+    def batch(self, close):
+        out = np.empty_like(close)
+        out[0:1] = np.nan
+        out[1:] = close[:-1]
+        return out
+
+    def step(self, close):
+        value, self._last = self._last, close
+        return value
+
+
+class TrueRange(Node):
+    name = "tr"
+
+    def __init__(self):
+        super().__init__()
+        self.inputs = ("high", "low", "close")
+        self._prev_close = math.nan
+
+    def batch(self, high, low, close):
+        return true_range(high, low, close)
+
+    def step(self, high, low, close):
+        prev_close, self._prev_close = self._prev_close, close
+        if math.isnan(prev_close):
+            return high - low
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class TypicalPrice(Node):
+    name = "typical"
+
+    def __init__(self):
+        super().__init__()
+        self.inputs = ("high", "low", "close")
+
+    def batch(self, high, low, close):
+        return (high + low + close) / 3
+
+    def step(self, high, low, close):
+        return (high + low + close) / 3
+
+
+class Change(Node):
+    """Kapanıştan kapanışa değişimin pozitif (gain) ya da negatif (loss) kısmı"""
+
+    def __init__(self, side: str, prev_close: str):
+        self.name = side
+        super().__init__()
+        self.inputs = ("close", prev_close)
+        self.sign = 1.0 if side == "gain" else -1.0
+
+    def batch(self, close, prev_close):
+        change = self.sign * (close - prev_close)
+        return np.where(np.isnan(change), np.nan, np.maximum(change, 0.0))
+
+    def step(self, close, prev_close):
+        change = self.sign * (close - prev_close)
+        return change if math.isnan(change) else max(change, 0.0)
+
+
+class Window(Node):
+    """Son `period` geçerli değeri tutan pencere düğümlerinin ortak durumu"""
+
+    def __init__(self, source: str, period: int):
+        super().__init__(source, params=(period,))
+        self.period = period
+        self._window: deque = deque(maxlen=period)
+
+    def _push(self, value: float) -> bool:
+        if math.isnan(value):
+            return False
+        self._window.append(value)
+        return len(self._window) == self.period
+
+
+class RollingMean(Window):
+    name = "sma"
+
+    def batch(self, values):
+        return _rolling(values, self.period, np.mean)
+
+    def step(self, value):
+        return math.fsum(self._window) / self.period if self._push(value) else math.nan
+
+
+class RollingStd(Window):
+    """Popülasyon standart sapması (Bollinger)"""
+    name = "std"
+
+    def batch(self, values):
+        return _rolling(values, self.period, np.std)
+
+    def step(self, value):
+        return float(np.std(self._window)) if self._push(value) else math.nan
+
+
+class PercentRank(Window):
+    """Son değerin kendi penceresindeki yüzdelik sırası (0-1): pencerede ondan küçük ya da eşit olanların oranı"""
+    name = "pctrank"
+
+    def batch(self, values):
+        def rank(windows, axis):
+            return (windows <= windows[..., -1:]).mean(axis=axis)
+        return _rolling(values, self.period, rank)
+
+    def step(self, value):
+        if not self._push(value):
+            return math.nan
+        return sum(1 for item in self._window if item <= value) / self.period
+
+
+class RecursiveMean(Node):
+    """EMA (alpha = 2 / (n + 1)) ya da Wilder/RMA (alpha = 1 / n); ilk değer basit ortalamadır"""
+
+    def __init__(self, name: str, source: str, period: int):
+        self.name = name
+        super().__init__(source, params=(period,))
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if name == "ema" else 1.0 / period
+        self._seed: List[float] = []
+        self._level = math.nan
+
+    def batch(self, values):
+        return _recursive_mean(values, self.alpha, self.period)
+
+    def step(self, value):
+        if math.isnan(value):
+            return self._level
+        if math.isnan(self._level):
+            self._seed.append(value)
+            if len(self._seed) == self.period:
+                self._level = math.fsum(self._seed) / self.period
+                self._seed = []
+            return self._level
+        self._level = (1.0 - self.alpha) * self._level + self.alpha * value
+        return self._level
+
+
+class RSI(Node):
+    name = "rsi"
+
+    def __init__(self, avg_gain: str, avg_loss: str):
+        super().__init__(avg_gain, avg_loss)
+
+    def batch(self, avg_gain, avg_loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        # Kayıp yoksa 100, hiç hareket yoksa 50
+        rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+        return np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi)
+
+    def step(self, avg_gain, avg_loss):
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 50.0 if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class Band(Node):
+    """middle ± multiplier * width"""
+    name = "band"
+
+    def __init__(self, middle: str, width: str, multiplier: float):
+        super().__init__(middle, width, params=(multiplier,))
+        self.multiplier = multiplier
+
+    def batch(self, middle, width):
+        return middle + self.multiplier * width
+
+    def step(self, middle, width):
+        return middle + self.multiplier * width
+
+
+class Graph:
+    """Düğümleri anahtarlarına göre tekilleştirir ve bağımlılık sırasıyla tutar"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+
+    def add(self, node: Node) -> str:
+        # Girdiler eklenmeden düğüm oluşturulamadığından ekleme sırası topolojik sıradır
+        for name in node.inputs:
+            if name not in self.nodes and name not in SOURCE_COLUMNS:
+                raise ValueError(f"Unresolved indicator input: {name}")
+        return self.nodes.setdefault(node.key, node).key
+
+    def tr(self) -> str:
+        return self.add(TrueRange())
+
+    def typical(self) -> str:
+        return self.add(TypicalPrice())
+
+    def sma(self, source: str, period: int) -> str:
+        return self.add(RollingMean(source, period))
+
+    def std(self, source: str, period: int) -> str:
+        return self.add(RollingStd(source, period))
+
+    def ema(self, source: str, period: int) -> str:
+        return self.add(RecursiveMean("ema", source, period))
+
+    def rma(self, source: str, period: int) -> str:
+        return self.add(RecursiveMean("rma", source, period))
+
+    def atr(self, period: int) -> str:
+        # Ortalama, calculate_atr ve ATREngine'deki "sma" yumuşatmayla aynıdır
+        return self.sma(self.tr(), period)
+
+
+def _atr(graph: Graph, period: int = 14) -> Dict[str, str]:
+    return {"atr": graph.atr(period)}
+
+
+def _ema(graph: Graph, period: int = 20) -> Dict[str, str]:
+    return {"ema": graph.ema("close", period)}
+
+
+def _sma(graph: Graph, period: int = 20) -> Dict[str, str]:
+    return {"sma": graph.sma("close", period)}
+
+
+def _rsi(graph: Graph, period: int = 14) -> Dict[str, str]:
+    prev_close = graph.add(PrevClose())
+    avg_gain = graph.rma(graph.add(Change("gain", prev_close)), period)
+    avg_loss = graph.rma(graph.add(Change("loss", prev_close)), period)
+    return {"rsi": graph.add(RSI(avg_gain, avg_loss))}
+
+
+def _bollinger(graph: Graph, period: int = 20, multiplier: float = 2.0) -> Dict[str, str]:
+    middle = graph.sma("close", period)
+    width = graph.std("close", period)
+    return {
+        "middle": middle,
+        "upper": graph.add(Band(middle, width, multiplier)),
+        "lower": graph.add(Band(middle, width, -multiplier)),
+    }
+
+
+def _keltner(graph: Graph, period: int = 20, multiplier: float = 2.0, atr_period: int = 10) -> Dict[str, str]:
+    middle = graph.ema(graph.typical(), period)
+    width = graph.atr(atr_period)
+    return {
+        "middle": middle,
+        "upper": graph.add(Band(middle, width, multiplier)),
+        "lower": graph.add(Band(middle, width, -multiplier)),
+    }
+
+
+def _atr_percentile(graph: Graph, period: int = 14, lookback: int = 100) -> Dict[str, str]:
+    atr = graph.atr(period)
+    return {"atr": atr, "percentile": graph.add(PercentRank(atr, lookback))}
+
+
+# Gösterge adı -> grafiğe düğümlerini ekleyip çıktı alanlarını döndüren kurucu
+INDICATORS: Dict[str, Callable[..., Dict[str, str]]] = {
+    "tr": lambda graph: {"tr": graph.tr()},
+    "typical": lambda graph: {"typical": graph.typical()},
+    "atr": _atr,
+    "sma": _sma,
+    "ema": _ema,
+    "rsi": _rsi,
+    "bollinger": _bollinger,
+    "keltner": _keltner,
+    "atr_percentile": _atr_percentile,
+}
+
+_DEFAULTS = {
+    "atr": (14,), "sma": (20,), "ema": (20,), "rsi": (14,), "bollinger": (20, 2.0),
+    "keltner": (20, 2.0, 10), "atr_percentile": (14, 100),
+}
+
+
+def parse_spec(spec: str) -> Tuple[str, Tuple]:
+    """"keltner:20:1.5:10" -> ("keltner", (20, 1.5, 10)); eksik parametreler varsayılanla tamamlanır"""
+    name, *args = spec.split(":")
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {name}")
+    defaults = _DEFAULTS.get(name, ())
+    if len(args) > len(defaults):
+        raise ValueError(f"Too many parameters for {name}: {spec}")
+    try:
+        params = tuple(type(default)(arg) for default, arg in zip(defaults, args)) + defaults[len(args):]
+    except ValueError:
+        raise ValueError(f"Invalid parameters for {name}: {spec}")
+    if any(param <= 0 for param in params if isinstance(param, int)):
+        raise ValueError(f"Indicator periods must be positive: {spec}")
+    return name, params
+
+
+class IndicatorPipeline:
+    """İstenen gösterge kümesini tek bir bağımlılık grafiğine çözer
+
+    Ortak ara değerler (TR, tipik fiyat, kayan ortalamalar) kümedeki kaç gösterge kullanırsa
+    kullansın bir kez hesaplanır. `evaluate` geçmiş mum dizisini vektörel, `update` yeni kapanan
+    mumu artımlı işler; artımlı durum her pipeline örneğine özeldir.
+    """
+
+    def __init__(self, specs: Sequence[str]):
+        self.specs = tuple(specs)
+        self.graph = Graph()
+        self.outputs: Dict[str, Dict[str, str]] = {}
+        for spec in self.specs:
+            name, params = parse_spec(spec)
+            self.outputs[spec] = INDICATORS[name](self.graph, *params)
+        self.columns = tuple(sorted({name for node in self.graph.nodes.values()
+                                     for name in node.inputs if name in SOURCE_COLUMNS}))
+
+    @property
+    def min_bars(self) -> int:
+        """Tüm göstergelerin ilk değer üretmesi için gereken kapanmış mum sayısı"""
+        # Düğümün ilk geçerli değerinden önce geçen mum sayısı, bağımlılık zinciri boyunca toplanır
+        warmup: Dict[str, int] = {name: 0 for name in SOURCE_COLUMNS}
+        for key, node in self.graph.nodes.items():
+            lag = getattr(node, "period", 1) - 1
+            if isinstance(node, PrevClose):
+                lag = 1
+            warmup[key] = max((warmup[name] for name in node.inputs), default=0) + lag
+        return max(warmup.values()) + 1
+
+    def _collect(self, values: Dict) -> Dict[str, Dict]:
+        return {spec: {field: values[key] for field, key in fields.items()}
+                for spec, fields in self.outputs.items()}
+
+    @timed_indicator("pipeline")
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Mum kolonlarının tamamı için göstergeleri toplu hesaplar"""
+        values: Dict[str, np.ndarray] = {name: np.asarray(columns[name], dtype=np.float64)
+                                         for name in self.columns}
+        for key, node in self.graph.nodes.items():
+            values[key] = node.batch(*(values[name] for name in node.inputs))
+        return self._collect(values)
+
+    def update(self, bar: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        """Kapanan tek mumu işler ve göstergelerin son değerlerini döndürür"""
+        values: Dict[str, float] = {name: float(bar[name]) for name in self.columns}
+        for key, node in self.graph.nodes.items():
+            values[key] = node.step(*(values[name] for name in node.inputs))
+        return self._collect(values)
+
+
+class IndicatorState:
+    """Tek bir sembol/aralık/gösterge kümesi için artımlı durum"""
+
+    def __init__(self, specs: Sequence[str]):
+        self.specs = tuple(specs)
+        self.pipeline = IndicatorPipeline(self.specs)
+        self.last_open_time: Optional[int] = None
+        self.latest: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        self.pipeline = IndicatorPipeline(self.specs)
+        self.last_open_time = None
+        self.latest = {}
+
+
+class IndicatorEngine:
+    """(sembol, aralık, gösterge kümesi) başına artımlı gösterge durumlarını tutar
+
+    İlk çağrıda geçmiş mumlar bir kez işlenir; sonraki çağrılarda yalnızca yeni kapanan mumlar
+    grafiğe uygulanır. ATREngine ile aynı sözleşme: pencerede bilinen son mum yoksa durum baştan kurulur.
+    """
+
+    def __init__(self):
+        self._states: Dict[Tuple[str, str, Tuple[str, ...]], IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def get_state(self, symbol: str, interval: str, specs: Sequence[str]) -> IndicatorState:
+        key = (symbol, interval, tuple(specs))
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = IndicatorState(specs)
+                self._states[key] = state
+            return state
+
+    @timed_indicator("pipeline_ingest")
+    def ingest(self, symbol: str, interval: str, specs: Sequence[str],
+               closed: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+        """Kapanmış mum kolonlarından yeni olanları işler, göstergelerin son değerlerini döndürür"""
+        state = self.get_state(symbol, interval, specs)
+        open_time = closed["open_time"]
+        count = len(open_time)
+        with state.lock:
+            if state.last_open_time is not None and count and int(open_time[0]) > state.last_open_time:
+                state.reset()
+            start = 0
+            if state.last_open_time is not None:
+                start = bisect.bisect_right(open_time, state.last_open_time)
+            columns = [(name, closed[name]) for name in state.pipeline.columns]
+            for i in range(start, count):
+                state.latest = state.pipeline.update({name: column[i] for name, column in columns})
+                state.last_open_time = int(open_time[i])
+            return state.latest
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+indicator_engine = IndicatorEngine()
@@ -0,0 +1,304 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+# Sabit genişlikli kolonlar: ham kline listesindeki indeks ve dosya tipi
+COLUMNS = (
+    ("open_time", 0, np.int64),
+    ("open", 1, np.float64),
+    ("high", 2, np.float64),
+    ("low", 3, np.float64),
+    ("close", 4, np.float64),
+    ("volume", 5, np.float64),
+    ("close_time", 6, np.int64),
+)
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+# Haftalık mumlar Pazartesi 00:00 UTC'de açılır; epoch ise Perşembeye denk gelir
+INTERVAL_OFFSET_MS = {"1w": 4 * 86_400_000}
+
+MAX_KLINES_PER_REQUEST = 1500
+
+
+def next_candle_close(interval: str, now_ms: int) -> int:
+    """now_ms'den sonraki ilk mum kapanışının epoch ms değeri"""
+    interval_ms = INTERVAL_MS[interval]
+    offset = INTERVAL_OFFSET_MS.get(interval, 0)
+    return ((now_ms - offset) // interval_ms + 1) * interval_ms + offset
+
+
+def klines_to_columns(klines: List[List], fields: Optional[Tuple[str, ...]] = None) -> Dict[str, np.ndarray]:
+    """Ham kline listesini kolon dizilerine çevirir; fields verilirse yalnızca o kolonlar"""
+    columns = {}
+    for name, index, dtype in COLUMNS:
+        if fields is None or name in fields:
+            column = np.empty(len(klines), dtype=dtype)
+            column[:] = [k[index] for k in klines]
+            columns[name] = column
+    return columns
+
+
+class KlineDecoder:
+    """Ham kline listesinden istenen kolonları thread başına yeniden kullanılan tamponlara çözer
+
+    12 kolonluk nesne tablosu kurulmaz; her kolon metinden doğrudan float64/int64 tampona yazılır.
+    Dönen diziler aynı thread'deki bir sonraki decode çağrısına kadar geçerlidir.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _buffers(self, size: int) -> Dict[str, np.ndarray]:
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or len(buffers["open_time"]) < size:
+            capacity = max(size, 2 * len(buffers["open_time"]) if buffers else MAX_KLINES_PER_REQUEST)
+            buffers = {name: np.empty(capacity, dtype=dtype) for name, _, dtype in COLUMNS}
+            self._local.buffers = buffers
+        return buffers
+
+    def decode(self, klines: List[List], fields: Optional[Tuple[str, ...]] = None) -> Dict[str, np.ndarray]:
+        count = len(klines)
+        buffers = self._buffers(count)
+        columns = {}
+        for name, index, _ in COLUMNS:
+            if fields is None or name in fields:
+                column = buffers[name][:count]
+                column[:] = [k[index] for k in klines]
+                columns[name] = column
+        return columns
+
+
+kline_decoder = KlineDecoder()
+
+
+class KlineSeries:
+    """Tek sembol/aralık için diske eklemeli yazılan, memmap ile okunan mum serisi"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self._maps: Dict[str, np.memmap] = {}
+        self._mapped_length = -1
+        # Borsa daha eski mum döndürmediyse (sembolün ilk mumu) baş tekrar doldurulmaya çalışılmaz
+        self.head_complete = False
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def __len__(self) -> int:
+        # Yarım kalmış bir yazmada en kısa kolon geçerli uzunluktur
+        sizes = []
+        for name, _, dtype in COLUMNS:
+            path = self._path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes.append(size // np.dtype(dtype).itemsize)
+        return min(sizes)
+
+    def append(self, columns: Dict[str, np.ndarray]):
+        """Kapanmış mumları kolon dosyalarının sonuna ekler"""
+        length = len(self)
+        for name, _, dtype in COLUMNS:
+            path = self._path(name)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(length * np.dtype(dtype).itemsize)
+                f.truncate()
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+    def prepend(self, columns: Dict[str, np.ndarray]):
+        """Daha eski kapanmış mumları serinin başına ekler
+
+        Kolonlar geçici dosyaya yazılıp os.replace ile değiştirilir; önceden dönmüş memmap
+        dilimleri eski dosyayı görmeye devam eder.
+        """
+        existing = {name: np.array(column) for name, column in self.columns().items()}
+        for name, _, dtype in COLUMNS:
+            with open(self._path(name) + ".tmp", "wb") as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+                f.write(existing[name].tobytes())
+        for name, _, _ in COLUMNS:
+            os.replace(self._path(name) + ".tmp", self._path(name))
+        self._maps = {}
+        self._mapped_length = -1
+
+    def truncate(self):
+        for name, _, _ in COLUMNS:
+            path = self._path(name)
+            if os.path.exists(path):
+                os.remove(path)
+        self._maps = {}
+        self._mapped_length = -1
+        self.head_complete = False
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Tüm seriyi salt okunur memmap kolonları olarak döndürür"""
+        length = len(self)
+        if length != self._mapped_length:
+            if length == 0:
+                self._maps = {name: np.empty(0, dtype=dtype) for name, _, dtype in COLUMNS}
+            else:
+                self._maps = {
+                    name: np.memmap(self._path(name), dtype=dtype, mode="r", shape=(length,))
+                    for name, _, dtype in COLUMNS
+                }
+            self._mapped_length = length
+        return self._maps
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        """Son n mumu kopyalamadan dilimler"""
+        return {name: column[-n:] if n else column[:0] for name, column in self.columns().items()}
+
+    def last_open_time(self) -> Optional[int]:
+        open_time = self.columns()["open_time"]
+        return int(open_time[-1]) if len(open_time) else None
+
+
+class KlineStore:
+    """Sembol/aralık başına yerel mum deposu; borsadan yalnızca eksik kuyruğu çeker"""
+
+    def __init__(self, root: str, max_gap_pages: int = 10):
+        self.root = root
+        self.max_gap_pages = max_gap_pages
+        self._series: Dict[Tuple[str, str], KlineSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, symbol: str, interval: str) -> KlineSeries:
+        key = (symbol.upper(), interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = KlineSeries(os.path.join(self.root, key[0], interval))
+                self._series[key] = series
+            return series
+
+    def append_stream_kline(self, symbol: str, interval: str, kline: Dict):
+        """WebSocket'ten gelen kapanmış mumu, seri kesintisizse depoya ekler"""
+        if interval not in INTERVAL_MS:
+            return
+        series = self.series(symbol, interval)
+        with series.lock:
+            last = series.last_open_time()
+            if last is not None and kline["open_time"] == last + INTERVAL_MS[interval]:
+                series.append({
+                    name: np.array([kline[name]], dtype=dtype) for name, _, dtype in COLUMNS
+                })
+
+    def stream_tail(self, symbol: str, interval: str, limit: int,
+                    live_kline: Optional[Dict]) -> Optional[Tuple[Dict[str, np.ndarray], List]]:
+        """Akıştan gelen oluşan mum depoyla bitişikse borsaya gitmeden sonucu döndürür"""
+        if live_kline is None or interval not in INTERVAL_MS:
+            return None
+        series = self.series(symbol, interval)
+        with series.lock:
+            last = series.last_open_time()
+            # Depoda istenen kadar geçmiş yoksa sync başını borsadan tamamlar
+            if (last is not None and live_kline["open_time"] == last + INTERVAL_MS[interval]
+                    and (len(series) >= limit - 1 or series.head_complete)):
+                forming = [live_kline[name] for name, _, _ in COLUMNS]
+                return series.tail(limit - 1), forming
+        return None
+
+    def sync(self, client: "UMFutures", symbol: str, interval: str, limit: int = 100,
+             live_kline: Optional[Dict] = None) -> Tuple[Dict[str, np.ndarray], List]:
+        """Eksik mumları tamamlar; son `limit - 1` kapanmış mum ve oluşan mumu döndürür
+
+        Kuyrukta yalnızca son mumdan bu yana eksik olanlar, başta ise depo `limit`'ten kısaysa
+        yalnızca eksik eski mumlar istenir; istek ağırlığı eksik mum sayısına göre kalır.
+        """
+        streamed = self.stream_tail(symbol, interval, limit, live_kline)
+        if streamed is not None:
+            return streamed
+
+        if interval not in INTERVAL_MS:
+            # Sabit uzunlukta olmayan aralıklar (ör. 1M) depolanmaz
+            klines = client.klines(symbol, interval, limit=limit)
+            return klines_to_columns(klines[:-1]), klines[-1]
+
+        series = self.series(symbol, interval)
+        interval_ms = INTERVAL_MS[interval]
+        with series.lock:
+            now_ms = int(time.time() * 1000)
+            last = series.last_open_time()
+            missing = (now_ms - last) // interval_ms if last is not None else None
+
+            if missing is None or missing > self.max_gap_pages * MAX_KLINES_PER_REQUEST:
+                # Depo boş ya da çok eskimiş: sadece istenen pencereyi çek
+                if last is not None:
+                    logger.info("Kline store for %s %s is stale, resetting", symbol, interval)
+                    series.truncate()
+                klines = client.klines(symbol, interval, limit=limit)
+            else:
+                klines = []
+                start_time = last + 1
+                # Oluşan mum dahil eksik mum sayısı; saat farkına karşı bir mum pay bırakılır
+                remaining = missing + 1
+                while remaining > 0:
+                    page_limit = min(remaining, MAX_KLINES_PER_REQUEST)
+                    page = client.klines(symbol, interval, startTime=start_time, limit=page_limit)
+                    klines.extend(page)
+                    if len(page) < page_limit:
+                        break
+                    remaining -= len(page)
+                    start_time = int(page[-1][0]) + 1
+
+            if not klines:
+                raise ValueError(f"No klines returned for {symbol} {interval}")
+
+            # Son mum henüz oluşuyor kabul edilir ve depoya yazılmaz
+            forming = klines[-1]
+            closed = [k for k in klines[:-1] if int(k[6]) < now_ms]
+            if closed:
+                series.append(kline_decoder.decode(closed))
+
+            self._backfill(client, symbol, interval, series, limit - 1)
+            return series.tail(limit - 1), forming
+
+    def _backfill(self, client: "UMFutures", symbol: str, interval: str, series: KlineSeries, count: int):
+        """Depoda count'tan az kapanmış mum varsa eksik eski mumları başa ekler; series.lock tutulur"""
+        needed = count - len(series)
+        if needed <= 0 or series.head_complete or not len(series):
+            return
+        first = int(series.columns()["open_time"][0])
+        klines = []
+        end_time = first - 1
+        while needed > 0:
+            page_limit = min(needed, MAX_KLINES_PER_REQUEST)
+            page = client.klines(symbol, interval, endTime=end_time, limit=page_limit)
+            page = [k for k in page if int(k[0]) < first]
+            klines[:0] = page
+            if len(page) < page_limit:
+                series.head_complete = True
+                break
+            needed -= len(page)
+            end_time = int(page[0][0]) - 1
+        if klines:
+            series.prepend(kline_decoder.decode(klines))
+
+
+kline_store = KlineStore(settings.kline_store_dir)
@@ -0,0 +1,329 @@
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import PART_RE, log_files_for_day
+
+# "2024-01-01 12:00:00,123 - trading_bot - ERROR - mesaj" ya da
+# {"ts":"2024-01-01 12:00:00,123","level":"ERROR",...} biçimindeki kayıt başlığı
+RECORD_RE = re.compile(
+    rb'^(?:(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - \S+ - ([A-Z]+) - '
+    rb'|\{"ts": ?"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3})", ?"level": ?"([A-Z]+)")'
+)
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+INDEXED_LEVEL = LEVELS["WARNING"]
+BLOCK_SIZE = 64 * 1024
+MAX_RECORD_LINES = 200
+MAX_DAYS = 31
+
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def log_paths(day: date) -> List[str]:
+    """Günün log parçaları, yazılış sırasıyla"""
+    return log_files_for_day(day.strftime('%Y%m%d'))
+
+
+def file_id(path: str) -> Tuple[str, int]:
+    match = PART_RE.search(path)
+    return match.group(1), int(match.group(2) or 0)
+
+
+_minute_epochs: Dict[bytes, int] = {}
+_minute_epochs_lock = threading.Lock()
+
+
+def parse_header(line: bytes, min_level: int = 0) -> Optional[Tuple[int, int]]:
+    """Kayıt başlığından (epoch ms, seviye) döndürür; devam satırlarında ya da min_level altında None"""
+    match = RECORD_RE.match(line)
+    if match is None:
+        return None
+    text_format = match.group(1) is not None
+    level = LEVELS.get(match.group(3 if text_format else 6).decode(), 0)
+    if level < min_level:
+        return None
+    # strptime pahalı; aynı dakikadaki satırlar için epoch önbellekten gelir
+    stamp = match.group(1 if text_format else 4)
+    millis = match.group(2 if text_format else 5)
+    minute = stamp[:16]
+    epoch = _minute_epochs.get(minute)
+    if epoch is None:
+        epoch = int(datetime.strptime(minute.decode(), "%Y-%m-%d %H:%M").timestamp())
+        # Sorgular executor thread'lerinde eşzamanlı çalışır
+        with _minute_epochs_lock:
+            if len(_minute_epochs) > 10_000:
+                _minute_epochs.clear()
+            _minute_epochs[minute] = epoch
+    return (epoch + int(stamp[17:19])) * 1000 + int(millis), level
+
+
+def seek_time(f, size: int, timestamp_ms: int) -> int:
+    """Zamana göre sıralı dosyada timestamp_ms'den sonraki ilk kaydın ofsetini ikili aramayla bulur"""
+    low, high = 0, size
+    while high - low > BLOCK_SIZE:
+        middle = (low + high) // 2
+        f.seek(middle)
+        f.readline()
+        header = None
+        while header is None:
+            line = f.readline()
+            if not line:
+                break
+            header = parse_header(line)
+        if header is None or header[0] > timestamp_ms:
+            high = middle
+        else:
+            low = middle
+    if high >= size:
+        return size
+    # Orta nokta bir satırın içinde kalabilir; kesik kayıt okunmasın diye satır sonuna ilerlenir
+    f.seek(high)
+    f.readline()
+    return min(f.tell(), size)
+
+
+def iter_lines_reverse(f, end: int) -> Iterator[Tuple[int, bytes]]:
+    """Dosyayı sondan bloklar halinde okuyarak (ofset, satır) üretir"""
+    position = end
+    remainder = b""
+    while position > 0:
+        size = min(BLOCK_SIZE, position)
+        position -= size
+        f.seek(position)
+        chunk = f.read(size) + remainder
+        lines = chunk.split(b"\n")
+        # İlk parça bir önceki bloğun devamı olabilir
+        remainder = lines.pop(0)
+        offset = position + len(remainder) + 1
+        line_offsets = []
+        for line in lines:
+            line_offsets.append((offset, line))
+            offset += len(line) + 1
+        for item in reversed(line_offsets):
+            yield item
+    if remainder:
+        yield 0, remainder
+
+
+def iter_records_reverse(f, end: int) -> Iterator[Tuple[int, Optional[Tuple[int, int]], bytes]]:
+    """Devam satırlarını (traceback vb.) başlıklarıyla birleştirip kayıtları sondan üretir"""
+    continuation: List[bytes] = []
+    for offset, line in iter_lines_reverse(f, end):
+        if not line and not continuation:
+            continue
+        header = parse_header(line)
+        if header is None and len(continuation) < MAX_RECORD_LINES:
+            continuation.append(line)
+            continue
+        yield offset, header, b"\n".join([line] + continuation[::-1])
+        continuation = []
+    if continuation:
+        yield 0, None, b"\n".join(continuation[::-1])
+
+
+def tail_lines(paths: List[str], lines: int) -> List[str]:
+    """Dosyaları tamamen okumadan son n satırı döndürür; parçalar sondan başa gezilir"""
+    result: List[bytes] = []
+    for path in reversed(paths):
+        with open(path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            for index, (_, line) in enumerate(iter_lines_reverse(f, end)):
+                # Sondaki yeni satırdan kalan boş parça atlanır
+                if index == 0 and not line:
+                    continue
+                result.append(line)
+                if len(result) >= lines:
+                    break
+        if len(result) >= lines:
+            break
+    return [line.decode(errors="replace") + "\n" for line in reversed(result)]
+
+
+def read_record(f, offset: int) -> bytes:
+    f.seek(offset)
+    lines = [f.readline().rstrip(b"\n")]
+    while len(lines) < MAX_RECORD_LINES:
+        line = f.readline()
+        if not line or parse_header(line) is not None:
+            break
+        lines.append(line.rstrip(b"\n"))
+    return b"\n".join(lines)
+
+
+class LogIndex:
+    """WARNING ve üstü kayıtların bayt ofsetlerini yan dosyada artımlı tutar
+
+    Yan dosya: 8 baytlık taranmış ofset başlığı ve ardından (ofset, epoch ms, seviye) int64 üçlüleri.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        with _index_locks_guard:
+            self.lock = _index_locks.setdefault(self.index_path, threading.Lock())
+
+    def _scanned_upto(self) -> int:
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < 8:
+            return 0
+        with open(self.index_path, "rb") as f:
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    def update(self):
+        """Yalnızca son taramadan sonra eklenen baytları işler"""
+        with self.lock:
+            size = os.path.getsize(self.path)
+            scanned = self._scanned_upto()
+            if size < scanned:
+                # Dosya kesilmiş ya da değiştirilmiş; index baştan kurulur
+                os.remove(self.index_path)
+                scanned = 0
+            if size == scanned:
+                return
+
+            entries = []
+            with open(self.path, "rb") as f:
+                f.seek(scanned)
+                offset = scanned
+                while offset < size:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break  # Yazılmakta olan yarım satır bir sonraki turda işlenir
+                    header = parse_header(line, INDEXED_LEVEL)
+                    if header is not None:
+                        entries.append((offset, header[0], header[1]))
+                    offset += len(line)
+
+            mode = "r+b" if os.path.exists(self.index_path) else "w+b"
+            with open(self.index_path, mode) as f:
+                if mode == "w+b":
+                    f.write(np.int64(0).tobytes())
+                f.seek(0, os.SEEK_END)
+                if entries:
+                    f.write(np.asarray(entries, dtype=np.int64).tobytes())
+                f.seek(0)
+                f.write(np.int64(offset).tobytes())
+
+    def entries(self) -> np.ndarray:
+        self.update()
+        if not os.path.exists(self.index_path):
+            return np.empty((0, 3), dtype=np.int64)
+        return np.fromfile(self.index_path, dtype=np.int64, offset=8).reshape(-1, 3)
+
+
+def _days(day: Optional[date], start: Optional[datetime], end: Optional[datetime],
+          cursor_day: Optional[date] = None) -> List[date]:
+    """Sorgulanacak günleri yeniden eskiye sıralar; cursor varsa arama onun gününden devam eder"""
+    if day is not None:
+        return [day]
+    last = (end or datetime.now()).date()
+    if cursor_day is not None:
+        last = min(last, cursor_day)
+    first = start.date() if start is not None else last
+    first = max(first, last - timedelta(days=MAX_DAYS - 1))
+    return [last - timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def _matches(text: bytes, symbol: Optional[bytes]) -> bool:
+    return symbol is None or symbol in text
+
+
+def _query_file(path: str, upper: Optional[int], min_level: int, start_ms: Optional[int],
+                end_ms: Optional[int], symbol: Optional[bytes], limit: int) -> Tuple[List[Tuple[int, bytes]], bool]:
+    """Tek dosyadan yeniden eskiye en fazla limit kayıt; ikinci değer aralığın başına ulaşıldığını bildirir"""
+    records: List[Tuple[int, bytes]] = []
+    with open(path, "rb") as f:
+        if min_level >= INDEXED_LEVEL:
+            # Index sayesinde sadece WARNING/ERROR kayıtlarına gidilir
+            entries = LogIndex(path).entries()
+            mask = entries[:, 2] >= min_level
+            if upper is not None:
+                mask &= entries[:, 0] < upper
+            if start_ms is not None:
+                mask &= entries[:, 1] >= start_ms
+            if end_ms is not None:
+                mask &= entries[:, 1] <= end_ms
+            for offset, _, _ in entries[mask][::-1]:
+                text = read_record(f, int(offset))
+                if _matches(text, symbol):
+                    records.append((int(offset), text))
+                    if len(records) >= limit:
+                        break
+            return records, False
+
+        end_offset = upper if upper is not None else f.seek(0, os.SEEK_END)
+        if end_ms is not None:
+            # Aralığın sonundan sonraki bölüm hiç okunmaz
+            end_offset = min(end_offset, seek_time(f, end_offset, end_ms))
+        for offset, header, text in iter_records_reverse(f, end_offset):
+            if header is not None:
+                timestamp, record_level = header
+                if start_ms is not None and timestamp < start_ms:
+                    return records, True  # Kayıtlar zamana göre sıralı; daha eskisi aralık dışında
+                if end_ms is not None and timestamp > end_ms:
+                    continue
+                if record_level < min_level:
+                    continue
+            elif min_level:
+                continue
+            if _matches(text, symbol):
+                records.append((offset, text))
+                if len(records) >= limit:
+                    break
+    return records, False
+
+
+def query_logs(day: Optional[date] = None, level: Optional[str] = None, start: Optional[datetime] = None,
+               end: Optional[datetime] = None, symbol: Optional[str] = None, limit: int = 100,
+               cursor: Optional[str] = None) -> Dict:
+    """Seviye, zaman aralığı ve sembole göre kayıtları yeniden eskiye sayfalar
+
+    cursor "YYYYMMDD[_parça]:ofset" biçimindedir ve bir önceki sayfanın en eski kaydını gösterir.
+    """
+    if level and level.upper() not in LEVELS:
+        raise ValueError(f"Unknown log level: {level}")
+    min_level = LEVELS[level.upper()] if level else 0
+    start_ms = int(start.timestamp() * 1000) if start is not None else None
+    end_ms = int(end.timestamp() * 1000) if end is not None else None
+    symbol_bytes = symbol.upper().encode() if symbol else None
+
+    cursor_file, cursor_offset, cursor_day = None, None, None
+    if cursor:
+        cursor_file_text, cursor_offset_text = cursor.split(":")
+        cursor_day_text, _, cursor_part_text = cursor_file_text.partition("_")
+        cursor_file = (cursor_day_text, int(cursor_part_text or 0))
+        cursor_offset = int(cursor_offset_text)
+        # Gün değişse de (gece yarısı) sonraki sayfa cursor'ın gününden okunur
+        cursor_day = datetime.strptime(cursor_day_text, "%Y%m%d").date()
+
+    records: List[Tuple[str, int, bytes]] = []
+    for current_day in _days(day, start, end, cursor_day):
+        reached_start = False
+        for path in reversed(log_paths(current_day)):
+            current_file = file_id(path)
+            if cursor_file is not None and current_file > cursor_file:
+                continue
+            upper = cursor_offset if current_file == cursor_file else None
+            found, reached_start = _query_file(path, upper, min_level, start_ms, end_ms,
+                                               symbol_bytes, limit - len(records))
+            name = os.path.basename(path)[len("trading_"):-len(".log")]
+            records.extend((name, offset, text) for offset, text in found)
+            if len(records) >= limit or reached_start:
+                break
+        if len(records) >= limit or reached_start:
+            break
+
+    next_cursor = None
+    if len(records) >= limit:
+        oldest_file, oldest_offset, _ = records[-1]
+        next_cursor = f"{oldest_file}:{oldest_offset}"
+
+    return {
+        "records": [text.decode(errors="replace") for _, _, text in reversed(records)],
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import websockets
+
+from ..config import STREAM_BASE_URL, settings
+from .executor import market_executor
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+KlineListener = Callable[[str, str, Dict], None]
+
+
+class MarketDataCache:
+    """WebSocket akışından gelen son işaret fiyatlarını ve mumları bellekte tutar"""
+
+    def __init__(self, max_age: float = 5.0):
+        self.max_age = max_age
+        self._mark_prices: Dict[str, Tuple[float, float]] = {}
+        self._klines: Dict[Tuple[str, str], Tuple[Dict, float]] = {}
+        self._listeners: List[KlineListener] = []
+        self._lock = threading.Lock()
+
+    def update_mark_price(self, symbol: str, price: float):
+        with self._lock:
+            self._mark_prices[symbol] = (price, time.monotonic())
+
+    def update_kline(self, symbol: str, interval: str, kline: Dict):
+        with self._lock:
+            self._klines[(symbol, interval)] = (kline, time.monotonic())
+            listeners = list(self._listeners) if kline["closed"] else []
+        for listener in listeners:
+            try:
+                listener(symbol, interval, kline)
+            except Exception as e:
+                logger.error("Kline listener error: %s", e)
+
+    def get_mark_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Taze değilse None döner; çağıran REST'e düşer"""
+        entry = self._mark_prices.get(symbol)
+        if entry is None:
+            return None
+        price, received_at = entry
+        if time.monotonic() - received_at > (self.max_age if max_age is None else max_age):
+            return None
+        return price
+
+    def get_kline(self, symbol: str, interval: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        entry = self._klines.get((symbol, interval))
+        if entry is None:
+            return None
+        kline, received_at = entry
+        if time.monotonic() - received_at > (self.max_age if max_age is None else max_age):
+            return None
+        return kline
+
+    def add_kline_listener(self, listener: KlineListener):
+        """Kapanan her mum için çağrılacak fonksiyonu kaydeder"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_kline_listener(self, listener: KlineListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+class MarketStream:
+    """Mark price ve kline akışlarına abone olan, kopunca geri çekilerek yeniden bağlanan tüketici"""
+
+    def __init__(self, cache: MarketDataCache, symbols: List[str], intervals: List[str],
+                 base_url: str = STREAM_BASE_URL, stale_after: float = 10.0,
+                 min_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.cache = cache
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.intervals = intervals
+        self.base_url = base_url.rstrip("/")
+        self.stale_after = stale_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.last_message_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def url(self) -> str:
+        streams = [f"{symbol.lower()}@markPrice@1s" for symbol in self.symbols]
+        streams += [f"{symbol.lower()}@kline_{interval}" for symbol in self.symbols for interval in self.intervals]
+        return f"{self.base_url}/stream?streams={'/'.join(streams)}"
+
+    def handle_message(self, raw: str):
+        message = json.loads(raw)
+        data = message.get("data", message)
+        event = data.get("e")
+        if event == "markPriceUpdate":
+            self.cache.update_mark_price(data["s"], float(data["p"]))
+        elif event == "kline":
+            k = data["k"]
+            self.cache.update_kline(k["s"], k["i"], {
+                "open_time": int(k["t"]),
+                "close_time": int(k["T"]),
+                "open": float(k["o"]),
+                "high": float(k["h"]),
+                "low": float(k["l"]),
+                "close": float(k["c"]),
+                "volume": float(k["v"]),
+                "closed": bool(k["x"])
+            })
+        self.messages += 1
+        self.last_message_at = time.monotonic()
+
+    async def _consume(self):
+        async with websockets.connect(self.url, ping_interval=20, close_timeout=5) as ws:
+            self.connected = True
+            logger.info("Market stream connected: %s symbols", len(self.symbols))
+            while True:
+                # Belirli süre mesaj gelmezse bağlantı bayat sayılır ve yenilenir
+                raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_after)
+                self.handle_message(raw)
+
+    async def run(self):
+        backoff = self.min_backoff
+        while True:
+            started = time.monotonic()
+            try:
+                await self._consume()
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning("Market stream stale for %ss, reconnecting", self.stale_after)
+            except Exception as e:
+                logger.error("Market stream error: %s", e)
+            finally:
+                self.connected = False
+
+            # Uzun süre ayakta kalmış bağlantıdan sonra geri çekilme sıfırlanır
+            if time.monotonic() - started > self.max_backoff:
+                backoff = self.min_backoff
+            self.reconnects += 1
+            await asyncio.sleep(backoff * (1 + random.random() * 0.2))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict:
+        return {
+            "connected": self.connected,
+            "symbols": self.symbols,
+            "intervals": self.intervals,
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "last_message_age": None if self.last_message_at is None else time.monotonic() - self.last_message_at
+        }
+
+
+market_cache = MarketDataCache(max_age=settings.market_cache_max_age)
+
+
+def create_market_stream() -> Optional[MarketStream]:
+    """STREAM_SYMBOLS tanımlıysa ortam değişkenlerine göre akışı oluşturur"""
+    if not settings.stream_symbols:
+        return None
+    return MarketStream(market_cache, settings.stream_symbols, settings.stream_intervals,
+                        base_url=settings.market_stream_url)
+
+
+def mark_price(client: "UMFutures", symbol: str) -> float:
+    """Önce bellekteki fiyatı, bayatsa REST'i kullanır (senkron yollar için)"""
+    price = market_cache.get_mark_price(symbol)
+    if price is None:
+        price = float(client.mark_price(symbol)['markPrice'])
+    return price
+
+
+async def get_mark_price(client: "UMFutures", symbol: str) -> float:
+    """Önbellek isabetinde thread'e geçmeden döner"""
+    price = market_cache.get_mark_price(symbol)
+    if price is None:
+        price = float((await market_executor.run(client.mark_price, symbol))['markPrice'])
+    return price
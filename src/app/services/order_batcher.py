@@ -0,0 +1,193 @@
+import asyncio
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from .executor import order_executor
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+# /fapi/v1/batchOrders tek çağrıda en fazla 5 emir, iptalde en fazla 10 emir kimliği kabul eder
+MAX_BATCH_ORDERS = 5
+MAX_BATCH_CANCELS = 10
+LIMIT_ORDER_TYPES = ("LIMIT", "TAKE_PROFIT", "STOP")
+
+
+class BracketOrderError(Exception):
+    """TP/SL bacaklarından biri yerleştirilemedi; pozisyon geri alınmaya çalışıldı
+
+    open_legs iptal edilemeyip borsada açık kalan bacaklar, flattened pozisyonun piyasa emriyle
+    kapatılıp kapatılamadığıdır.
+    """
+
+    def __init__(self, message: str, open_legs: Sequence[str] = (), flattened: bool = True):
+        super().__init__(message)
+        self.open_legs = list(open_legs)
+        self.flattened = flattened
+
+
+def _is_error(result: Dict) -> bool:
+    # Toplu uç noktada hatalı emirler {"code": ..., "msg": ...} olarak döner
+    return "code" in result and "orderId" not in result
+
+
+def _client_order_id() -> str:
+    # Borsa en fazla 36 karakter kabul eder; açık emirler arasında tekil olmalı
+    return f"tb{uuid.uuid4().hex}"
+
+
+def _with_client_id(order: Dict) -> Dict:
+    return order if order.get("newClientOrderId") else {**order, "newClientOrderId": _client_order_id()}
+
+
+def _batch_params(order: Dict) -> Dict:
+    """Toplu emir gövdesi yalnızca metin değer kabul eder"""
+    params = {key: str(value).lower() if isinstance(value, bool) else str(value)
+              for key, value in order.items() if value is not None}
+    if params.get("type") in LIMIT_ORDER_TYPES:
+        params.setdefault("timeInForce", "GTC")
+    return params
+
+
+async def _reconcile_chunk(client: "UMFutures", orders: List[Dict]) -> List[Dict]:
+    """Sonucu bilinmeyen parçanın emirlerini açık emirlerde clientOrderId ile arar
+
+    Bulunamayan emir hata olarak döner; yeniden denemede aynı clientOrderId kullanıldığından geç
+    ulaşan istek ile yeniden deneme ikinci bir emir açamaz.
+    """
+    placed: Dict[str, Dict] = {}
+    try:
+        for symbol in dict.fromkeys(order["symbol"] for order in orders):
+            for order in await order_executor.run(client.get_orders, symbol=symbol):
+                placed[order.get("clientOrderId")] = order
+    except Exception as e:
+        logger.error("Open order reconciliation failed: %s", e)
+    return [placed.get(order["newClientOrderId"]) or
+            {"code": None, "msg": "Batch order request timed out and the order is not open",
+             "clientOrderId": order["newClientOrderId"]}
+            for order in orders]
+
+
+async def submit_order(client: "UMFutures", **params) -> Dict:
+    """Tekil emri clientOrderId ile gönderir; zaman aşımında emri borsada sorgular
+
+    Zaman aşımına uğrayan istek borsaya yine de ulaşmış (MARKET emri dolmuş) olabilir. Emir
+    clientOrderId ile bulunursa sonucu döner; bulunamazsa TimeoutError yükselir.
+    """
+    params = _with_client_id(params)
+    try:
+        return await order_executor.run(client.new_order, **params)
+    except TimeoutError as e:
+        client_order_id = params["newClientOrderId"]
+        logger.error("Order request timed out, querying %s: %s", client_order_id, e)
+        try:
+            order = await order_executor.run(client.query_order, symbol=params["symbol"],
+                                             origClientOrderId=client_order_id)
+        except Exception as query_error:
+            logger.error("Order %s not found after timeout: %s", client_order_id, query_error)
+            raise e
+        logger.warning("Order %s reached the exchange after the timeout: %s", client_order_id, order.get("status"))
+        return order
+
+
+async def _place_chunk(client: "UMFutures", orders: List[Dict]) -> List[Dict]:
+    orders = [_with_client_id(order) for order in orders]
+    try:
+        return await order_executor.run(client.new_batch_order, [_batch_params(order) for order in orders])
+    except TimeoutError as e:
+        # İstek borsaya ulaşmış olabilir; emirler reddedildi sayılıp yeniden gönderilmeden önce uzlaştırılır
+        logger.error("Batch order request timed out, reconciling with open orders: %s", e)
+        return await _reconcile_chunk(client, orders)
+    except Exception as e:
+        # Tüm parça reddedildi; her emre aynı hata yazılır
+        logger.error("Batch order request failed: %s", e)
+        return [{"code": getattr(e, "error_code", None), "msg": str(e)} for _ in orders]
+
+
+async def place_orders(client: "UMFutures", orders: List[Dict]) -> List[Dict]:
+    """Emirleri 5'lik parçalar halinde eşzamanlı gönderir; sonuçlar giriş sırasıyla döner"""
+    chunks = [orders[i:i + MAX_BATCH_ORDERS] for i in range(0, len(orders), MAX_BATCH_ORDERS)]
+    results = await asyncio.gather(*(_place_chunk(client, chunk) for chunk in chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+
+async def _cancel_symbol(client: "UMFutures", symbol: str, order_ids: Optional[List[int]]) -> List[Dict]:
+    if not order_ids:
+        try:
+            result = await order_executor.run(client.cancel_open_orders, symbol=symbol)
+            return [{"symbol": symbol, **result}]
+        except Exception as e:
+            logger.error("Cancel all orders failed for %s: %s", symbol, e)
+            return [{"symbol": symbol, "code": getattr(e, "error_code", None), "msg": str(e)}]
+
+    chunks = [order_ids[i:i + MAX_BATCH_CANCELS] for i in range(0, len(order_ids), MAX_BATCH_CANCELS)]
+
+    async def cancel_chunk(chunk: List[int]) -> List[Dict]:
+        try:
+            return await order_executor.run(client.cancel_batch_order, symbol=symbol,
+                                            orderIdList=chunk, origClientOrderIdList=None)
+        except Exception as e:
+            logger.error("Batch cancel failed for %s: %s", symbol, e)
+            return [{"symbol": symbol, "orderId": order_id, "code": getattr(e, "error_code", None), "msg": str(e)}
+                    for order_id in chunk]
+
+    results = await asyncio.gather(*(cancel_chunk(chunk) for chunk in chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+
+async def cancel_orders(client: "UMFutures", cancellations: Dict[str, Optional[List[int]]]) -> Dict[str, List[Dict]]:
+    """Sembol başına emir kimliklerini iptal eder; kimlik verilmeyen sembolde tüm açık emirler iptal edilir"""
+    symbols = list(cancellations)
+    results = await asyncio.gather(*(_cancel_symbol(client, symbol, cancellations[symbol]) for symbol in symbols))
+    return dict(zip(symbols, results))
+
+
+async def place_bracket(client: "UMFutures", symbol: str, quantity: float, take_profit: float,
+                        stop_loss: float, close_side: str = "SELL") -> Dict[str, Dict]:
+    """TP ve SL bacaklarını tek toplu çağrıda gönderir, kısmi hatayı uzlaştırır"""
+    legs = {
+        "take_profit": {"symbol": symbol, "side": close_side, "type": "TAKE_PROFIT_MARKET",
+                        "quantity": quantity, "stopPrice": take_profit, "reduceOnly": True,
+                        "newClientOrderId": _client_order_id()},
+        "stop_loss": {"symbol": symbol, "side": close_side, "type": "STOP_MARKET",
+                      "quantity": quantity, "stopPrice": stop_loss, "reduceOnly": True,
+                      "newClientOrderId": _client_order_id()},
+    }
+    names = list(legs)
+    results = dict(zip(names, await place_orders(client, [legs[name] for name in names])))
+
+    failed = [name for name in names if _is_error(results[name])]
+    for name in failed:
+        # Reddedilen bacak bir kez tekil emirle, aynı clientOrderId ile yeniden denenir
+        logger.warning("Bracket %s leg rejected for %s: %s, retrying", name, symbol, results[name].get("msg"))
+        try:
+            results[name] = await submit_order(client, **_batch_params(legs[name]))
+        except Exception as e:
+            results[name] = {"code": getattr(e, "error_code", None), "msg": str(e)}
+
+    failed = [name for name in names if _is_error(results[name])]
+    if not failed:
+        logger.info("Bracket placed for %s - TP: %s, SL: %s", symbol, take_profit, stop_loss)
+        return results
+
+    # Korumasız pozisyon bırakılmaz: kalan bacak iptal edilir, pozisyon piyasa emriyle kapatılır
+    logger.error("Bracket failed for %s (%s), rolling back", symbol, ", ".join(failed))
+    placed = [name for name in names if name not in failed]
+    open_legs = []
+    if placed:
+        cancelled = (await cancel_orders(client, {symbol: [results[name]["orderId"] for name in placed]}))[symbol]
+        open_legs = [name for name, result in zip(placed, cancelled) if result.get("status") != "CANCELED"]
+    try:
+        await submit_order(client, symbol=symbol, side=close_side, type="MARKET",
+                           quantity=quantity, reduceOnly="true")
+        flattened = True
+    except Exception as e:
+        logger.error("Closing %s after failed bracket failed: %s", symbol, e)
+        flattened = False
+
+    message = (f"{', '.join(failed)} rejected: {results[failed[0]].get('msg')}; "
+               f"open legs: {', '.join(open_legs) or 'none'}; "
+               f"position {'closed' if flattened else 'NOT closed'}")
+    logger.error("Bracket rollback for %s: %s", symbol, message)
+    raise BracketOrderError(message, open_legs=open_legs, flattened=flattened)
@@ -0,0 +1,412 @@
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from ..config import settings
+from .backtest import DEFAULT_FEE_RATE
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+CONDITIONAL_ORDER_TYPES = ("TAKE_PROFIT_MARKET", "STOP_MARKET")
+
+
+@functools.lru_cache(maxsize=None)
+def _client_error() -> type:
+    """binance paketi ağır; hata sınıfı ilk reddedilen emirde yüklenir"""
+    from binance.error import ClientError
+    return ClientError
+
+
+def _reject(error_code: int, message: str):
+    # Gerçek borsadaki gibi ClientError; çağıranlar error_code'a göre davranabilir
+    raise _client_error()(400, error_code, message, {})
+
+
+def _flag(value) -> bool:
+    return str(value).lower() == "true"
+
+
+class PaperPosition:
+    def __init__(self, symbol: str, leverage: int):
+        self.symbol = symbol
+        self.leverage = leverage
+        self.margin_type = "CROSSED"
+        self.amount = 0.0
+        self.entry_price = 0.0
+        self.update_time = 0
+
+
+class PaperExchange:
+    """UMFutures'un bot tarafından kullanılan yüzeyini yerel eşleştirme motoruyla taklit eder
+
+    MARKET emirleri anında işaret fiyatından dolar; TAKE_PROFIT_MARKET ve STOP_MARKET emirleri
+    update_price/replay ile oynatılan fiyatlara göre tetiklenir. Tek yönlü pozisyon modu, cross
+    marjin ve taker ücreti varsayılır. market_data verilirse kline gibi emir dışı çağrılar ona
+    yönlendirilir ve işaret fiyatı oradan beslenir.
+    """
+
+    def __init__(self, balance: float = 10_000.0, fee_rate: float = DEFAULT_FEE_RATE,
+                 leverage: int = 20, market_data: Optional["UMFutures"] = None, asset: str = "USDT"):
+        self.asset = asset
+        self.wallet_balance = balance
+        self.fee_rate = fee_rate
+        self.default_leverage = leverage
+        self.market_data = market_data
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self._prices: Dict[str, float] = {}
+        self._filters: Dict[str, Dict[str, str]] = {}
+        self._positions: Dict[str, PaperPosition] = {}
+        self._orders: Dict[int, Dict] = {}
+        # Dolan/iptal edilenler dahil kabul edilen tüm emirler (query_order için)
+        self._all_orders: Dict[int, Dict] = {}
+        self._fills: List[Dict] = []
+        self._next_order_id = 1
+        self._clock: Optional[int] = None
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        # Emir ve hesap dışındaki uç noktalar (klines, time...) gerçek piyasa verisinden gelir
+        market_data = self.__dict__.get("market_data")
+        if market_data is None:
+            raise AttributeError(f"PaperExchange does not implement {name}")
+        return getattr(market_data, name)
+
+    # Sembol ve fiyat ---------------------------------------------------------------------
+
+    def add_symbol(self, symbol: str, tick_size: str = "0.1", step_size: str = "0.001",
+                   min_notional: str = "5"):
+        self._filters[symbol] = {"tick_size": tick_size, "step_size": step_size, "min_notional": min_notional}
+
+    def _now(self) -> int:
+        return self._clock if self._clock is not None else int(time.time() * 1000)
+
+    def _position(self, symbol: str) -> PaperPosition:
+        position = self._positions.get(symbol)
+        if position is None:
+            position = self._positions[symbol] = PaperPosition(symbol, self.default_leverage)
+        return position
+
+    def _refresh(self, symbol: Optional[str]):
+        """Canlı modda işaret fiyatını piyasa verisinden çekip eşleştirmeye besler"""
+        if self.market_data is None or symbol is None:
+            return
+        self.update_price(symbol, float(self.market_data.mark_price(symbol)["markPrice"]))
+
+    def _price(self, symbol: str) -> float:
+        price = self._prices.get(symbol)
+        if price is None:
+            _reject(-1121, "Invalid symbol.")
+        return price
+
+    def update_price(self, symbol: str, price: float, timestamp: Optional[int] = None):
+        """Tek bir işaret fiyatı tiki"""
+        self.process_bar(symbol, price, price, price, price, timestamp)
+
+    def process_bar(self, symbol: str, open_: float, high: float, low: float, close: float,
+                    timestamp: Optional[int] = None) -> List[Dict]:
+        """Bir mum boyunca tetiklenen koşullu emirleri doldurur; dolumları döndürür
+
+        Aynı mumda hem TP hem SL tetiklenirse backtest ile aynı şekilde önce SL kabul edilir.
+        Fiyat tetik seviyesini boşlukla geçtiyse dolum açılış fiyatından olur.
+        """
+        with self._lock:
+            if timestamp is not None:
+                self._clock = int(timestamp)
+            if symbol not in self._filters:
+                self.add_symbol(symbol)
+            self._prices[symbol] = open_
+            fills = []
+            pending = [order for order in self._orders.values() if order["symbol"] == symbol]
+            # SL'ler önce işlenir
+            pending.sort(key=lambda order: order["type"] != "STOP_MARKET")
+            for order in pending:
+                if order["orderId"] not in self._orders:
+                    continue  # Önceki dolumla pozisyon kapanıp iptal edildi
+                trigger = float(order["stopPrice"])
+                buy = order["side"] == "BUY"
+                stop = order["type"] == "STOP_MARKET"
+                # SELL SL ve BUY TP fiyat düşünce, diğerleri fiyat yükselince tetiklenir
+                falling = stop != buy
+                if falling and low <= trigger:
+                    fill_price = min(open_, trigger)
+                elif not falling and high >= trigger:
+                    fill_price = max(open_, trigger)
+                else:
+                    continue
+                del self._orders[order["orderId"]]
+                if self._fill(order, fill_price)["status"] == "FILLED":
+                    fills.append(order)
+            self._prices[symbol] = close
+            return fills
+
+    def replay(self, symbol: str, klines: Sequence[Sequence]) -> List[Dict]:
+        """Ham kline listesini sırayla oynatır"""
+        fills = []
+        for kline in klines:
+            fills.extend(self.process_bar(symbol, float(kline[1]), float(kline[2]), float(kline[3]),
+                                          float(kline[4]), int(kline[6])))
+        return fills
+
+    # Eşleştirme ve hesap ------------------------------------------------------------------
+
+    def _fill(self, order: Dict, price: float) -> Dict:
+        position = self._position(order["symbol"])
+        signed = float(order["origQty"]) * (1 if order["side"] == "BUY" else -1)
+        if order["reduceOnly"]:
+            # Reduce-only emir pozisyonu asla büyütmez ya da ters çevirmez
+            if position.amount == 0 or (signed > 0) == (position.amount > 0):
+                order.update(status="EXPIRED", executedQty="0")
+                return order
+            signed = max(-abs(position.amount), min(abs(position.amount), signed))
+
+        realized = 0.0
+        if position.amount and (signed > 0) != (position.amount > 0):
+            closed = min(abs(signed), abs(position.amount))
+            direction = 1 if position.amount > 0 else -1
+            realized = (price - position.entry_price) * closed * direction
+        new_amount = position.amount + signed
+        if new_amount == 0 or position.amount == 0 or (new_amount > 0) != (position.amount > 0):
+            position.entry_price = price if new_amount else 0.0
+        elif (signed > 0) == (position.amount > 0):
+            position.entry_price = (position.entry_price * abs(position.amount) + price * abs(signed)) / abs(new_amount)
+        position.amount = round(new_amount, 12)
+        position.update_time = self._now()
+
+        fee = abs(signed) * price * self.fee_rate
+        self.wallet_balance += realized - fee
+        self.realized_pnl += realized
+        self.fees_paid += fee
+        order.update(status="FILLED", executedQty=str(abs(signed)), avgPrice=str(price), updateTime=self._now())
+        self._fills.append({"orderId": order["orderId"], "symbol": order["symbol"], "side": order["side"],
+                            "price": price, "qty": abs(signed), "realizedPnl": realized, "commission": fee,
+                            "time": self._now()})
+
+        if position.amount == 0:
+            # Pozisyon kapanınca kalan reduce-only emirler düşer
+            for order_id in [oid for oid, o in self._orders.items()
+                             if o["symbol"] == order["symbol"] and o["reduceOnly"]]:
+                self._orders.pop(order_id)["status"] = "EXPIRED"
+        return order
+
+    def _unrealized(self) -> float:
+        return sum((self._prices.get(p.symbol, p.entry_price) - p.entry_price) * p.amount
+                   for p in self._positions.values() if p.amount)
+
+    def _initial_margin(self) -> float:
+        return sum(abs(p.amount) * self._prices.get(p.symbol, p.entry_price) / p.leverage
+                   for p in self._positions.values() if p.amount)
+
+    def _available(self) -> float:
+        return self.wallet_balance + self._unrealized() - self._initial_margin()
+
+    # UMFutures yüzeyi ---------------------------------------------------------------------
+
+    def new_order(self, symbol: str, side: str, type: str, quantity=None, stopPrice=None,
+                  reduceOnly=None, closePosition=None, newClientOrderId=None, **kwargs) -> Dict:
+        self._refresh(symbol)
+        with self._lock:
+            price = self._price(symbol)
+            position = self._position(symbol)
+            if newClientOrderId and any(order["clientOrderId"] == newClientOrderId for order in self._orders.values()):
+                _reject(-4116, "ClientOrderId is duplicated.")
+            if _flag(closePosition):
+                quantity = abs(position.amount)
+                reduceOnly = True
+            if quantity is None or float(quantity) <= 0:
+                _reject(-4003, "Quantity less than or equal to zero.")
+            order = {
+                "orderId": self._next_order_id,
+                "clientOrderId": newClientOrderId or f"paper{self._next_order_id}",
+                "symbol": symbol,
+                "side": side,
+                "type": type,
+                "origQty": str(float(quantity)),
+                "executedQty": "0",
+                "avgPrice": "0",
+                "stopPrice": str(stopPrice) if stopPrice is not None else "0",
+                "reduceOnly": _flag(reduceOnly),
+                "status": "NEW",
+                "updateTime": self._now(),
+            }
+
+            if type == "MARKET":
+                signed = float(quantity) * (1 if side == "BUY" else -1)
+                increases = position.amount == 0 or (signed > 0) == (position.amount > 0)
+                if increases and not order["reduceOnly"]:
+                    required = abs(signed) * price / position.leverage + abs(signed) * price * self.fee_rate
+                    if required > self._available():
+                        _reject(-2019, "Margin is insufficient.")
+                self._next_order_id += 1
+                self._all_orders[order["orderId"]] = order
+                return dict(self._fill(order, price))
+
+            if type in CONDITIONAL_ORDER_TYPES:
+                if stopPrice is None:
+                    _reject(-1102, "Mandatory parameter 'stopPrice' was not sent.")
+                trigger = float(stopPrice)
+                falling = (type == "STOP_MARKET") != (side == "BUY")
+                if (falling and price <= trigger) or (not falling and price >= trigger):
+                    _reject(-2021, "Order would immediately trigger.")
+                self._next_order_id += 1
+                self._orders[order["orderId"]] = self._all_orders[order["orderId"]] = order
+                return dict(order)
+
+            _reject(-1116, "Invalid orderType.")
+
+    def new_batch_order(self, batchOrders: List[Dict]) -> List[Dict]:
+        results = []
+        for params in batchOrders:
+            try:
+                results.append(self.new_order(**params))
+            except _client_error() as e:
+                results.append({"code": e.error_code, "msg": e.error_message})
+        return results
+
+    def cancel_order(self, symbol: str, orderId: int = None, **kwargs) -> Dict:
+        with self._lock:
+            order = self._orders.get(int(orderId)) if orderId is not None else None
+            if order is None or order["symbol"] != symbol:
+                _reject(-2011, "Unknown order sent.")
+            del self._orders[order["orderId"]]
+            order["status"] = "CANCELED"
+            return dict(order)
+
+    def cancel_batch_order(self, symbol: str, orderIdList: List[int], origClientOrderIdList=None,
+                           **kwargs) -> List[Dict]:
+        results = []
+        for order_id in orderIdList:
+            try:
+                results.append(self.cancel_order(symbol, order_id))
+            except _client_error() as e:
+                results.append({"code": e.error_code, "msg": e.error_message})
+        return results
+
+    def cancel_open_orders(self, symbol: str, **kwargs) -> Dict:
+        with self._lock:
+            for order_id in [oid for oid, order in self._orders.items() if order["symbol"] == symbol]:
+                self._orders.pop(order_id)["status"] = "CANCELED"
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def query_order(self, symbol: str, orderId: int = None, origClientOrderId: str = None, **kwargs) -> Dict:
+        with self._lock:
+            for order in reversed(list(self._all_orders.values())):
+                if order["symbol"] == symbol and (
+                        (orderId is not None and order["orderId"] == int(orderId)) or
+                        (origClientOrderId is not None and order["clientOrderId"] == origClientOrderId)):
+                    return dict(order)
+        _reject(-2013, "Order does not exist.")
+
+    def get_orders(self, symbol: Optional[str] = None, **kwargs) -> List[Dict]:
+        with self._lock:
+            return [dict(order) for order in self._orders.values() if symbol is None or order["symbol"] == symbol]
+
+    def mark_price(self, symbol: Optional[str] = None, **kwargs):
+        self._refresh(symbol)
+        with self._lock:
+            if symbol is None:
+                return [{"symbol": s, "markPrice": str(p), "time": self._now()} for s, p in self._prices.items()]
+            return {"symbol": symbol, "markPrice": str(self._price(symbol)), "time": self._now()}
+
+    def exchange_info(self, **kwargs) -> Dict:
+        with self._lock:
+            symbols = [{
+                "symbol": symbol,
+                "status": "TRADING",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": f["tick_size"], "minPrice": f["tick_size"],
+                     "maxPrice": "10000000"},
+                    {"filterType": "LOT_SIZE", "stepSize": f["step_size"], "minQty": f["step_size"],
+                     "maxQty": "100000"},
+                    {"filterType": "MIN_NOTIONAL", "notional": f["min_notional"]},
+                ],
+            } for symbol, f in self._filters.items()]
+        return {"serverTime": self._now(), "symbols": symbols}
+
+    def balance(self, **kwargs) -> List[Dict]:
+        with self._lock:
+            unrealized = self._unrealized()
+            return [{
+                "asset": self.asset,
+                "balance": str(self.wallet_balance),
+                "crossWalletBalance": str(self.wallet_balance),
+                "crossUnPnl": str(unrealized),
+                "availableBalance": str(self._available()),
+                "updateTime": self._now(),
+            }]
+
+    def get_position_risk(self, symbol: Optional[str] = None, **kwargs) -> List[Dict]:
+        with self._lock:
+            return [{
+                "symbol": p.symbol,
+                "positionSide": "BOTH",
+                "positionAmt": str(p.amount),
+                "entryPrice": str(p.entry_price),
+                "markPrice": str(self._prices.get(p.symbol, p.entry_price)),
+                "unRealizedProfit": str((self._prices.get(p.symbol, p.entry_price) - p.entry_price) * p.amount),
+                "leverage": str(p.leverage),
+                "marginType": p.margin_type,
+                "updateTime": p.update_time,
+            } for p in self._positions.values() if p.amount and (symbol is None or p.symbol == symbol)]
+
+    def account(self, **kwargs) -> Dict:
+        with self._lock:
+            unrealized = self._unrealized()
+            return {
+                "totalWalletBalance": str(self.wallet_balance),
+                "totalUnrealizedProfit": str(unrealized),
+                "totalMarginBalance": str(self.wallet_balance + unrealized),
+                "totalInitialMargin": str(self._initial_margin()),
+                "availableBalance": str(self._available()),
+                "assets": self.balance(),
+                "positions": self.get_position_risk(),
+            }
+
+    def change_leverage(self, symbol: str, leverage: int, **kwargs) -> Dict:
+        with self._lock:
+            self._position(symbol).leverage = int(leverage)
+        return {"symbol": symbol, "leverage": int(leverage), "maxNotionalValue": "1000000"}
+
+    def change_margin_type(self, symbol: str, marginType: str, **kwargs) -> Dict:
+        with self._lock:
+            self._position(symbol).margin_type = marginType
+        return {"code": 200, "msg": "success"}
+
+    def time(self) -> Dict:
+        return {"serverTime": self._now()}
+
+    def summary(self) -> Dict:
+        """Oturum sonucu: bakiye, gerçekleşen/gerçekleşmeyen PnL, ücretler ve dolumlar"""
+        with self._lock:
+            return {
+                "wallet_balance": self.wallet_balance,
+                "realized_pnl": self.realized_pnl,
+                "unrealized_pnl": self._unrealized(),
+                "fees": self.fees_paid,
+                "open_orders": len(self._orders),
+                "fills": list(self._fills),
+            }
+
+
+_paper_exchange: Optional[PaperExchange] = None
+_paper_lock = threading.Lock()
+
+
+def paper_exchange(market_data: Optional["UMFutures"] = None) -> PaperExchange:
+    """API için süreç genelinde tek kağıt hesap; fiyatlar market_data istemcisinden gelir"""
+    global _paper_exchange
+    with _paper_lock:
+        if _paper_exchange is None:
+            _paper_exchange = PaperExchange(
+                balance=settings.paper_balance,
+                fee_rate=settings.paper_fee_rate,
+                leverage=settings.paper_leverage,
+                market_data=market_data,
+            )
+            logger.info("Paper trading backend enabled with %s %s", _paper_exchange.wallet_balance,
+                        _paper_exchange.asset)
+        return _paper_exchange
@@ -0,0 +1,295 @@
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from ..config import settings
+from ..utils.json_response import encode_json
+from ..utils.logger import logger
+from .account_state import account_state, get_positions
+from .atr_calculator import get_atr_signals_cached
+from .kline_store import INTERVAL_MS, next_candle_close
+from .market_stream import market_cache
+from .rate_limiter import DIAGNOSTIC, exchange_priority
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+def topic_name(name: str) -> str:
+    """Konu adını tekilleştirir: sembol büyük harfe çevrilir, ATR periyodu verilmemişse 14 eklenir"""
+    kind, *args = name.strip().split(":")
+    if args:
+        args[0] = args[0].upper()
+    if kind == "atr" and len(args) == 2:
+        args.append("14")
+    return ":".join([kind, *args])
+
+
+class Subscriber:
+    """Bir bağlantının (SSE ya da WebSocket) sınırlı mesaj kuyruğu
+
+    Kuyruk dolduğunda bekleyen mesajlar atılır, yerine abone olunan konuların güncel anlık
+    görüntüleri konur. Yavaş istemci ara değişiklikleri kaçırır ama tutarlı duruma döner; sunucu
+    onun için sınırsız mesaj biriktirmez ve diğer abonelere yayını bekletmez.
+    """
+
+    def __init__(self, hub: "PushHub", maxsize: int = 64):
+        self.hub = hub
+        self.maxsize = maxsize
+        self.topics: Dict[str, "Topic"] = {}
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    def put(self, message: str, control: bool = False):
+        """Kontrol mesajları (abonelik yanıtları) atılmaz"""
+        if not control and len(self._queue) >= self.maxsize:
+            self.dropped += len(self._queue)
+            self.resyncs += 1
+            self.hub.dropped += len(self._queue)
+            self._queue.clear()
+            # Konunun durumu yayından önce güncellendiği için anlık görüntü bu mesajı da kapsar
+            for topic in self.topics.values():
+                snapshot = topic.snapshot()
+                if snapshot is not None:
+                    self._queue.append(snapshot)
+        else:
+            self._queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Sıradaki mesaj; timeout içinde mesaj yoksa None (kalp atışı için)"""
+        while not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self.sent += 1
+        return self._queue.popleft()
+
+
+class Topic:
+    """Tek bir hesaplamanın sonucunu tüm abonelerine dağıtan konu
+
+    Durum alan başına bir kez JSON'a kodlanır; değişen alanlar tek bir delta mesajında toplanır ve
+    aynı metin her aboneye gönderilir. Yeni abone önce son anlık görüntüyü alır.
+    """
+
+    def __init__(self, name: str, producer: Callable[[], Awaitable[Dict]], wait_time: Callable[[], float],
+                 wake_key: Tuple):
+        self.name = name
+        self.producer = producer
+        self.wait_time = wait_time
+        # Bu anahtarla gelen piyasa/hesap olayı hesaplamayı beklemeden tetikler
+        self.wake_key = wake_key
+        self.wake = asyncio.Event()
+        self.subscribers: Set[Subscriber] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.state: Dict[str, str] = {}
+        self.version = 0
+        self.computations = 0
+        self.errors = 0
+        self._snapshot: Optional[str] = None
+
+    def _message(self, kind: str, fields: Dict[str, str]) -> str:
+        data = ",".join(f"{encode_json(key)}:{value}" for key, value in fields.items())
+        return (f'{{"type":"{kind}","topic":{encode_json(self.name)},'
+                f'"version":{self.version},"data":{{{data}}}}}')
+
+    def snapshot(self) -> Optional[str]:
+        if not self.version:
+            return None
+        if self._snapshot is None:
+            self._snapshot = self._message("snapshot", self.state)
+        return self._snapshot
+
+    def publish(self, value: Dict) -> bool:
+        """Değişen alan varsa delta yayınlar; yoksa hiçbir aboneye mesaj gitmez"""
+        encoded = {key: encode_json(item) for key, item in value.items()}
+        delta = {key: item for key, item in encoded.items() if self.state.get(key) != item}
+        for key in self.state:
+            if key not in encoded:
+                delta[key] = "null"
+        if not delta:
+            return False
+        first = not self.version
+        self.state = encoded
+        self.version += 1
+        self._snapshot = None
+        message = self.snapshot() if first else self._message("delta", delta)
+        for subscriber in list(self.subscribers):
+            subscriber.put(message)
+        return True
+
+
+class PushHub:
+    """Konu başına tek hesaplama ve sınırlı kuyruklu abonelerle sunucudan istemciye yayın
+
+    Konular:
+        atr:<SYMBOL>:<interval>[:<period>]  ATR, TP/SL seviyeleri ve volatilite durumu
+        positions:<SYMBOL>                  sembolün pozisyonları
+
+    Hesaplama mum kapanışında ya da hesap olayında tetiklenir; arada fiyata bağlı alanlar
+    `refresh_interval` saniyede bir yenilenir ve yalnızca değişiklik varsa yayınlanır. Sunucu yükü
+    bağlı tarayıcı sayısıyla değil konu sayısı ve piyasa olaylarıyla büyür.
+    """
+
+    def __init__(self, queue_size: int = 64, refresh_interval: float = 5.0, close_delay: float = 1.0,
+                 max_topics: int = 256):
+        self.queue_size = queue_size
+        self.refresh_interval = refresh_interval
+        self.close_delay = close_delay
+        self.max_topics = max_topics
+        self.topics: Dict[str, Topic] = {}
+        self.connections = 0
+        self.published = 0
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _listen(self):
+        """Piyasa ve hesap olay dinleyicileri ilk abonelikte kaydedilir"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        market_cache.add_kline_listener(self._on_kline)
+        account_state.add_listener(self._on_account)
+
+    def _wake(self, wake_key: Tuple):
+        for topic in list(self.topics.values()):
+            if topic.wake_key == wake_key:
+                self._loop.call_soon_threadsafe(topic.wake.set)
+
+    def _on_kline(self, symbol: str, interval: str, kline: Dict):
+        self._wake(("kline", symbol, interval))
+
+    def _on_account(self):
+        self._wake(("account",))
+
+    def _create_topic(self, name: str, client: "UMFutures") -> Topic:
+        kind, *args = name.split(":")
+        if kind == "atr" and len(args) == 3:
+            symbol, interval = args[0], args[1]
+            if interval not in INTERVAL_MS or not args[2].isdigit() or int(args[2]) < 1:
+                raise ValueError(f"Invalid ATR topic: {name}")
+            period = int(args[2])
+
+            def until_close() -> float:
+                now = time.time()
+                close = next_candle_close(interval, int(now * 1000)) / 1000 + self.close_delay
+                return max(min(self.refresh_interval, close - now), 0.0)
+
+            return Topic(name, lambda: get_atr_signals_cached(client, symbol, interval, period),
+                         until_close, ("kline", symbol, interval))
+        if kind == "positions" and len(args) == 1:
+            symbol = args[0]
+
+            async def positions() -> Dict:
+                # Arayüz beslemesi; emirlerin ve piyasa verisinin bütçesini kullanmaz
+                with exchange_priority(DIAGNOSTIC):
+                    return {"symbol": symbol, "positions": await get_positions(client, symbol)}
+
+            return Topic(name, positions, lambda: self.refresh_interval, ("account",))
+        raise ValueError(f"Unknown topic: {name}")
+
+    def connect(self) -> Subscriber:
+        self.connections += 1
+        return Subscriber(self, self.queue_size)
+
+    def subscribe(self, subscriber: Subscriber, name: str, client: "UMFutures") -> str:
+        """Aboneyi konuya ekler; konu yoksa oluşturulur ve hesaplaması başlatılır"""
+        name = topic_name(name)
+        if name in subscriber.topics:
+            return name
+        if len(subscriber.topics) >= subscriber.maxsize:
+            raise ValueError("Too many topics for one connection")
+
+        topic = self.topics.get(name)
+        if topic is None:
+            if len(self.topics) >= self.max_topics:
+                raise ValueError("Push topic limit reached")
+            topic = self._create_topic(name, client)
+            self.topics[name] = topic
+        topic.subscribers.add(subscriber)
+        subscriber.topics[name] = topic
+        snapshot = topic.snapshot()
+        if snapshot is not None:
+            subscriber.put(snapshot)
+        if topic.task is None:
+            self._listen()
+            topic.task = asyncio.create_task(self._run(topic))
+        return name
+
+    def unsubscribe(self, subscriber: Subscriber, name: str):
+        """Son abone ayrılınca konunun hesaplaması durdurulur"""
+        name = topic_name(name)
+        topic = subscriber.topics.pop(name, None)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            if topic.task is not None:
+                topic.task.cancel()
+            self.topics.pop(name, None)
+
+    def disconnect(self, subscriber: Subscriber):
+        for name in list(subscriber.topics):
+            self.unsubscribe(subscriber, name)
+        self.connections -= 1
+
+    async def _run(self, topic: Topic):
+        while topic.subscribers:
+            topic.wake.clear()
+            try:
+                value = await topic.producer()
+                topic.computations += 1
+                if topic.publish(value):
+                    self.published += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                topic.errors += 1
+                logger.error("Push topic %s error: %s", topic.name, e)
+            try:
+                await asyncio.wait_for(topic.wake.wait(), timeout=topic.wait_time())
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        tasks = [topic.task for topic in self.topics.values() if topic.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.topics.clear()
+        if self._loop is not None:
+            market_cache.remove_kline_listener(self._on_kline)
+            account_state.remove_listener(self._on_account)
+            self._loop = None
+
+    def status(self) -> Dict:
+        return {
+            "connections": self.connections,
+            "published": self.published,
+            "dropped": self.dropped,
+            "topics": [
+                {
+                    "topic": topic.name,
+                    "subscribers": len(topic.subscribers),
+                    "version": topic.version,
+                    "computations": topic.computations,
+                    "errors": topic.errors,
+                }
+                for topic in self.topics.values()
+            ],
+        }
+
+
+push_hub = PushHub(
+    queue_size=settings.push_queue_size,
+    refresh_interval=settings.push_refresh_interval,
+    close_delay=settings.scheduler_close_delay,
+    max_topics=settings.push_max_topics,
+)
@@ -0,0 +1,305 @@
+import contextvars
+import heapq
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..config import settings
+from ..utils.logger import logger
+from .metrics import errors_total, registry
+
+# Küçük değer önce gönderilir
+ORDER = 0
+MARKET = 1
+DIAGNOSTIC = 2
+PRIORITY_NAMES = {ORDER: "order", MARKET: "market", DIAGNOSTIC: "diagnostic"}
+
+_priority: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("exchange_priority", default=None)
+# Çağıranın sonucu beklemeyi bırakacağı an (epoch saniye); sonrasında istek gönderilmez
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("exchange_deadline", default=None)
+
+queue_wait = registry.histogram(
+    "exchange_queue_wait_seconds", "Time exchange requests waited for rate-limit budget", ["priority"])
+
+# Emir sayacına giren uç noktalar (X-MBX-ORDER-COUNT-*)
+ORDER_PATHS = ("/fapi/v1/order", "/fapi/v1/batchOrders")
+# Fiyat verisi değil, hesap/emir durumu değiştiren uç noktalar her zaman emir önceliğindedir
+ORDER_PRIORITY_PATHS = ORDER_PATHS + ("/fapi/v1/allOpenOrders", "/fapi/v1/countdownCancelAll")
+
+# Yol -> (sembollü ağırlık, sembolsüz ağırlık); listede olmayanlar 1 sayılır
+ENDPOINT_WEIGHTS = {
+    "/fapi/v1/premiumIndex": (1, 10),
+    "/fapi/v1/ticker/price": (1, 2),
+    "/fapi/v1/ticker/24hr": (1, 40),
+    "/fapi/v1/openOrders": (1, 40),
+    "/fapi/v1/allOrders": (5, 5),
+    "/fapi/v1/batchOrders": (5, 5),
+    "/fapi/v2/account": (5, 5),
+    "/fapi/v3/account": (5, 5),
+    "/fapi/v2/balance": (5, 5),
+    "/fapi/v3/balance": (5, 5),
+    "/fapi/v2/positionRisk": (5, 5),
+    "/fapi/v3/positionRisk": (5, 5),
+}
+
+
+def kline_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def request_cost(method: str, url: str) -> Tuple[int, int, bool]:
+    """İsteğin (ağırlık, emir sayısı, emir önceliği) tahmini"""
+    parts = urlsplit(url)
+    path = parts.path
+    params = parse_qs(parts.query)
+    if path in ("/fapi/v1/klines", "/fapi/v1/continuousKlines", "/fapi/v1/markPriceKlines"):
+        weight = kline_weight(int(params.get("limit", ["500"])[0]))
+    else:
+        with_symbol, without_symbol = ENDPOINT_WEIGHTS.get(path, (1, 1))
+        weight = with_symbol if "symbol" in params else without_symbol
+
+    orders = 0
+    if method == "POST" and path == "/fapi/v1/order":
+        orders = 1
+    elif method == "POST" and path == "/fapi/v1/batchOrders":
+        try:
+            orders = len(json.loads(params["batchOrders"][0]))
+        except (KeyError, ValueError):
+            orders = 5
+    return weight, orders, path in ORDER_PRIORITY_PATHS
+
+
+@contextmanager
+def exchange_priority(priority: int):
+    """Blok içindeki (executor'a geçenler dahil) borsa isteklerinin önceliğini belirler"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: int = MARKET) -> int:
+    priority = _priority.get()
+    return default if priority is None else priority
+
+
+def context_with_priority(default: int, deadline: Optional[float] = None) -> contextvars.Context:
+    """Executor thread'ine taşınacak bağlam; öncelik belirlenmemişse default atanır
+
+    deadline verilirse (iç içe çağrılarda en erkeni) bütçe beklemesi onunla sınırlanır.
+    """
+    context = contextvars.copy_context()
+    if context.get(_priority) is None:
+        context.run(_priority.set, default)
+    if deadline is not None:
+        current = context.get(_deadline)
+        context.run(_deadline.set, deadline if current is None else min(current, deadline))
+    return context
+
+
+class RateLimitTimeout(TimeoutError):
+    pass
+
+
+class RequestScheduler:
+    """Borsa isteklerini dakikalık ağırlık ve emir sayısı bütçesine göre öncelik sırasıyla geçirir
+
+    Kullanılan ağırlık yerelde tahmin edilir ve yanıt başlıklarıyla (X-MBX-USED-WEIGHT-1M,
+    X-MBX-ORDER-COUNT-10S/1M) düzeltilir: bu dakika gönderilmiş bir isteğin yanıtındaki ağırlık,
+    henüz yanıtı gelmemiş isteklerin ağırlığıyla birlikte tahminin yerine geçer (aşağı da düzeltir). Emirler bütçenin tamamını, piyasa verisi ve tanılama
+    istekleri küçülen paylarını kullanabilir; böylece okuma trafiği bütçeyi doldursa da emirler için
+    pay kalır. Emir dışı istekler dakika içine yayılır: dakikanın başında payın `burst` kadarı, sonuna
+    doğru tamamı harcanabilir.
+    """
+
+    def __init__(self, weight_limit: int = 2400, order_limit_10s: int = 300, order_limit_1m: int = 1200,
+                 shares: Optional[Dict[int, float]] = None, burst: float = 0.5, max_wait: float = 5.0):
+        self.weight_limit = weight_limit
+        self.order_limit_10s = order_limit_10s
+        self.order_limit_1m = order_limit_1m
+        self.shares = shares or {ORDER: 1.0, MARKET: 0.85, DIAGNOSTIC: 0.6}
+        self.burst = burst
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._minute = 0
+        self._ten_seconds = 0
+        self._used_weight = 0
+        # Bu dakika geçirilip yanıtı henüz gelmemiş isteklerin ağırlığı
+        self._in_flight = 0
+        self._orders_10s = 0
+        self._orders_1m = 0
+        self._blocked_until = 0.0
+        self.admitted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.rejections = 0
+
+    def _roll(self, now: float):
+        minute = int(now // 60)
+        if minute != self._minute:
+            self._minute = minute
+            self._used_weight = 0
+            self._in_flight = 0
+            self._orders_1m = 0
+        ten_seconds = int(now // 10)
+        if ten_seconds != self._ten_seconds:
+            self._ten_seconds = ten_seconds
+            self._orders_10s = 0
+
+    def _allowance(self, priority: int, now: float) -> float:
+        allowance = self.weight_limit * self.shares.get(priority, self.shares[DIAGNOSTIC])
+        if priority != ORDER:
+            elapsed = (now % 60) / 60
+            allowance *= min(1.0, self.burst + (1 - self.burst) * elapsed)
+        return allowance
+
+    def _wait_time(self, priority: int, weight: int, orders: int, now: float) -> Optional[float]:
+        """Şimdi geçebiliyorsa None, değilse tekrar denemeden önce beklenecek süre"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if orders and self._orders_10s + orders > self.order_limit_10s:
+            return 10 - now % 10
+        if orders and self._orders_1m + orders > self.order_limit_1m:
+            return 60 - now % 60
+        needed = self._used_weight + weight
+        # Payından büyük tek istek, pencere boşken geçer
+        if needed <= self._allowance(priority, now) or self._used_weight == 0:
+            return None
+        share = self.weight_limit * self.shares.get(priority, self.shares[DIAGNOSTIC])
+        if priority != ORDER and needed <= share and self.burst < 1:
+            # Yayma sınırı: `needed` ağırlığa izin verilen ana kadar bekle
+            elapsed = (needed / share - self.burst) / (1 - self.burst)
+            return max(elapsed * 60 - now % 60, 0.01)
+        return 60 - now % 60
+
+    def acquire(self, priority: int, weight: int, orders: int = 0) -> float:
+        """Bütçe uygun olduğunda döner; bekleme süresini döndürür
+
+        Bekleme max_wait ve çağıranın son tarihiyle sınırlıdır. Zaman aşımına uğramış bir çağrının
+        thread'i sonradan bütçe bulsa da isteği (ör. emri) göndermez.
+        """
+        started = time.time()
+        limit = started + self.max_wait
+        deadline = _deadline.get()
+        if deadline is not None:
+            if started >= deadline:
+                raise RateLimitTimeout("Caller deadline passed before the exchange request was sent")
+            limit = min(limit, deadline)
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.time()
+                    self._roll(now)
+                    wait = None
+                    if self._queue[0] == ticket:
+                        wait = self._wait_time(priority, weight, orders, now)
+                        if wait is None:
+                            heapq.heappop(self._queue)
+                            self._used_weight += weight
+                            self._in_flight += weight
+                            self._orders_10s += orders
+                            self._orders_1m += orders
+                            self.admitted[priority] += 1
+                            self._cond.notify_all()
+                            break
+                    remaining = limit - now
+                    if remaining <= 0:
+                        raise RateLimitTimeout(
+                            f"Exchange rate limit budget not available within {limit - started:.1f}s")
+                    self._cond.wait(min(remaining, wait) if wait is not None else remaining)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+        waited = time.time() - started
+        queue_wait.observe(waited, PRIORITY_NAMES.get(priority, "diagnostic"))
+        return waited
+
+    def record_response(self, status_code: Optional[int], headers, weight: int = 0,
+                        sent_at: Optional[float] = None):
+        """Sunucunun bildirdiği sayaçlarla yerel tahmini düzeltir; 429/418'de istekleri durdurur
+
+        weight/sent_at acquire ile geçirilen isteğin ağırlığı ve gönderildiği an; yanıt alınamadıysa
+        status_code None ve headers boş verilir.
+        """
+        now = time.time()
+        with self._cond:
+            self._roll(now)
+            # Önceki dakikada gönderilen isteğin yanıtı o dakikanın sayacını taşır
+            current = sent_at is not None and int(sent_at // 60) == self._minute
+            if current:
+                self._in_flight = max(self._in_flight - weight, 0)
+            used = headers.get("X-MBX-USED-WEIGHT-1M")
+            if used is not None and current:
+                # Sunucu sayacı aynı IP'yi kullanan başka süreçleri de içerir; yerel fazla tahmin
+                # dakikanın geri kalanında istekleri bekletmesin diye aşağı da düzeltilir
+                self._used_weight = int(used) + self._in_flight
+            elif used is not None and sent_at is None:
+                self._used_weight = max(self._used_weight, int(used))
+            orders_10s = headers.get("X-MBX-ORDER-COUNT-10S")
+            if orders_10s is not None:
+                self._orders_10s = max(self._orders_10s, int(orders_10s))
+            orders_1m = headers.get("X-MBX-ORDER-COUNT-1M")
+            if orders_1m is not None:
+                self._orders_1m = max(self._orders_1m, int(orders_1m))
+            if status_code in (418, 429):
+                retry_after = float(headers.get("Retry-After") or (60 if status_code == 418 else 1))
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self.rejections += 1
+                errors_total.inc("rate_limit", str(status_code))
+                logger.warning("Exchange rate limit hit (%s), pausing requests for %ss", status_code, retry_after)
+            self._cond.notify_all()
+
+    def reset(self):
+        """Sayaçları ve 429/418 duraklamasını sıfırlar (ölçümler arasında kullanılır)"""
+        with self._cond:
+            self._minute = self._ten_seconds = 0
+            self._roll(time.time())
+            self._blocked_until = 0.0
+            self._cond.notify_all()
+
+    def status(self) -> Dict:
+        now = time.time()
+        with self._cond:
+            self._roll(now)
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._queue:
+                queued[PRIORITY_NAMES.get(priority, "diagnostic")] += 1
+            return {
+                "weight_limit": self.weight_limit,
+                "used_weight": self._used_weight,
+                "headroom": max(self.weight_limit - self._used_weight, 0),
+                "headroom_ratio": max(self.weight_limit - self._used_weight, 0) / self.weight_limit,
+                "allowance": {name: int(self._allowance(priority, now)) for priority, name in PRIORITY_NAMES.items()},
+                "order_count_10s": self._orders_10s,
+                "order_count_1m": self._orders_1m,
+                "blocked_for": max(self._blocked_until - now, 0.0),
+                "queued": queued,
+                "admitted": {PRIORITY_NAMES[priority]: count for priority, count in self.admitted.items()},
+                "rejections": self.rejections,
+            }
+
+
+request_scheduler = RequestScheduler(
+    weight_limit=settings.exchange_weight_limit,
+    order_limit_10s=settings.exchange_order_limit_10s,
+    order_limit_1m=settings.exchange_order_limit_1m,
+    shares={ORDER: 1.0, MARKET: settings.rate_market_share, DIAGNOSTIC: settings.rate_diagnostic_share},
+    burst=settings.rate_burst,
+    max_wait=settings.rate_max_wait,
+)
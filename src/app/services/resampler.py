@@ -0,0 +1,267 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .kline_store import (COLUMNS, INTERVAL_MS, INTERVAL_OFFSET_MS, MAX_KLINES_PER_REQUEST, KlineSeries,
+                          KlineStore, kline_store)
+from .market_stream import market_cache
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+BASE_INTERVAL = "1m"
+BASE_MS = INTERVAL_MS[BASE_INTERVAL]
+
+# Oluşan mumu tek 1m isteğiyle kurulabilen aralıklar (1d = 1440 dakika); 3d ve 1w borsadan gelir
+RESAMPLED_INTERVALS = tuple(
+    interval for interval, interval_ms in INTERVAL_MS.items()
+    if interval != BASE_INTERVAL and interval_ms <= MAX_KLINES_PER_REQUEST * BASE_MS
+)
+
+# Borsa hacmi en fazla 8 ondalıkla verir; toplamdaki kayan nokta artığı yuvarlanır
+VOLUME_DECIMALS = 8
+
+
+def resample_columns(columns: Dict[str, np.ndarray], interval: str) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Sıralı 1m kolonlarını interval kovalarına toplar; kova başına 1m mum sayısını da döndürür"""
+    interval_ms = INTERVAL_MS[interval]
+    offset = INTERVAL_OFFSET_MS.get(interval, 0)
+    open_time = columns["open_time"]
+    if not len(open_time):
+        return {name: np.empty(0, dtype=dtype) for name, _, dtype in COLUMNS}, np.empty(0, dtype=np.int64)
+
+    buckets = (open_time - offset) // interval_ms
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(open_time))
+    bar_open = buckets[starts] * interval_ms + offset
+    bars = {
+        "open_time": bar_open,
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends - 1],
+        "volume": np.round(np.add.reduceat(columns["volume"], starts), VOLUME_DECIMALS),
+        "close_time": bar_open + interval_ms - 1,
+    }
+    return bars, ends - starts
+
+
+@dataclass
+class PartialBar:
+    """Henüz kapanmamış üst zaman dilimi mumunun kapanmış 1m mumlarından oluşan kısmı"""
+    open_time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    count: int
+    last_base_open: int
+
+
+class Resampler:
+    """Üst zaman dilimi mumlarını tek bir 1m serisinden yerelde türetir
+
+    Kapanan 1m mumları kısmi muma artımlı katılır; kova dolduğunda mum aralığın kendi deposuna
+    eklenir. Böylece aynı sembolün 1h, 4h ve 1d istekleri borsaya tek bir 1m isteğiyle karşılanır.
+    Aralığın deposu boşsa ya da 1m deposuyla arasında boşluk varsa eksik kısım bir kez borsadan
+    tamamlanır; sonrasında türetme kaldığı yerden devam eder.
+    """
+
+    def __init__(self, store: KlineStore, base_live_kline: Optional[Callable[[str, str], Optional[Dict]]] = None,
+                 enabled: bool = True, base_max_age: float = 1.0):
+        self.store = store
+        self.base_live_kline = base_live_kline
+        self.enabled = enabled
+        self.base_max_age = base_max_age
+        self._base: Dict[str, Tuple[float, int, List]] = {}
+        self._partials: Dict[Tuple[str, str], PartialBar] = {}
+        self._active: Dict[str, Set[str]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.base_syncs = 0
+        self.native_syncs = 0
+        self.resampled = 0
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _sync_base(self, client: "UMFutures", symbol: str, limit: int) -> List:
+        """1m deposunu en az `limit` mum kapsayacak şekilde tamamlar ve oluşan 1m mumunu döndürür
+
+        Aynı sembolün aralıkları kısa süre içinde tek senkronizasyonu paylaşır. Depo doluysa borsadan
+        yalnızca son 1m mumundan bu yana eksik dakikalar istenir.
+        """
+        with self._symbol_lock(symbol):
+            cached = self._base.get(symbol)
+            if (cached is not None and cached[1] >= limit
+                    and time.monotonic() - cached[0] <= self.base_max_age):
+                return cached[2]
+            live_kline = self.base_live_kline(symbol, BASE_INTERVAL) if self.base_live_kline else None
+            _, forming = self.store.sync(client, symbol, BASE_INTERVAL, limit, live_kline=live_kline)
+            self._base[symbol] = (time.monotonic(), limit, forming)
+            self.base_syncs += 1
+            return forming
+
+    @staticmethod
+    def _base_limit(interval: str, last: int) -> Optional[int]:
+        """Türetilmiş serinin son mumundan sonrasını kapsayan 1m mum sayısı; tek istekte sığmıyorsa None"""
+        cursor = last + INTERVAL_MS[interval]
+        limit = max((int(time.time() * 1000) - cursor) // BASE_MS + 2, 2)
+        return limit if limit <= MAX_KLINES_PER_REQUEST else None
+
+    def _advance(self, symbol: str, interval: str, series: KlineSeries) -> bool:
+        """Yeni kapanan 1m mumlarını kısmi muma katar, dolan kovaları depoya ekler
+
+        1m deposuyla türetilmiş seri arasında boşluk varsa False döner. series.lock tutulurken çağrılır.
+        """
+        key = (symbol, interval)
+        interval_ms = INTERVAL_MS[interval]
+        last = series.last_open_time()
+        if last is None:
+            return False
+        next_open = last + interval_ms
+
+        partial = self._partials.get(key)
+        if partial is not None and partial.open_time != next_open:
+            partial = None
+        cursor = partial.last_base_open + BASE_MS if partial is not None else next_open
+
+        base = self.store.series(symbol, BASE_INTERVAL)
+        with base.lock:
+            columns = base.columns()
+        open_time = columns["open_time"]
+        if not len(open_time) or open_time[0] > cursor:
+            return False
+        start = int(np.searchsorted(open_time, cursor))
+        if start == len(open_time):
+            return True
+
+        bars, counts = resample_columns({name: column[start:] for name, column in columns.items()}, interval)
+        if partial is not None and bars["open_time"][0] == partial.open_time:
+            bars["open"][0] = partial.open
+            bars["high"][0] = max(partial.high, bars["high"][0])
+            bars["low"][0] = min(partial.low, bars["low"][0])
+            bars["volume"][0] = round(partial.volume + bars["volume"][0], VOLUME_DECIMALS)
+            counts[0] += partial.count
+
+        # Kovalar ardışık olmalı; son kova dışındakiler dolu olmalı (1m deposunda delik yok)
+        per_bar = interval_ms // BASE_MS
+        expected = next_open + np.arange(len(counts)) * interval_ms
+        if not np.array_equal(bars["open_time"], expected) or not (counts[:-1] == per_bar).all():
+            return False
+        last_base_open = int(open_time[-1])
+        if counts[-1] != (last_base_open - expected[-1]) // BASE_MS + 1:
+            return False
+
+        closed = len(counts) if counts[-1] == per_bar else len(counts) - 1
+        if closed:
+            series.append({name: bars[name][:closed] for name, _, _ in COLUMNS})
+            self.resampled += closed
+        if closed < len(counts):
+            self._partials[key] = PartialBar(
+                open_time=int(bars["open_time"][-1]), open=float(bars["open"][-1]),
+                high=float(bars["high"][-1]), low=float(bars["low"][-1]), close=float(bars["close"][-1]),
+                volume=float(bars["volume"][-1]), count=int(counts[-1]), last_base_open=last_base_open,
+            )
+        else:
+            self._partials.pop(key, None)
+        return True
+
+    def _forming(self, symbol: str, interval: str, base_forming: List) -> List:
+        """Kısmi mum ile oluşan 1m mumunu birleştirip oluşan üst zaman dilimi mumunu kurar"""
+        interval_ms = INTERVAL_MS[interval]
+        offset = INTERVAL_OFFSET_MS.get(interval, 0)
+        open_time = (int(base_forming[0]) - offset) // interval_ms * interval_ms + offset
+        open_, high, low = float(base_forming[1]), float(base_forming[2]), float(base_forming[3])
+        close, volume = float(base_forming[4]), float(base_forming[5])
+        partial = self._partials.get((symbol, interval))
+        if partial is not None and partial.open_time == open_time:
+            open_ = partial.open
+            high = max(partial.high, high)
+            low = min(partial.low, low)
+            volume = round(partial.volume + volume, VOLUME_DECIMALS)
+        return [open_time, open_, high, low, close, volume, open_time + interval_ms - 1]
+
+    def _resample(self, client: "UMFutures", symbol: str, interval: str,
+                  limit: int) -> Optional[Tuple[Dict[str, np.ndarray], List]]:
+        series = self.store.series(symbol, interval)
+        with series.lock:
+            last = series.last_open_time()
+            if last is None or len(series) < limit - 1:
+                return None
+        base_limit = self._base_limit(interval, last)
+        if base_limit is None:
+            return None
+        base_forming = self._sync_base(client, symbol, base_limit)
+        with series.lock:
+            if not self._advance(symbol, interval, series):
+                return None
+            with self._lock:
+                self._active.setdefault(symbol, set()).add(interval)
+            return series.tail(limit - 1), self._forming(symbol, interval, base_forming)
+
+    def sync(self, client: "UMFutures", symbol: str, interval: str, limit: int = 100,
+             live_kline: Optional[Dict] = None) -> Tuple[Dict[str, np.ndarray], List]:
+        """kline_store.sync ile aynı sözleşme; desteklenen aralıklar 1m serisinden türetilir"""
+        symbol = symbol.upper()
+        if not self.enabled or interval not in RESAMPLED_INTERVALS:
+            return self.store.sync(client, symbol, interval, limit, live_kline=live_kline)
+        # Aralığın kendi akışı varsa borsaya hiç gidilmez
+        streamed = self.store.stream_tail(symbol, interval, limit, live_kline)
+        if streamed is not None:
+            return streamed
+
+        resampled = self._resample(client, symbol, interval, limit)
+        if resampled is not None:
+            return resampled
+        # Türetilecek geçmiş yetersiz: aralığın deposu bir kez borsadan tamamlanır
+        self.native_syncs += 1
+        logger.info("Backfilling %s %s from the exchange before resampling", symbol, interval)
+        return self.store.sync(client, symbol, interval, limit, live_kline=live_kline)
+
+    def forming(self, client: "UMFutures", symbol: str, interval: str) -> List:
+        """Yalnızca oluşan mum; türetilemiyorsa borsadan tek mum çekilir"""
+        symbol = symbol.upper()
+        if self.enabled and interval in RESAMPLED_INTERVALS:
+            resampled = self._resample(client, symbol, interval, 1)
+            if resampled is not None:
+                return resampled[1]
+        return client.klines(symbol, interval, limit=1)[-1]
+
+    def on_base_kline(self, symbol: str, interval: str, kline: Dict):
+        """Akıştan kapanan 1m mumu depoya yazıldıktan sonra takip edilen aralıkları ilerletir"""
+        if not self.enabled or interval != BASE_INTERVAL:
+            return
+        symbol = symbol.upper()
+        with self._lock:
+            intervals = list(self._active.get(symbol, ()))
+        for derived in intervals:
+            series = self.store.series(symbol, derived)
+            with series.lock:
+                self._advance(symbol, derived, series)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active = {symbol: sorted(intervals) for symbol, intervals in self._active.items()}
+        return {
+            "enabled": self.enabled,
+            "base_syncs": self.base_syncs,
+            "native_syncs": self.native_syncs,
+            "resampled_bars": self.resampled,
+            "active": active,
+        }
+
+
+resampler = Resampler(
+    kline_store,
+    base_live_kline=market_cache.get_kline,
+    enabled=settings.resample_enabled,
+    base_max_age=settings.resample_base_max_age,
+)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class ResponseCache:
+    """Son kullanma zamanlı, eşzamanlı aynı istekleri tek hesaplamada birleştiren önbellek
+
+    Süre dolana kadar değer bellekten döner; süre dolduğunda ilk istek hesaplamayı başlatır, aynı
+    anahtar için gelen diğer istekler aynı görevi bekler.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Tuple[Any, float]]]) -> Any:
+        """compute (değer, epoch saniye cinsinden son kullanma) döndürür"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        # Hesaplama ayrı bir görevde yürür: ilk isteği yapan iptal edilse de (ör. push_hub konu
+        # görevini durdurduğunda) hesaplama tamamlanır ve bekleyen diğer istekler sonucu alır
+        task = asyncio.get_running_loop().create_task(self._compute(key, compute))
+        self._inflight[key] = task
+        task.add_done_callback(self._done)
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Tuple[Any, float]]]) -> Any:
+        try:
+            value, expires_at = await compute()
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            del self._inflight[key]
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _done(task: asyncio.Task):
+        # Bekleyen kalmadıysa "exception was never retrieved" uyarısı çıkmasın
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else None,
+        }
+
+
+analysis_cache = ResponseCache()
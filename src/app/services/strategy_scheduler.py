@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from ..config import settings
+from .kline_store import INTERVAL_MS, next_candle_close
+from .entry_filter import EntryFilter
+from .trading_bot import TradingBot
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+class ScheduledBot:
+    """Zamanlayıcıdaki bir bot ve son çalıştırma bilgileri"""
+
+    def __init__(self, bot: TradingBot, interval: str, period: int):
+        self.bot = bot
+        self.interval = interval
+        self.period = period
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result: Optional[Dict] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict:
+        return {
+            "symbol": self.bot.symbol,
+            "interval": self.interval,
+            "period": self.period,
+            "atr_multiplier": self.bot.atr_multiplier,
+            "entry_filter": self.bot.entry_filter is not None,
+            "position": self.bot.position,
+            "entry_price": self.bot.entry_price,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class StrategyScheduler:
+    """Kalıcı TradingBot örneklerini her mum kapanışında sınırlı eşzamanlılıkla çalıştırır
+
+    Aralık başına tek bir zamanlayıcı görevi vardır; kaç sembol olursa olsun yoklama yapılmaz.
+    """
+
+    def __init__(self, max_concurrency: int = 16, close_delay: float = 1.0):
+        self.max_concurrency = max_concurrency
+        # Borsanın mumu kapatması için kapanıştan sonra beklenen süre
+        self.close_delay = close_delay
+        self._bots: Dict[Tuple[str, str], ScheduledBot] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        self._next_close: Dict[str, int] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def add(self, client: "UMFutures", symbol: str, interval: str, atr_multiplier: float = 2.5,
+            period: int = 14, entry_filter: Optional[EntryFilter] = None) -> ScheduledBot:
+        """Botu ekler; aynı sembol/aralık zaten varsa mevcut pozisyon durumu korunur"""
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported interval for scheduling: {interval}")
+        # market_cache ve bot anahtarları büyük harfli sembol kullanır; "btcusdt" ayrı bot açmasın
+        symbol = symbol.upper()
+        key = (symbol, interval)
+        scheduled = self._bots.get(key)
+        if scheduled is None:
+            scheduled = ScheduledBot(TradingBot(symbol, atr_multiplier, client=client, entry_filter=entry_filter),
+                                     interval, period)
+            self._bots[key] = scheduled
+        else:
+            scheduled.bot.atr_multiplier = atr_multiplier
+            scheduled.bot.entry_filter = entry_filter
+            scheduled.period = period
+        if interval not in self._timers:
+            self._timers[interval] = asyncio.create_task(self._run_interval(interval))
+        return scheduled
+
+    async def remove(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> int:
+        """Eşleşen botları çıkarır; botu kalmayan aralığın zamanlayıcısı durdurulur"""
+        if symbol is not None:
+            symbol = symbol.upper()
+        keys = [key for key in self._bots
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval)]
+        for key in keys:
+            del self._bots[key]
+        idle = [iv for iv in self._timers if not any(key[1] == iv for key in self._bots)]
+        tasks = [self._timers.pop(iv) for iv in idle]
+        for iv, task in zip(idle, tasks):
+            self._next_close.pop(iv, None)
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return len(keys)
+
+    async def stop(self):
+        """Tüm botları ve zamanlayıcıları durdurur"""
+        tasks = list(self._timers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timers.clear()
+        self._next_close.clear()
+        self._bots.clear()
+        self._semaphore = None
+
+    async def _evaluate(self, scheduled: ScheduledBot):
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                scheduled.last_result = await scheduled.bot.evaluate(scheduled.interval, scheduled.period)
+                scheduled.last_error = None
+            except Exception as e:
+                logger.error("Scheduled evaluation error for %s %s: %s",
+                             scheduled.bot.symbol, scheduled.interval, e)
+                scheduled.last_error = str(e)
+            scheduled.runs += 1
+            scheduled.last_run = time.time()
+            scheduled.last_duration = time.perf_counter() - start
+
+    async def _run_interval(self, interval: str):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        while True:
+            close_ms = next_candle_close(interval, int(time.time() * 1000))
+            self._next_close[interval] = close_ms
+            await asyncio.sleep(max(close_ms / 1000 - time.time(), 0) + self.close_delay)
+            bots = [scheduled for key, scheduled in self._bots.items() if key[1] == interval]
+            logger.info("Candle closed for %s, evaluating %s bots", interval, len(bots))
+            await asyncio.gather(*(self._evaluate(scheduled) for scheduled in bots))
+
+    def status(self) -> Dict:
+        return {
+            "running": bool(self._timers),
+            "max_concurrency": self.max_concurrency,
+            "next_close": dict(self._next_close),
+            "bots": [scheduled.status() for scheduled in self._bots.values()],
+        }
+
+
+strategy_scheduler = StrategyScheduler(
+    max_concurrency=settings.scheduler_max_concurrency,
+    close_delay=settings.scheduler_close_delay,
+)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Union
+
+from ..config import settings
+from .executor import market_executor
+from .rate_limiter import DIAGNOSTIC, exchange_priority
+from ..utils.logger import logger
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
+
+
+Number = Union[float, str, Decimal]
+
+
+def _decimal(value: Number) -> Decimal:
+    # float'ı str üzerinden çevirmek 0.1 gibi değerlerde ikili gösterim hatasını önler
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+@dataclass(frozen=True)
+class SymbolFilters:
+    """Bir sembolün önceden ayrıştırılmış LOT_SIZE, PRICE_FILTER ve MIN_NOTIONAL değerleri"""
+
+    symbol: str
+    step_size: Decimal
+    min_qty: Decimal
+    max_qty: Decimal
+    tick_size: Decimal
+    min_price: Decimal
+    max_price: Decimal
+    min_notional: Decimal
+
+    def round_quantity(self, quantity: Number) -> Decimal:
+        """Miktarı adım büyüklüğüne aşağı yuvarlar"""
+        quantity = _decimal(quantity)
+        if self.step_size == 0:
+            return quantity
+        steps = (quantity / self.step_size).to_integral_value(rounding=ROUND_DOWN)
+        return (steps * self.step_size).quantize(self.step_size)
+
+    def round_price(self, price: Number) -> Decimal:
+        """Fiyatı en yakın tick'e yuvarlar"""
+        price = _decimal(price)
+        if self.tick_size == 0:
+            return price
+        ticks = (price / self.tick_size).to_integral_value(rounding=ROUND_HALF_UP)
+        return (ticks * self.tick_size).quantize(self.tick_size)
+
+    def validate_order(self, quantity: Number, price: Number):
+        """Miktar ve notional borsa limitlerinin dışındaysa ValueError fırlatır"""
+        quantity = _decimal(quantity)
+        price = _decimal(price)
+        if quantity < self.min_qty:
+            raise ValueError(f"{self.symbol} quantity {quantity} is below min qty {self.min_qty}")
+        if self.max_qty and quantity > self.max_qty:
+            raise ValueError(f"{self.symbol} quantity {quantity} is above max qty {self.max_qty}")
+        if quantity * price < self.min_notional:
+            raise ValueError(f"{self.symbol} notional {quantity * price} is below min notional {self.min_notional}")
+
+    @classmethod
+    def from_exchange_info(cls, symbol_info: Dict) -> "SymbolFilters":
+        filters = {item["filterType"]: item for item in symbol_info.get("filters", [])}
+        lot_size = filters.get("LOT_SIZE", {})
+        price_filter = filters.get("PRICE_FILTER", {})
+        min_notional = filters.get("MIN_NOTIONAL", {})
+        return cls(
+            symbol=symbol_info["symbol"],
+            step_size=_decimal(lot_size.get("stepSize", "0")).normalize(),
+            min_qty=_decimal(lot_size.get("minQty", "0")),
+            max_qty=_decimal(lot_size.get("maxQty", "0")),
+            tick_size=_decimal(price_filter.get("tickSize", "0")).normalize(),
+            min_price=_decimal(price_filter.get("minPrice", "0")),
+            max_price=_decimal(price_filter.get("maxPrice", "0")),
+            # Futures "notional", spot "minNotional" anahtarını kullanır
+            min_notional=_decimal(min_notional.get("notional", min_notional.get("minNotional", "0"))),
+        )
+
+
+class SymbolMetadataCache:
+    """exchange_info çıktısını sembole göre indeksleyip TTL ile tazeleyen önbellek
+
+    Önbellekte olmayan sembol (yeni listelenmiş olabilir) tazelemeyi tetikler; ancak son yüklemeden
+    bu yana min_refresh_interval geçmediyse tetiklemez, böylece hatalı yazılmış bir sembol her
+    istekte tüm exchange_info'yu indirtmez.
+    """
+
+    def __init__(self, ttl: float = 3600, min_refresh_interval: float = 60):
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._symbols: Dict[str, SymbolFilters] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _needs_refresh(self, symbol: str) -> bool:
+        if self.is_stale:
+            return True
+        return symbol not in self._symbols and time.monotonic() - self._loaded_at >= self.min_refresh_interval
+
+    def refresh(self, client: "UMFutures") -> int:
+        """exchange_info'yu indirip filtreleri yeniden ayrıştırır"""
+        info = client.exchange_info()
+        symbols = {item["symbol"]: SymbolFilters.from_exchange_info(item) for item in info["symbols"]}
+        with self._lock:
+            self._symbols = symbols
+            self._loaded_at = time.monotonic()
+        logger.info("Symbol metadata refreshed: %s symbols", len(symbols))
+        return len(symbols)
+
+    def get(self, symbol: str, client: Optional["UMFutures"] = None) -> SymbolFilters:
+        """Senkron okuma; önbellek boşsa ve istemci verilmişse bir kez yükler"""
+        if client is not None and self._needs_refresh(symbol):
+            self.refresh(client)
+        try:
+            return self._symbols[symbol]
+        except KeyError:
+            raise KeyError(f"Unknown symbol: {symbol}")
+
+    async def get_async(self, client: "UMFutures", symbol: str) -> SymbolFilters:
+        """Önbellekten okur; yalnızca boş, bayat ya da sembol eksikken exchange_info çağırır"""
+        if self._needs_refresh(symbol):
+            await market_executor.run(self.refresh, client)
+        return self.get(symbol)
+
+    async def refresh_forever(self, client_factory: Callable[[], "UMFutures"], interval: Optional[float] = None):
+        """Arka planda periyodik tazeleme; hata olursa bir sonraki turda tekrar dener"""
+        interval = interval or self.ttl / 2
+        if not self.is_stale:
+            # Açılış ısınmasında yüklendiyse ilk tur atlanır
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                # exchange_info ağır ve acil değil; bütçeyi emirlere ve piyasa verisine bırakır
+                with exchange_priority(DIAGNOSTIC):
+                    await market_executor.run(self.refresh, client_factory())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Symbol metadata refresh error: %s", e)
+            await asyncio.sleep(interval)
+
+
+symbol_metadata = SymbolMetadataCache(
+    ttl=settings.symbol_metadata_ttl,
+    min_refresh_interval=settings.symbol_metadata_min_refresh,
+)
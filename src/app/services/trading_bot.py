@@ -1,62 +1,109 @@
-from binance.client import Client
-from binance.um_futures import UMFutures
-from typing import Dict, Optional
-import logging
-import os
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Dict, Optional
+import asyncio
+import math
 from ..utils.logger import logger
+from .client_pool import client_pool
+from .executor import market_executor
+from .symbol_metadata import symbol_metadata
+from .market_stream import get_mark_price, market_cache
+from .resampler import resampler
+from .atr_engine import atr_engine
+from .indicators import indicator_engine
+from .entry_filter import EntryFilter
+from .order_batcher import BracketOrderError, place_bracket, submit_order
+from .account_state import get_balance, get_positions
+
+if TYPE_CHECKING:
+    from binance.um_futures import UMFutures
 
-load_dotenv()
 
 class TradingBot:
-    def __init__(self, symbol: str, atr_multiplier: float = 2.5):
-        self.client = UMFutures(
-            key=os.getenv("BINANCE_TEST_API_KEY"),
-            secret=os.getenv("BINANCE_TEST_API_SECRET"),
-            base_url="https://testnet.binancefuture.com"
-        )
-        logger.info(f"TradingBot initialized for {symbol} with ATR multiplier {atr_multiplier}")
+    def __init__(self, symbol: str, atr_multiplier: float = 2.5, client: Optional["UMFutures"] = None,
+                 entry_filter: Optional[EntryFilter] = None):
+        self.client = client if client is not None else client_pool.default()
+        logger.info("TradingBot initialized for %s with ATR multiplier %s", symbol, atr_multiplier)
         self.symbol = symbol
         self.atr_multiplier = atr_multiplier
+        self.entry_filter = entry_filter
         self.position = None
         self.entry_price = None
         self.position_size = None
         
+    async def refresh_position(self):
+        """TP/SL tetiklenip pozisyon kapandıysa yerel durumu sıfırlar"""
+        positions = await get_positions(self.client, self.symbol)
+        amount = sum(float(position['positionAmt']) for position in positions)
+        if amount == 0:
+            logger.info("Position for %s is closed", self.symbol)
+            self.position = None
+            self.entry_price = None
+            self.position_size = None
+
+    async def evaluate(self, interval: str = "1h", period: int = 14) -> Optional[Dict]:
+        """Kapanan mumdan sonra ATR'yi günceller, pozisyon yoksa giriş kontrolü yapar"""
+        if self.position:
+            await self.refresh_position()
+            if self.position:
+                return None
+
+        limit = period + 1
+        if self.entry_filter is not None:
+            limit = max(limit, self.entry_filter.min_bars + 1)
+        closed, forming = await market_executor.run(
+            resampler.sync, self.client, self.symbol, interval, limit,
+            live_kline=market_cache.get_kline(self.symbol, interval)
+        )
+        atr = atr_engine.ingest(
+            self.symbol, interval,
+            open_time=closed['open_time'],
+            high=closed['high'],
+            low=closed['low'],
+            close=closed['close'],
+            forming_high=float(forming[2]),
+            forming_low=float(forming[3]),
+            period=period
+        )['atr']
+        if math.isnan(atr):
+            return None
+        current_price = await get_mark_price(self.client, self.symbol)
+        if self.entry_filter is not None:
+            # Filtre göstergeleri yalnızca yeni kapanan mumlarla artımlı güncellenir
+            values = indicator_engine.ingest(self.symbol, interval, self.entry_filter.specs, closed)
+            reason = self.entry_filter.check(values, current_price)
+            if reason is not None:
+                logger.info("Entry for %s %s skipped: %s", self.symbol, interval, reason)
+                return {"action": "SKIPPED", "reason": reason}
+        return await self.check_and_enter_position(current_price, atr)
+
     async def check_and_enter_position(self, current_price: float, atr: float):
         """ATR'ye göre yeni pozisyon açma kontrolü"""
         try:
-            logger.info(f"Checking position entry conditions. Current price: {current_price}, ATR: {atr}")
+            logger.info("Checking position entry conditions. Current price: %s, ATR: %s", current_price, atr)
             # Pozisyon yoksa ve giriş koşulları uygunsa
             if not self.position:
                 # Market emri ile long pozisyon aç
-                order = await self.place_order("BUY", self.calculate_position_size())
+                order = await self.place_order("BUY", await self.calculate_position_size())
                 self.position = "LONG"
                 self.entry_price = float(order['avgPrice'])
                 self.position_size = float(order['executedQty'])
                 
-                # TP ve SL emirlerini yerleştir
-                take_profit = self.entry_price + (atr * self.atr_multiplier)
-                stop_loss = self.entry_price - atr
+                # TP ve SL emirlerini tick büyüklüğüne yuvarlanmış fiyatlarla yerleştir
+                filters = await symbol_metadata.get_async(self.client, self.symbol)
+                take_profit = float(filters.round_price(self.entry_price + (atr * self.atr_multiplier)))
+                stop_loss = float(filters.round_price(self.entry_price - atr))
                 
-                logger.info(f"Position opened - Entry: {self.entry_price}, TP: {take_profit}, SL: {stop_loss}")
+                logger.info("Position opened - Entry: %s, TP: %s, SL: %s", self.entry_price, take_profit, stop_loss)
                 
-                # TP emri
-                await self.place_order(
-                    side="SELL",
-                    quantity=self.position_size,
-                    price=take_profit,
-                    order_type="TAKE_PROFIT_MARKET",
-                    stop_price=take_profit
-                )
-                
-                # SL emri
-                await self.place_order(
-                    side="SELL",
-                    quantity=self.position_size,
-                    price=stop_loss,
-                    order_type="STOP_MARKET",
-                    stop_price=stop_loss
-                )
+                # TP ve SL tek toplu çağrıda gider; kısmi hatada pozisyon kapatılır
+                try:
+                    await place_bracket(self.client, self.symbol, self.position_size, take_profit, stop_loss)
+                except BracketOrderError as e:
+                    # Kapatılamayan pozisyon açık sayılır; sonraki değerlendirme yeni giriş yapmaz
+                    if e.flattened:
+                        self.position = None
+                        self.entry_price = None
+                        self.position_size = None
+                    raise
                 
                 return {
                     "action": "OPENED_LONG",
@@ -67,14 +114,14 @@ class TradingBot:
                 }
                 
         except Exception as e:
-            logger.error(f"Position entry error: {str(e)}")
+            logger.error("Position entry error: %s", e)
             raise
             
     async def place_order(self, side: str, quantity: float, price: Optional[float] = None, 
                          order_type: str = "MARKET", stop_price: Optional[float] = None) -> Dict:
         """Emir yerleştirme"""
         try:
-            logger.info(f"Placing order - Side: {side}, Type: {order_type}, Quantity: {quantity}, Price: {price}, Stop: {stop_price}")
+            logger.info("Placing order - Side: %s, Type: %s, Quantity: %s, Price: %s, Stop: %s", side, order_type, quantity, price, stop_price)
             params = {
                 "symbol": self.symbol,
                 "side": side,
@@ -89,33 +136,35 @@ class TradingBot:
             if order_type in ["LIMIT", "TAKE_PROFIT_LIMIT", "STOP_LIMIT"]:
                 params["timeInForce"] = "GTC"
                 
-            order = self.client.new_order(**params)
-            logger.info(f"Order placed successfully: {order}")
+            # Zaman aşımında aynı clientOrderId ile sorgulanır; dolmuş emir hata sayılmaz
+            order = await submit_order(self.client, **params)
+            logger.info("Order placed successfully: %s %s", order.get("orderId"), order.get("status"))
             return order
             
         except Exception as e:
-            logger.error(f"Order placement error: {str(e)}")
+            logger.error("Order placement error: %s", e)
             raise
             
-    def calculate_position_size(self) -> float:
+    async def calculate_position_size(self) -> float:
         """Pozisyon büyüklüğünü hesapla"""
         try:
-            balance = float(self.client.balance()['totalWalletBalance'])
-            current_price = float(self.client.mark_price(self.symbol)['markPrice'])
+            # Kullanıcı veri akışı canlıysa bakiye bellekten gelir
+            balance, current_price, filters = await asyncio.gather(
+                get_balance(self.client, 'USDT'),
+                get_mark_price(self.client, self.symbol),
+                symbol_metadata.get_async(self.client, self.symbol)
+            )
             
             # Bakiyenin %1'i ile işlem yap
             quantity = (balance * 0.01) / current_price
             
             # Lot büyüklüğüne göre yuvarla
-            info = self.client.exchange_info()
-            symbol_info = next(item for item in info['symbols'] if item['symbol'] == self.symbol)
-            lot_size_filter = next(item for item in symbol_info['filters'] if item['filterType'] == 'LOT_SIZE')
-            step_size = float(lot_size_filter['stepSize'])
-            
-            quantity = round(quantity - (quantity % step_size), 8)
-            logger.info(f"Calculated position size: {quantity}")
+            quantity = filters.round_quantity(quantity)
+            filters.validate_order(quantity, current_price)
+            quantity = float(quantity)
+            logger.info("Calculated position size: %s", quantity)
             return quantity
             
         except Exception as e:
-            logger.error(f"Position size calculation error: {str(e)}")
+            logger.error("Position size calculation error: %s", e)
             raise 
\ No newline at end of file
@@ -0,0 +1,66 @@
+import json
+import math
+from typing import Any
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+_NON_FINITE_TOKENS = ("-Infinity", "Infinity", "NaN")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _encode_array(values: np.ndarray) -> str:
+    if values.dtype.kind == "f":
+        # Dizi yalnızca sayı içerdiği için NaN/Infinity belirteçleri güvenle null'a çevrilir
+        text = json.dumps(values.tolist(), separators=(",", ":"))
+        if not np.isfinite(values).all():
+            for token in _NON_FINITE_TOKENS:
+                text = text.replace(token, "null")
+        return text
+    if values.dtype.kind in "iub":
+        return json.dumps(values.tolist(), separators=(",", ":"))
+    return _encode(values.tolist())
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, (dict, list, tuple)):
+        try:
+            # Temiz alt ağaçlar C kodlayıcıdan tek seferde geçer
+            return _dumps(value)
+        except (TypeError, ValueError):
+            pass
+        if isinstance(value, dict):
+            return "{" + ",".join(
+                _dumps(key if isinstance(key, str) else str(key)) + ":" + _encode(item)
+                for key, item in value.items()
+            ) + "}"
+        return "[" + ",".join(_encode(item) for item in value) + "]"
+    if isinstance(value, np.ndarray):
+        return _encode_array(value)
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value)) if math.isfinite(value) else "null"
+    if isinstance(value, (np.integer, np.bool_)):
+        return _dumps(value.item())
+    if value is None or isinstance(value, (str, int, bool)):
+        return _dumps(value)
+    return _encode(jsonable_encoder(value))
+
+
+def encode_json(value: Any) -> str:
+    """NumpyJSONResponse ile aynı kodlama; yanıt dışında (akış mesajları) kullanmak için"""
+    return _encode(value)
+
+
+class NumpyJSONResponse(JSONResponse):
+    """numpy dizi ve sayılarını doğrudan yazan, NaN/Infinity değerlerini null yapan JSON yanıtı
+
+    jsonable_encoder'ın eleman eleman dolaşmasına gerek kalmaz; uç nokta yanıtı bu sınıfla
+    döndürmelidir.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _encode(content).encode("utf-8")
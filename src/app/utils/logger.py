@@ -1,23 +1,281 @@
+import atexit
+import copy
+import glob
+import json
 import logging
-from datetime import datetime
 import os
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler
+from typing import List, Optional
 
-# Log klasörü oluştur
+from ..config import settings
+
+# Log klasörü ilk dosya açılırken oluşturulur
 log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
 
-# Log dosyası adını tarihle oluştur
-log_filename = f"logs/trading_{datetime.now().strftime('%Y%m%d')}.log"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+PART_RE = re.compile(r"trading_(\d{8})(?:_(\d+))?\.log$")
+
+
+def log_files_for_day(day: str) -> List[str]:
+    """Bir günün log parçalarını yazılış sırasıyla döndürür (trading_YYYYMMDD.log, _1, _2 ...)"""
+    paths = glob.glob(os.path.join(log_directory, f"trading_{day}.log"))
+    paths += glob.glob(os.path.join(log_directory, f"trading_{day}_*.log"))
+    parts = []
+    for path in paths:
+        match = PART_RE.search(path)
+        if match:
+            parts.append((int(match.group(2) or 0), path))
+    return [path for _, path in sorted(parts)]
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satırlık JSON kaydı; ts ve level başta olduğu için log sorgusu önekten ayrıştırabilir"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class DailyRotatingFileHandler(logging.Handler):
+    """Kayıt tarihine göre günlük dosyaya yazar; boyut aşılırsa aynı gün için yeni parça açar
+
+    Dosyalar yeniden adlandırılmaz, bu yüzden log sorgusunun bayt ofset index'leri geçerli kalır.
+    """
+
+    def __init__(self, max_bytes: int = 0, retention_days: int = 0):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self._day: Optional[str] = None
+        self._part = 0
+        self._stream = None
+
+    def _open(self, day: str):
+        if self._stream is not None:
+            self._stream.close()
+        existing = log_files_for_day(day)
+        self._part = 0
+        if existing:
+            match = PART_RE.search(existing[-1])
+            self._part = int(match.group(2) or 0)
+        self._day = day
+        os.makedirs(log_directory, exist_ok=True)
+        self._stream = open(self._path(), "a", encoding="utf-8")
+        self._remove_expired()
+
+    def _path(self) -> str:
+        suffix = f"_{self._part}" if self._part else ""
+        return os.path.join(log_directory, f"trading_{self._day}{suffix}.log")
+
+    def _remove_expired(self):
+        if not self.retention_days:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+        for path in glob.glob(os.path.join(log_directory, "trading_*.log*")):
+            match = re.search(r"trading_(\d{8})", path)
+            if match and match.group(1) < cutoff:
+                os.remove(path)
+
+    def _rollover_if_needed(self, day: str):
+        if day != self._day:
+            self._open(day)
+        elif self.max_bytes and self._stream.tell() >= self.max_bytes:
+            self._stream.close()
+            self._part += 1
+            self._stream = open(self._path(), "a", encoding="utf-8")
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        """Aynı güne ait kayıtları tek yazma ve tek flush ile diske aktarır"""
+        lines: List[str] = []
+        current_day = None
+        for record in records:
+            day = time.strftime('%Y%m%d', time.localtime(record.created))
+            if day != current_day and lines:
+                self._write(current_day, lines)
+                lines = []
+            current_day = day
+            try:
+                lines.append(self.format(record) + "\n")
+            except Exception:
+                self.handleError(record)
+        if lines:
+            self._write(current_day, lines)
+
+    def _write(self, day: str, lines: List[str]):
+        self._rollover_if_needed(day)
+        self._stream.write("".join(lines))
+        self._stream.flush()
+
+    def emit(self, record: logging.LogRecord):
+        self.emit_batch([record])
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        super().close()
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """Konsola toplu yazan StreamHandler"""
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if lines:
+            self.stream.write("".join(lines))
+            self.flush()
+
+
+# Yazıcı thread'ine kadar değişemeyen argüman tipleri
+IMMUTABLE_ARG_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+def _snapshot(arg):
+    if isinstance(arg, IMMUTABLE_ARG_TYPES):
+        return arg
+    try:
+        return copy.copy(arg)
+    except Exception:
+        return arg
+
+
+class LazyQueueHandler(QueueHandler):
+    """Kaydı biçimlendirmeden kuyruğa atar; mesaj arka plan thread'inde oluşturulur
+
+    Değişebilir argümanların (dict, list ...) yüzeysel kopyası alınır; yazıcı thread'i nesnenin
+    sonraki halini loglamaz, biçimlendirme yine de çağıranın thread'inde yapılmaz.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple):
+            if not all(isinstance(arg, IMMUTABLE_ARG_TYPES) for arg in args):
+                record.args = tuple(_snapshot(arg) for arg in args)
+        elif args:
+            # logger.info("%(key)s", mapping) biçimi
+            record.args = _snapshot(args)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # Kuyruk doluysa istek yolunu bekletmek yerine kayıt düşürülür
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchLogWriter(threading.Thread):
+    """Kuyruktaki kayıtları biriktirip batch_size dolunca ya da flush_interval geçince yazar"""
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler],
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    record = self.queue.get(timeout=max(timeout, 0)) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            if batch:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: List[logging.LogRecord]):
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level]
+            try:
+                if hasattr(handler, "emit_batch"):
+                    handler.emit_batch(records)
+                else:
+                    for record in records:
+                        handler.handle(record)
+            except Exception:
+                # Logging hatası uygulamayı durdurmamalı
+                pass
+
+    def stop(self):
+        self.queue.put(self._STOP)
+        self.join(timeout=5)
+        for handler in self.handlers:
+            handler.close()
+
+
+def _build_formatter() -> logging.Formatter:
+    if settings.log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter(LOG_FORMAT)
+
+
+# Logger'ı yapılandır: istek yolunda sadece kuyruğa ekleme yapılır
+_log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+_formatter = _build_formatter()
+_file_handler = DailyRotatingFileHandler(
+    max_bytes=settings.log_max_bytes,
+    retention_days=settings.log_retention_days,
+)
+_stream_handler = BatchStreamHandler(sys.stderr)  # Konsola da yazdır
+for _handler in (_file_handler, _stream_handler):
+    _handler.setFormatter(_formatter)
+
+_writer = BatchLogWriter(
+    _log_queue,
+    [_file_handler, _stream_handler],
+    batch_size=settings.log_batch_size,
+    flush_interval=settings.log_flush_interval,
+)
+_writer.start()
+
+queue_handler = LazyQueueHandler(_log_queue)
 
-# Logger'ı yapılandır
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler()  # Konsola da yazdır
-    ]
+    handlers=[queue_handler]
 )
 
-logger = logging.getLogger("trading_bot") 
\ No newline at end of file
+
+def shutdown_logging():
+    """Kuyrukta kalan kayıtları yazıp dosyaları kapatır"""
+    if _writer.is_alive():
+        _writer.stop()
+
+
+atexit.register(shutdown_logging)
+
+logger = logging.getLogger("trading_bot")
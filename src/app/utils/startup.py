@@ -0,0 +1,31 @@
+import time
+from typing import Dict, Optional
+
+
+class StartupReport:
+    """Açılış aşamalarının (import, ısınma adımları) süreleri
+
+    Modül başına import dökümü için: python -m benchmarks.startup_report
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self._phases: Dict[str, Dict] = {}
+
+    def record(self, phase: str, seconds: float, error: Optional[str] = None):
+        self._phases[phase] = {"seconds": round(seconds, 4), "ok": error is None, "error": error}
+
+    def mark_ready(self):
+        self.ready_at = time.time()
+
+    def as_dict(self) -> Dict:
+        return {
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "total_seconds": round(self.ready_at - self.started_at, 4) if self.ready_at else None,
+            "phases": dict(self._phases),
+        }
+
+
+startup_report = StartupReport()
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_exchange import FakeExchange, start_fake_exchange, stop_fake_exchange  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fake_exchange():
+    """UMFutures REST yüzeyini taklit eden yerel sunucu (benchmarks/fake_exchange.py)"""
+    exchange = start_fake_exchange(FakeExchange(symbols=["BTCUSDT", "ETHUSDT"]))
+    yield exchange
+    stop_fake_exchange(exchange)
+
+
+@pytest.fixture
+def client(fake_exchange):
+    from binance.um_futures import UMFutures
+
+    fake_exchange.requests.clear()
+    # İmzalı uç noktalar için anahtar gerekir; sahte borsa imzayı doğrulamaz
+    return UMFutures(key="test", secret="test", base_url=fake_exchange.base_url)
+
+
+class RecordingClient:
+    """klines çağrılarının parametrelerini kaydeden istemci sarmalayıcısı"""
+
+    def __init__(self, client):
+        self._client = client
+        self.kline_calls = []
+
+    def klines(self, symbol, interval, **kwargs):
+        self.kline_calls.append(kwargs)
+        return self._client.klines(symbol, interval, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+@pytest.fixture
+def recording_client(client):
+    return RecordingClient(client)
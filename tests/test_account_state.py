@@ -0,0 +1,79 @@
+import asyncio
+
+from src.app.services.account_state import AccountState, UserDataStream
+
+ACCOUNT = {
+    "totalInitialMargin": "10", "totalMaintMargin": "1", "totalWalletBalance": "1000",
+    "totalUnrealizedProfit": "0.5", "totalMarginBalance": "1000.5", "totalPositionInitialMargin": "10",
+    "totalOpenOrderInitialMargin": "0", "totalCrossWalletBalance": "1000", "totalCrossUnPnl": "0.5",
+    "availableBalance": "990", "maxWithdrawAmount": "990",
+    "assets": [{
+        "asset": "USDT", "walletBalance": "1000", "unrealizedProfit": "0.5", "marginBalance": "1000.5",
+        "maintMargin": "1", "initialMargin": "10", "positionInitialMargin": "10", "openOrderInitialMargin": "0",
+        "crossWalletBalance": "1000", "crossUnPnl": "0.5", "availableBalance": "990",
+        "maxWithdrawAmount": "990", "updateTime": 1,
+    }],
+    "positions": [{
+        "symbol": "BTCUSDT", "positionSide": "BOTH", "positionAmt": "0.1", "unrealizedProfit": "0.5",
+        "isolatedMargin": "0", "notional": "10.5", "isolatedWallet": "0", "initialMargin": "10",
+        "maintMargin": "1", "updateTime": 1,
+    }],
+}
+POSITIONS = [{
+    "symbol": "BTCUSDT", "positionSide": "BOTH", "positionAmt": "0.1", "entryPrice": "100",
+    "breakEvenPrice": "100.04", "markPrice": "105", "unRealizedProfit": "0.5", "liquidationPrice": "0",
+    "isolatedMargin": "0", "notional": "10.5", "marginAsset": "USDT", "isolatedWallet": "0",
+    "initialMargin": "10", "maintMargin": "1", "positionInitialMargin": "10", "openOrderInitialMargin": "0",
+    "adl": 1, "bidNotional": "0", "askNotional": "0", "updateTime": 1,
+}]
+OPEN_ORDER = {"orderId": 7, "symbol": "BTCUSDT", "clientOrderId": "tb1", "side": "SELL",
+              "type": "STOP_MARKET", "origQty": "0.1", "executedQty": "0", "price": "0", "stopPrice": "90",
+              "reduceOnly": True, "positionSide": "BOTH", "status": "NEW", "updateTime": 1}
+
+
+def seeded_state(orders=()) -> AccountState:
+    state = AccountState()
+    state.begin_seed()
+    state.seed(ACCOUNT, POSITIONS, list(orders))
+    return state
+
+
+def account_update(wallet: str, positions):
+    return {"e": "ACCOUNT_UPDATE", "E": 2 ** 50, "T": 2 ** 50, "a": {
+        "B": [{"a": "USDT", "wb": wallet, "cw": wallet}],
+        "P": [{"s": symbol, "pa": amount, "ep": "100", "up": "0", "ps": "BOTH"} for symbol, amount in positions],
+    }}
+
+
+def test_live_views_keep_rest_fields_after_stream_updates():
+    state = seeded_state()
+    state.apply_event(account_update("1010", [("BTCUSDT", "0.2"), ("ETHUSDT", "1")]))
+
+    account = state.account()
+    assert set(account) == set(ACCOUNT)
+    assert float(account["totalWalletBalance"]) == 1010
+    assert float(account["availableBalance"]) == 1000
+    assert [set(position) for position in account["positions"]] == [set(ACCOUNT["positions"][0])] * 2
+    assert [set(position) for position in state.positions()] == [set(POSITIONS[0])] * 2
+    assert state.positions("BTCUSDT")[0]["positionAmt"] == "0.2"
+
+
+def test_closed_position_is_listed_only_while_the_symbol_has_open_orders():
+    state = seeded_state(orders=[OPEN_ORDER])
+    state.apply_event(account_update("1000", [("BTCUSDT", "0")]))
+    assert [position["positionAmt"] for position in state.positions("BTCUSDT")] == ["0"]
+
+    state.apply_event({"e": "ORDER_TRADE_UPDATE", "T": 2 ** 50, "o": {
+        "i": 7, "s": "BTCUSDT", "c": "tb1", "S": "SELL", "o": "STOP_MARKET", "q": "0.1", "z": "0",
+        "p": "0", "sp": "90", "X": "CANCELED", "T": 2 ** 50}})
+    assert state.positions("BTCUSDT") == []
+    assert state.account()["positions"] == []
+
+
+def test_reconciled_state_matches_rest_account(client):
+    state = AccountState()
+    stream = UserDataStream(state, lambda: client)
+
+    assert asyncio.run(stream.reconcile()) == 0
+    assert set(state.account()) == set(client.account())
+    assert state.balance("USDT") == 10_000.0
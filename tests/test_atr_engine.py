@@ -0,0 +1,107 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.app.services.atr_calculator import calculate_atr
+from src.app.services.atr_engine import ATREngine, StreamingATR
+
+HOUR_MS = 3_600_000
+PERIOD = 14
+
+
+def make_klines(count: int, start: int = 0, seed: int = 1):
+    rng = random.Random(seed)
+    klines, close = [], 100.0
+    for index in range(start, start + count):
+        open_ = close
+        close = open_ + rng.uniform(-2, 2)
+        high = max(open_, close) + rng.uniform(0, 1)
+        low = min(open_, close) - rng.uniform(0, 1)
+        klines.append([index * HOUR_MS, str(open_), str(high), str(low), str(close), "1.0"])
+    return klines
+
+
+def batch_atr(klines, smoothing: str):
+    """Kesintisiz seri üzerinde toplu TR/ATR (Wilder, ilk periyodun SMA'sıyla başlar)"""
+    result = calculate_atr(klines, PERIOD)
+    tr, atr = np.asarray(result["tr_values"]), np.asarray(result["atr_values"])
+    if smoothing == "wilder":
+        for index in range(PERIOD, len(tr)):
+            atr[index] = (atr[index - 1] * (PERIOD - 1) + tr[index]) / PERIOD
+    return tr, atr
+
+
+def ingest(engine: ATREngine, window, smoothing: str):
+    closed, forming = window[:-1], window[-1]
+    return engine.ingest(
+        "BTCUSDT", "1h",
+        open_time=[k[0] for k in closed],
+        high=[float(k[2]) for k in closed],
+        low=[float(k[3]) for k in closed],
+        close=[float(k[4]) for k in closed],
+        forming_high=float(forming[2]),
+        forming_low=float(forming[3]),
+        period=PERIOD,
+        smoothing=smoothing,
+    )
+
+
+def assert_matches_batch(result, history, smoothing):
+    tr, atr = batch_atr(history, smoothing)
+    size = len(result["tr_values"])
+    np.testing.assert_allclose(result["tr_values"], tr[-size:], rtol=1e-9)
+    np.testing.assert_allclose(result["atr_values"], atr[-size:], rtol=1e-9, equal_nan=True)
+    assert math.isclose(result["atr"], atr[-1], rel_tol=1e-9)
+
+
+@pytest.mark.parametrize("smoothing", ["sma", "wilder"])
+def test_single_window_matches_batch(smoothing):
+    klines = make_klines(60)
+
+    assert_matches_batch(ingest(ATREngine(), klines, smoothing), klines, smoothing)
+
+
+@pytest.mark.parametrize("smoothing", ["sma", "wilder"])
+def test_sliding_windows_carry_state(smoothing):
+    klines = make_klines(120)
+    engine = ATREngine()
+
+    # resampler.sync gibi her turda son 30 mum (sonuncusu oluşan mum) gelir
+    for end in range(30, len(klines) + 1, 7):
+        result = ingest(engine, klines[end - 30:end], smoothing)
+        assert_matches_batch(result, klines[:end], smoothing)
+
+
+@pytest.mark.parametrize("smoothing", ["sma", "wilder"])
+def test_adjacent_window_keeps_state(smoothing):
+    klines = make_klines(80)
+    engine = ATREngine()
+    ingest(engine, klines[:41], smoothing)
+
+    # İkinci pencere bilinen son kapanmış mumun hemen ardından başlar
+    result = ingest(engine, klines[40:80], smoothing)
+
+    assert_matches_batch(result, klines, smoothing)
+
+
+@pytest.mark.parametrize("smoothing", ["sma", "wilder"])
+def test_gap_restarts_from_window(smoothing):
+    klines = make_klines(100)
+    engine = ATREngine()
+    ingest(engine, klines[:41], smoothing)
+
+    result = ingest(engine, klines[60:100], smoothing)
+
+    assert_matches_batch(result, klines[60:100], smoothing)
+
+
+def test_streaming_update_ignores_seen_bars():
+    state = StreamingATR(PERIOD)
+    for kline in make_klines(20):
+        state.update(kline[0], float(kline[2]), float(kline[3]), float(kline[4]))
+    atr = state.atr
+
+    assert state.update(0, 1_000.0, 0.0, 500.0) == atr
+    assert state.count == 20
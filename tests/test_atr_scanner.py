@@ -0,0 +1,79 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.app.services import atr_scanner
+from src.app.services.atr_calculator import calculate_atr
+from src.app.services.atr_scanner import compute_atr_matrix, scan_atr
+
+PERIOD = 14
+
+
+def make_series(length: int, seed: int):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, length).cumsum()
+    return {"high": close + rng.uniform(0, 1, length), "low": close - rng.uniform(0, 1, length), "close": close}
+
+
+def as_klines(series):
+    return [[i * 60_000, "0", str(h), str(l), str(c), "0"]
+            for i, (h, l, c) in enumerate(zip(series["high"], series["low"], series["close"]))]
+
+
+def pack(series_list):
+    width = max(len(series["close"]) for series in series_list)
+    packed = {name: np.full((len(series_list), width), np.nan) for name in ("high", "low", "close")}
+    for row, series in enumerate(series_list):
+        for name, matrix in packed.items():
+            matrix[row, width - len(series[name]):] = series[name]
+    return packed
+
+
+def test_padded_matrix_matches_per_symbol_atr():
+    series_list = [make_series(length, seed) for seed, length in enumerate((100, 60, 15, 10))]
+    packed = pack(series_list)
+
+    tr, atr = compute_atr_matrix(packed["high"], packed["low"], packed["close"], PERIOD)
+
+    for row, series in enumerate(series_list):
+        length = len(series["close"])
+        expected = calculate_atr(as_klines(series), PERIOD)
+        np.testing.assert_allclose(tr[row, -length:], expected["tr_values"])
+        np.testing.assert_allclose(atr[row, -length:], expected["atr_values"], equal_nan=True)
+        # Dolgu bölgesi hesaba karışmaz
+        assert np.isnan(atr[row, :-length]).all()
+    # Periyottan kısa seride ATR yok
+    assert np.isnan(atr[3]).all()
+
+
+class MarkPriceClient:
+    def mark_price(self, symbol=None):
+        return [{"symbol": symbol, "markPrice": "100"} for symbol in ("BTCUSDT", "ETHUSDT", "BADUSDT")]
+
+
+@pytest.fixture
+def fake_series(monkeypatch):
+    lengths = {"BTCUSDT": 100, "ETHUSDT": 40, "SOLUSDT": 50}
+
+    def fetch(client, symbol, interval, limit):
+        if symbol == "BADUSDT":
+            raise ValueError("Invalid symbol.")
+        return make_series(lengths[symbol], seed=len(symbol) + lengths[symbol])
+
+    monkeypatch.setattr(atr_scanner, "_fetch_series", fetch)
+    monkeypatch.setattr(atr_scanner.market_cache, "get_mark_price", lambda symbol: None)
+    return fetch
+
+
+def test_scan_isolates_per_symbol_errors(fake_series):
+    results = asyncio.run(scan_atr(MarkPriceClient(), ["btcusdt", "BADUSDT", "SOLUSDT", "ETHUSDT"], ["1h"]))
+
+    assert [result["status"] for result in results] == ["success", "error", "error", "success"]
+    assert results[1]["message"] == "Invalid symbol."
+    assert results[2]["message"] == "No mark price for SOLUSDT"
+    for result in (results[0], results[3]):
+        series = fake_series(None, result["symbol"], "1h", 100)
+        expected = calculate_atr(as_klines(series), PERIOD)
+        assert result["atr"] == pytest.approx(expected["atr"])
+        assert result["signals"]["stop_loss"] == pytest.approx(100 - expected["atr"])
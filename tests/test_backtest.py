@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.app.services import backtest
+from src.app.services.backtest import run_backtest, run_backtest_async, shutdown_process_pool, simulate
+from src.app.services.kline_store import COLUMNS, INTERVAL_MS, KlineSeries
+
+
+def bars(rows):
+    high, low, close = (np.array(column, dtype=float) for column in zip(*rows))
+    return high, low, close
+
+
+def test_take_profit_hit():
+    # Giriş 100, TP = 100 + 1 * 2 = 102, SL = 99; ikinci mum TP'ye değer
+    high, low, close = bars([(100.5, 99.5, 100), (101, 99.5, 100.5), (102.5, 100, 102)])
+    atr = np.ones(3)
+
+    result = simulate(high, low, close, atr, atr_multiplier=2, fee_rate=0)
+
+    assert result["trades"] == 1
+    assert result["pnl"] == pytest.approx(0.02)
+    assert result["win_rate"] == 1.0
+    assert result["max_drawdown"] == 0.0
+
+
+def test_same_bar_hit_counts_as_stop_loss():
+    high, low, close = bars([(100.5, 99.5, 100), (102.5, 98.5, 100), (100.5, 99.5, 100)])
+    atr = np.ones(3)
+
+    result = simulate(high, low, close, atr, atr_multiplier=2, fee_rate=0.001)
+
+    assert result["trades"] == 1
+    assert result["pnl"] == pytest.approx(-0.01 - 0.002)
+    assert result["win_rate"] == 0.0
+
+
+def test_no_entry_before_atr_and_open_trade_at_end():
+    high, low, close = bars([(101, 99, 100)] * 4)
+    atr = np.array([np.nan, np.nan, 5.0, 5.0])
+
+    # ATR'li ilk mumda girilir, seri bitene kadar TP/SL'ye değmez
+    assert simulate(high, low, close, atr, atr_multiplier=2)["trades"] == 0
+
+
+@pytest.fixture
+def stored_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtest.kline_store, "root", str(tmp_path))
+    rng = np.random.default_rng(3)
+    count = 500
+    close = 100 + rng.normal(0, 1, count).cumsum()
+    columns = {
+        "open_time": np.arange(count, dtype=np.int64) * INTERVAL_MS["1h"],
+        "open": close,
+        "high": close + rng.uniform(0, 2, count),
+        "low": close - rng.uniform(0, 2, count),
+        "close": close,
+        "volume": np.ones(count),
+    }
+    columns["close_time"] = columns["open_time"] + INTERVAL_MS["1h"] - 1
+    assert set(columns) == {name for name, _, _ in COLUMNS}
+    KlineSeries(str(tmp_path / "BTCUSDT" / "1h")).append(columns)
+    return columns
+
+
+def test_sweep_matches_in_process_simulation(stored_series):
+    multipliers = [1.5, 2.5]
+
+    rows = run_backtest(["btcusdt", "ETHUSDT"], ["1h"], [14], multipliers, max_workers=1)
+
+    assert [(row["symbol"], row["atr_multiplier"], row["status"]) for row in rows] == [
+        ("BTCUSDT", 1.5, "success"), ("BTCUSDT", 2.5, "success"),
+        ("ETHUSDT", 1.5, "error"), ("ETHUSDT", 2.5, "error")]
+    expected = backtest._run_task(backtest._build_tasks(["BTCUSDT"], ["1h"], [14], multipliers,
+                                                        backtest.DEFAULT_FEE_RATE, None, None)[0])
+    assert rows[:2] == expected
+    assert rows[0]["trades"] > 0 and rows[0]["bars"] == 500
+
+
+def test_async_sweep_uses_time_range(stored_series):
+    start, end = int(stored_series["open_time"][100]), int(stored_series["open_time"][299])
+    try:
+        rows = asyncio.run(run_backtest_async(["BTCUSDT"], ["1h"], [14], [2.0], start_time=start, end_time=end))
+    finally:
+        shutdown_process_pool()
+
+    assert rows[0]["status"] == "success"
+    assert rows[0]["bars"] == 200
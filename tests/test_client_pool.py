@@ -0,0 +1,75 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from src.app.services.client_pool import ClientPool, _client_class
+from src.app.services.metrics import errors_total, exchange_latency
+
+
+def latency_count(method: str) -> int:
+    series = exchange_latency._series.get((method,))
+    return series[2] if series else 0
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_api_methods_are_wrapped_once_on_the_class():
+    cls = _client_class()
+
+    assert "time" in vars(cls) and "klines" in vars(cls)
+    client = cls(base_url="http://127.0.0.1")
+    assert client.time.__func__ is vars(cls)["time"]
+
+
+def test_wrapped_call_records_latency_and_errors(fake_exchange):
+    pool = ClientPool(timeout=2)
+    before = latency_count("time")
+
+    assert "serverTime" in pool.get(base_url=fake_exchange.base_url).time()
+    assert latency_count("time") == before + 1
+
+    errors_before = errors_total._values.get(("exchange", "ConnectionError"), 0)
+    with pytest.raises(Exception):
+        pool.get(base_url=closed_port_url()).time()
+    assert latency_count("time") == before + 2
+    assert errors_total._values.get(("exchange", "ConnectionError"), 0) == errors_before + 1
+    pool.close()
+
+
+def test_evicted_client_is_closed_after_in_flight_request(fake_exchange, monkeypatch):
+    monkeypatch.setitem(fake_exchange.path_latency, "/fapi/v1/time", 0.3)
+    pool = ClientPool(max_clients=1, timeout=5)
+    first = pool.get(key="a", base_url=fake_exchange.base_url)
+    adapter = first.session.get_adapter(fake_exchange.base_url)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(first.time()))
+    thread.start()
+    time.sleep(0.1)
+
+    # Yeni istemci ilkini havuzdan çıkarır; süren istek kesilmez
+    pool.get(key="b", base_url=fake_exchange.base_url)
+    assert len(adapter.poolmanager.pools) == 1
+    thread.join()
+
+    assert "serverTime" in results[0]
+    assert len(adapter.poolmanager.pools) == 0
+    pool.close()
+
+
+def test_idle_evicted_client_is_closed_immediately(fake_exchange):
+    pool = ClientPool(max_clients=1, timeout=5)
+    first = pool.get(key="a", base_url=fake_exchange.base_url)
+    first.time()
+    adapter = first.session.get_adapter(fake_exchange.base_url)
+
+    pool.get(key="b", base_url=fake_exchange.base_url)
+
+    assert len(adapter.poolmanager.pools) == 0
+    assert pool.connection_stats()["clients"] == 1
+    pool.close()
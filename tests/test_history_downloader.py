@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import numpy as np
+
+from src.app.services.history_downloader import Chunk, HistoryDownloader, parse_date
+from src.app.services.kline_store import INTERVAL_MS
+
+START = parse_date("2023-01-01")
+END = parse_date("2025-01-01")
+# 2023: 365 gün, 2024: 366 gün
+BARS_PER_YEAR = {"2023": 365 * 6, "2024": 366 * 6}
+
+
+def download(downloader: HistoryDownloader, symbols=("BTCUSDT", "ETHUSDT")):
+    return asyncio.run(downloader.download(list(symbols), ["4h"], START, END))
+
+
+def test_completed_chunks_are_not_downloaded_again(tmp_path, client, fake_exchange):
+    downloader = HistoryDownloader(str(tmp_path), lambda: client, workers=2)
+    try:
+        first = download(downloader)
+        assert (first["chunks"], first["done"], first["failed"]) == (4, 4, 0)
+        assert first["klines"] == 2 * sum(BARS_PER_YEAR.values())
+        # Parça başına 1500'lük iki sayfa
+        assert fake_exchange.requests["/fapi/v1/klines"] == 8
+
+        fake_exchange.requests.clear()
+        second = download(downloader)
+        assert second["chunks"] == 0
+        assert "/fapi/v1/klines" not in fake_exchange.requests
+
+        columns = downloader.load("BTCUSDT", "4h")
+        assert len(columns["open_time"]) == sum(BARS_PER_YEAR.values())
+        assert (np.diff(columns["open_time"]) == INTERVAL_MS["4h"]).all()
+    finally:
+        downloader.shutdown()
+
+
+def test_interrupted_chunk_resumes_from_its_last_bar(tmp_path, client, fake_exchange):
+    downloader = HistoryDownloader(str(tmp_path), lambda: client)
+    try:
+        download(downloader, symbols=("BTCUSDT",))
+        expected = downloader.load("BTCUSDT", "4h")
+    finally:
+        downloader.shutdown()
+
+    # Kesinti: 2024 parçasının yalnızca ilk 1000 mumu yazılmış ve checkpoint tamamlanmamış
+    chunk = Chunk("BTCUSDT", "4h", "2024", parse_date("2024-01-01"), END)
+    with np.load(downloader.chunk_path(chunk)) as data:
+        partial = {name: data[name][:1000] for name in data.files}
+    with open(downloader.chunk_path(chunk), "wb") as f:
+        np.savez_compressed(f, **partial)
+    with open(downloader.checkpoint_path) as f:
+        checkpoint = json.load(f)
+    checkpoint[chunk.key] = {"complete": False, "rows": 1000}
+    with open(downloader.checkpoint_path, "w") as f:
+        json.dump(checkpoint, f)
+
+    fake_exchange.requests.clear()
+    resumed = HistoryDownloader(str(tmp_path), lambda: client)
+    try:
+        result = download(resumed, symbols=("BTCUSDT",))
+        assert (result["chunks"], result["klines"]) == (1, BARS_PER_YEAR["2024"] - 1000)
+        assert fake_exchange.requests["/fapi/v1/klines"] == 1
+
+        columns = resumed.load("BTCUSDT", "4h")
+        for name, column in expected.items():
+            np.testing.assert_array_equal(columns[name], column)
+        with open(resumed.checkpoint_path) as f:
+            assert json.load(f)[chunk.key]["complete"] is True
+    finally:
+        resumed.shutdown()
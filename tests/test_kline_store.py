@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.app.services.kline_store import INTERVAL_MS, KlineStore
+from src.app.services.rate_limiter import kline_weight
+
+
+def test_growing_limit_backfills_history(tmp_path, recording_client):
+    store = KlineStore(str(tmp_path))
+
+    for limit in (100, 300, 200, 1000):
+        closed, forming = store.sync(recording_client, "BTCUSDT", "1h", limit)
+        open_time = closed["open_time"]
+        assert len(open_time) == limit - 1
+        assert (np.diff(open_time) == INTERVAL_MS["1h"]).all()
+        assert int(forming[0]) == open_time[-1] + INTERVAL_MS["1h"]
+
+    assert len(store.series("BTCUSDT", "1h")) == 999
+
+
+def test_requests_are_sized_to_missing_bars(tmp_path, recording_client):
+    store = KlineStore(str(tmp_path))
+    store.sync(recording_client, "BTCUSDT", "1h", 100)
+    recording_client.kline_calls.clear()
+
+    # Depo güncel: yalnızca oluşan mum ve saat payı istenir
+    store.sync(recording_client, "BTCUSDT", "1h", 100)
+    assert [call["limit"] for call in recording_client.kline_calls] == [2]
+
+    # Başta eksik 200 mum tek istekte, ağırlığı limite göre çekilir
+    recording_client.kline_calls.clear()
+    store.sync(recording_client, "BTCUSDT", "1h", 300)
+    backfill = [call for call in recording_client.kline_calls if "endTime" in call]
+    assert [call["limit"] for call in backfill] == [200]
+    assert max(kline_weight(call["limit"]) for call in recording_client.kline_calls) == 2
+
+
+def test_stream_tail_defers_to_sync_when_history_is_short(tmp_path, recording_client):
+    store = KlineStore(str(tmp_path))
+    closed, forming = store.sync(recording_client, "BTCUSDT", "1h", 50)
+    live = {"open_time": int(forming[0]), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+            "volume": 1.0, "close_time": int(forming[6]), "closed": False}
+
+    assert store.stream_tail("BTCUSDT", "1h", 50, live) is not None
+    assert store.stream_tail("BTCUSDT", "1h", 120, live) is None
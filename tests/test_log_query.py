@@ -0,0 +1,94 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.app.services import log_query
+from src.app.services.log_query import LogIndex, query_logs, tail_lines
+from src.app.utils import logger as logger_module
+
+DAY = date(2024, 1, 1)
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger_module, "log_directory", str(tmp_path))
+    return tmp_path
+
+
+def record(second: int, level: str, message: str) -> str:
+    stamp = (START + timedelta(seconds=second)).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{stamp},000 - trading_bot - {level} - {message}\n"
+
+
+def write_log(log_dir, count: int, name: str = "trading_20240101.log") -> str:
+    """Her 50. kayıt ERROR (ardından traceback satırı), kalanlar INFO"""
+    lines = []
+    for second in range(count):
+        if second % 50 == 0:
+            lines.append(record(second, "ERROR", f"order failed {second} BTCUSDT"))
+            lines.append("Traceback (most recent call last):\n")
+        else:
+            lines.append(record(second, "INFO", f"tick {second} ETHUSDT"))
+    path = os.path.join(log_dir, name)
+    with open(path, "w") as f:
+        f.writelines(lines)
+    return path
+
+
+def test_tail_lines_reads_last_lines_across_blocks(log_dir):
+    path = write_log(log_dir, 5000)
+    assert os.path.getsize(path) > 2 * log_query.BLOCK_SIZE
+
+    lines = tail_lines([path], 3)
+
+    assert lines == [record(4997, "INFO", "tick 4997 ETHUSDT"), record(4998, "INFO", "tick 4998 ETHUSDT"),
+                     record(4999, "INFO", "tick 4999 ETHUSDT")]
+
+
+def test_end_time_seeks_instead_of_scanning_from_the_tail(log_dir):
+    write_log(log_dir, 5000)
+    end = START + timedelta(seconds=1234)
+
+    result = query_logs(day=DAY, end=end, limit=2)
+
+    assert result["records"] == [record(1233, "INFO", "tick 1233 ETHUSDT").rstrip("\n"),
+                                 record(1234, "INFO", "tick 1234 ETHUSDT").rstrip("\n")]
+    assert result["next_cursor"] is not None
+
+
+def test_level_filter_uses_index_and_pages_with_cursor(log_dir):
+    path = write_log(log_dir, 5000)
+
+    first = query_logs(day=DAY, level="error", limit=3)
+    second = query_logs(day=DAY, level="ERROR", limit=3, cursor=first["next_cursor"])
+
+    assert os.path.exists(path + ".idx")
+    assert [text.split(" - ")[-1].split("\n")[0] for text in first["records"]] == [
+        "order failed 4850 BTCUSDT", "order failed 4900 BTCUSDT", "order failed 4950 BTCUSDT"]
+    # Traceback devam satırı kayda dahil
+    assert first["records"][-1].endswith("Traceback (most recent call last):")
+    assert second["records"][-1].startswith(record(4800, "ERROR", "").split(" - ")[0])
+
+
+def test_unknown_level_is_rejected(log_dir):
+    write_log(log_dir, 10)
+
+    with pytest.raises(ValueError):
+        query_logs(day=DAY, level="VERBOSE")
+
+
+def test_index_is_rebuilt_when_log_file_shrinks(log_dir):
+    path = write_log(log_dir, 5000)
+    assert len(LogIndex(path).entries()) == 100
+
+    # Dosya yeniden yazıldı: eski ofsetler artık geçersiz
+    write_log(log_dir, 120)
+    entries = LogIndex(path).entries()
+
+    assert len(entries) == 3
+    with open(path, "rb") as f:
+        assert [log_query.read_record(f, int(offset)).split(b" - ")[-1].split(b"\n")[0]
+                for offset in entries[:, 0]] == [b"order failed 0 BTCUSDT", b"order failed 50 BTCUSDT",
+                                                 b"order failed 100 BTCUSDT"]
@@ -0,0 +1,32 @@
+import logging
+import queue
+
+from src.app.utils.logger import LazyQueueHandler
+
+
+def make_record(msg, args):
+    return logging.LogRecord("trading_bot", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_prepare_snapshots_mutable_args_without_formatting():
+    handler = LazyQueueHandler(queue.Queue())
+    positions = [{"symbol": "BTCUSDT", "positionAmt": "0.01"}]
+
+    record = handler.prepare(make_record("Positions: %s", (positions,)))
+    positions.append({"symbol": "ETHUSDT", "positionAmt": "1"})
+
+    # Mesaj yazıcı thread'inde oluşturulur, çağrı anındaki liste görülür
+    assert record.msg == "Positions: %s"
+    assert record.getMessage() == "Positions: [{'symbol': 'BTCUSDT', 'positionAmt': '0.01'}]"
+
+
+def test_prepare_keeps_immutable_args_and_mappings():
+    handler = LazyQueueHandler(queue.Queue())
+    values = {"symbol": "BTCUSDT"}
+
+    plain = handler.prepare(make_record("%s %s", ("BTCUSDT", 1)))
+    mapping = handler.prepare(make_record("%(symbol)s", (values,)))
+    values["symbol"] = "ETHUSDT"
+
+    assert plain.args == ("BTCUSDT", 1)
+    assert mapping.getMessage() == "BTCUSDT"
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app.services import market_stream
+from src.app.services.market_stream import MarketDataCache, MarketStream
+
+
+def kline_message(closed: bool, open_time: int = 1_700_000_040_000) -> str:
+    return json.dumps({"stream": "btcusdt@kline_1m", "data": {"e": "kline", "k": {
+        "s": "BTCUSDT", "i": "1m", "t": open_time, "T": open_time + 59_999, "o": "100.0", "h": "101.5",
+        "l": "99.5", "c": "101.0", "v": "12.5", "x": closed}}})
+
+
+def test_messages_update_cache_and_closed_klines_notify_listeners():
+    cache = MarketDataCache(max_age=5)
+    stream = MarketStream(cache, ["btcusdt"], ["1m"])
+    closed = []
+    cache.add_kline_listener(lambda symbol, interval, kline: closed.append((symbol, interval, kline["close"])))
+
+    stream.handle_message(json.dumps({"stream": "btcusdt@markPrice@1s",
+                                      "data": {"e": "markPriceUpdate", "s": "BTCUSDT", "p": "100.25"}}))
+    stream.handle_message(kline_message(closed=False))
+    assert cache.get_mark_price("BTCUSDT") == 100.25
+    assert cache.get_kline("BTCUSDT", "1m")["high"] == 101.5
+    assert closed == []
+
+    stream.handle_message(kline_message(closed=True))
+    assert closed == [("BTCUSDT", "1m", 101.0)]
+    assert stream.messages == 3
+    assert "btcusdt@markPrice@1s/btcusdt@kline_1m" in stream.url
+
+
+def test_stale_prices_fall_back_to_rest(client, fake_exchange, monkeypatch):
+    cache = MarketDataCache(max_age=5)
+    monkeypatch.setattr(market_stream, "market_cache", cache)
+
+    cache.update_mark_price("BTCUSDT", 123.0)
+    assert asyncio.run(market_stream.get_mark_price(client, "BTCUSDT")) == 123.0
+    assert "/fapi/v1/premiumIndex" not in fake_exchange.requests
+
+    assert cache.get_mark_price("BTCUSDT", max_age=0) is None
+    cache.max_age = 0
+    price = asyncio.run(market_stream.get_mark_price(client, "BTCUSDT"))
+    assert price == pytest.approx(fake_exchange.mark_price("BTCUSDT"))
+    assert fake_exchange.requests["/fapi/v1/premiumIndex"] == 1
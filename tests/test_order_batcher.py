@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+
+from src.app.services.executor import order_executor
+from src.app.services.order_batcher import BracketOrderError, place_bracket, submit_order
+from src.app.services.paper_exchange import PaperExchange, _client_error
+
+
+class SlowExchange(PaperExchange):
+    """Emri işleyen ama yanıtı çağıranın zaman aşımından sonra dönen borsa"""
+
+    def __init__(self, delay: float, reaches_exchange: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.reaches_exchange = reaches_exchange
+
+    def new_order(self, **params):
+        if not self.reaches_exchange:
+            time.sleep(self.delay)
+            raise ConnectionError("Connection reset before the request was sent")
+        order = super().new_order(**params)
+        time.sleep(self.delay)
+        return order
+
+
+@pytest.fixture
+def short_order_timeout(monkeypatch):
+    # binance paketinin ilk yüklenmesi kısa zaman aşımından uzun sürer
+    _client_error()
+    monkeypatch.setattr(order_executor, "default_timeout", 0.2)
+
+
+def make_exchange(exchange_class=PaperExchange, **kwargs):
+    exchange = exchange_class(balance=1_000.0, **kwargs)
+    exchange.add_symbol("BTCUSDT")
+    exchange.update_price("BTCUSDT", 100.0)
+    return exchange
+
+
+def test_submit_order_returns_order_filled_after_timeout(short_order_timeout):
+    exchange = make_exchange(SlowExchange, delay=0.5)
+
+    order = asyncio.run(submit_order(exchange, symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01))
+
+    assert order["status"] == "FILLED"
+    assert order["clientOrderId"].startswith("tb")
+    assert float(exchange.get_position_risk("BTCUSDT")[0]["positionAmt"]) == 0.01
+
+
+def test_submit_order_raises_timeout_when_order_never_reached_exchange(short_order_timeout):
+    exchange = make_exchange(SlowExchange, delay=0.5, reaches_exchange=False)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(submit_order(exchange, symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01))
+
+    assert exchange.get_position_risk("BTCUSDT") == []
+
+
+def test_submit_order_keeps_caller_client_order_id():
+    exchange = make_exchange()
+
+    order = asyncio.run(submit_order(exchange, symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01,
+                                     newClientOrderId="entry-1"))
+
+    assert order["clientOrderId"] == "entry-1"
+    assert exchange.query_order("BTCUSDT", origClientOrderId="entry-1")["orderId"] == order["orderId"]
+
+
+class FlakyExchange(PaperExchange):
+    """Toplu çağrıda verilen emir tiplerini geçici hatayla reddeden borsa"""
+
+    def __init__(self, reject_types=(), fail_rollback: bool = False, batch_delay: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.reject_types = set(reject_types)
+        self.fail_rollback = fail_rollback
+        self.batch_delay = batch_delay
+
+    def new_batch_order(self, batchOrders):
+        results = [{"code": -1001, "msg": "Internal error; unable to process your request."}
+                   if order["type"] in self.reject_types else super(FlakyExchange, self).new_batch_order([order])[0]
+                   for order in batchOrders]
+        time.sleep(self.batch_delay)
+        return results
+
+    def new_order(self, **params):
+        if self.fail_rollback and params["type"] == "MARKET" and params.get("reduceOnly") == "true":
+            raise ConnectionError("Connection reset by peer")
+        return super().new_order(**params)
+
+    def cancel_batch_order(self, symbol, orderIdList, origClientOrderIdList=None, **kwargs):
+        if self.fail_rollback:
+            raise ConnectionError("Connection reset by peer")
+        return super().cancel_batch_order(symbol, orderIdList, origClientOrderIdList, **kwargs)
+
+
+def open_long(exchange, quantity=0.01):
+    exchange.new_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=quantity)
+
+
+def position_amount(exchange) -> float:
+    return sum(float(position["positionAmt"]) for position in exchange.get_position_risk("BTCUSDT"))
+
+
+def test_bracket_retries_rejected_leg_once():
+    exchange = make_exchange(FlakyExchange, reject_types={"STOP_MARKET"})
+    open_long(exchange)
+
+    results = asyncio.run(place_bracket(exchange, "BTCUSDT", 0.01, take_profit=110.0, stop_loss=95.0))
+
+    assert {results["take_profit"]["type"], results["stop_loss"]["type"]} == {"TAKE_PROFIT_MARKET", "STOP_MARKET"}
+    assert len(exchange.get_orders("BTCUSDT")) == 2
+    assert position_amount(exchange) == 0.01
+
+
+def test_bracket_rolls_back_when_retry_fails():
+    exchange = make_exchange()
+    open_long(exchange)
+
+    # Stop fiyatı işaret fiyatının üstünde: toplu çağrıda da tekil denemede de -2021
+    with pytest.raises(BracketOrderError) as error:
+        asyncio.run(place_bracket(exchange, "BTCUSDT", 0.01, take_profit=110.0, stop_loss=105.0))
+
+    assert error.value.flattened
+    assert error.value.open_legs == []
+    assert exchange.get_orders("BTCUSDT") == []
+    assert position_amount(exchange) == 0
+
+
+def test_bracket_reports_failed_rollback():
+    exchange = make_exchange(FlakyExchange, fail_rollback=True)
+    open_long(exchange)
+
+    with pytest.raises(BracketOrderError) as error:
+        asyncio.run(place_bracket(exchange, "BTCUSDT", 0.01, take_profit=110.0, stop_loss=105.0))
+
+    assert not error.value.flattened
+    assert error.value.open_legs == ["take_profit"]
+    assert "NOT closed" in str(error.value)
+    assert position_amount(exchange) == 0.01
+
+
+def test_bracket_reconciles_timed_out_batch_by_client_order_id(short_order_timeout):
+    exchange = make_exchange(FlakyExchange, batch_delay=0.5)
+    open_long(exchange)
+
+    results = asyncio.run(place_bracket(exchange, "BTCUSDT", 0.01, take_profit=110.0, stop_loss=95.0))
+
+    orders = exchange.get_orders("BTCUSDT")
+    assert len(orders) == 2
+    assert {order["orderId"] for order in orders} == {results["take_profit"]["orderId"],
+                                                      results["stop_loss"]["orderId"]}
@@ -0,0 +1,53 @@
+from src.app.services.paper_exchange import PaperExchange
+
+
+def make_exchange(client=None, balance=1_000.0):
+    exchange = PaperExchange(balance=balance, market_data=client)
+    exchange.add_symbol("BTCUSDT")
+    return exchange
+
+
+def test_batch_order_reports_rejected_legs_without_failing_the_batch(client, fake_exchange):
+    exchange = make_exchange(client)
+    price = fake_exchange.mark_price("BTCUSDT")
+
+    results = exchange.new_batch_order([
+        {"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": "0.01"},
+        # Marj yetersiz
+        {"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": "100000"},
+        # Hemen tetiklenecek stop
+        {"symbol": "BTCUSDT", "side": "SELL", "type": "STOP_MARKET", "quantity": "0.01",
+         "stopPrice": str(price * 2), "reduceOnly": "true"},
+        {"symbol": "BTCUSDT", "side": "SELL", "type": "LIMIT", "quantity": "0.01"},
+    ])
+
+    assert results[0]["status"] == "FILLED"
+    assert [result.get("code") for result in results[1:]] == [-2019, -2021, -1116]
+    assert all("msg" in result and "orderId" not in result for result in results[1:])
+    assert fake_exchange.requests.get("/fapi/v1/premiumIndex", 0) >= 1
+
+
+def test_cancel_batch_order_reports_unknown_ids():
+    exchange = make_exchange()
+    exchange.update_price("BTCUSDT", 100.0)
+    placed = exchange.new_order(symbol="BTCUSDT", side="SELL", type="STOP_MARKET", quantity="0.01",
+                                stopPrice="90", reduceOnly="true")
+
+    results = exchange.cancel_batch_order("BTCUSDT", [placed["orderId"], 999])
+
+    assert results[0]["status"] == "CANCELED"
+    assert results[1] == {"code": -2011, "msg": "Unknown order sent."}
+    assert exchange.get_orders("BTCUSDT") == []
+
+
+def test_duplicate_client_order_id_is_rejected_while_open():
+    exchange = make_exchange()
+    exchange.update_price("BTCUSDT", 100.0)
+    order = {"symbol": "BTCUSDT", "side": "SELL", "type": "STOP_MARKET", "quantity": "0.01",
+             "stopPrice": "90", "reduceOnly": "true", "newClientOrderId": "tb-test"}
+
+    first, second = exchange.new_batch_order([order, order])
+
+    assert first["clientOrderId"] == "tb-test"
+    assert second["code"] == -4116
+    assert len(exchange.get_orders("BTCUSDT")) == 1
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.app.services.response_cache import ResponseCache
+
+
+def test_cancelled_leader_does_not_strand_followers():
+    async def scenario():
+        cache = ResponseCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value", float("inf")
+
+        leader = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await asyncio.wait_for(follower, 1) == "value"
+        assert leader.cancelled()
+        assert len(calls) == 1
+        # Hesaplama tamamlandığı için sonuç önbellekte
+        assert await cache.get_or_compute("key", compute) == "value"
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["inflight"] == 0
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 1, 1)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache = ResponseCache()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("exchange down")
+
+        results = await asyncio.gather(cache.get_or_compute("key", failing),
+                                       cache.get_or_compute("key", failing), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def compute():
+            return 42, float("inf")
+
+        assert await cache.get_or_compute("key", compute) == 42
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["errors"] == 1
+
+
+def test_cancelled_sole_caller_keeps_computation_running():
+    async def scenario():
+        cache = ResponseCache()
+
+        async def slow():
+            await asyncio.sleep(10)
+            return 1, float("inf")
+
+        task = asyncio.create_task(cache.get_or_compute("key", slow))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Ayrı görev sürüyor; yeni istek aynı hesaplamaya katılır
+        assert cache.stats()["inflight"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from src.app.services import strategy_scheduler as scheduler_module
+from src.app.services.strategy_scheduler import StrategyScheduler
+
+
+class FakeBot:
+    def __init__(self, symbol, atr_multiplier=2.5, client=None, entry_filter=None):
+        self.symbol = symbol
+        self.atr_multiplier = atr_multiplier
+        self.entry_filter = entry_filter
+        self.position = None
+        self.entry_price = None
+        self.calls = []
+
+    async def evaluate(self, interval="1h", period=14):
+        self.calls.append((interval, time.time()))
+        return {"interval": interval}
+
+
+@pytest.fixture(autouse=True)
+def fake_bot(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "TradingBot", FakeBot)
+
+
+def test_symbols_are_normalized_to_one_bot():
+    async def run():
+        scheduler = StrategyScheduler(close_delay=60)
+        first = scheduler.add(None, "btcusdt", "1h", atr_multiplier=2.0)
+        second = scheduler.add(None, "BTCUSDT", "1h", atr_multiplier=3.0)
+        status = scheduler.status()
+        removed = await scheduler.remove("btcUSDT")
+        await scheduler.stop()
+        return first, second, status, removed
+
+    first, second, status, removed = asyncio.run(run())
+    assert first is second
+    assert first.bot.symbol == "BTCUSDT"
+    assert first.bot.atr_multiplier == 3.0
+    assert len(status["bots"]) == 1
+    assert removed == 1
+
+
+def test_one_timer_per_interval():
+    async def run():
+        scheduler = StrategyScheduler(close_delay=60)
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+            scheduler.add(None, symbol, "1h")
+        timers_one = dict(scheduler._timers)
+        scheduler.add(None, "BTCUSDT", "15m")
+        timers_two = dict(scheduler._timers)
+        await scheduler.remove(interval="1h")
+        remaining = set(scheduler._timers)
+        cancelled = timers_one["1h"].cancelled()
+        await scheduler.stop()
+        return timers_one, timers_two, remaining, cancelled
+
+    timers_one, timers_two, remaining, cancelled = asyncio.run(run())
+    assert set(timers_one) == {"1h"}
+    assert set(timers_two) == {"1h", "15m"}
+    assert timers_two["1h"] is timers_one["1h"]
+    assert remaining == {"15m"}
+    assert cancelled
+
+
+def test_unsupported_interval_is_rejected():
+    scheduler = StrategyScheduler()
+    with pytest.raises(ValueError):
+        scheduler.add(None, "BTCUSDT", "7m")
+
+
+def test_evaluation_waits_for_close_delay(monkeypatch):
+    close_at = {}
+
+    def next_close(interval, now_ms):
+        # İlk kapanış hemen, sonrakiler testin dışında kalsın
+        close_at.setdefault(interval, now_ms + 50)
+        return close_at[interval] if now_ms < close_at[interval] else now_ms + 60_000
+
+    monkeypatch.setattr(scheduler_module, "next_candle_close", next_close)
+
+    async def run():
+        scheduler = StrategyScheduler(close_delay=0.15)
+        btc = scheduler.add(None, "BTCUSDT", "1m")
+        eth = scheduler.add(None, "ETHUSDT", "1m")
+        await asyncio.sleep(0.1)
+        early = btc.runs + eth.runs
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+        return btc, eth, early
+
+    btc, eth, early = asyncio.run(run())
+    assert early == 0
+    assert btc.runs == eth.runs == 1
+    for scheduled in (btc, eth):
+        _, called_at = scheduled.bot.calls[0]
+        assert called_at * 1000 >= close_at["1m"] + 150 - 5
+    assert btc.last_result == {"interval": "1m"}
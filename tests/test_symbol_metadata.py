@@ -0,0 +1,72 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from src.app.services.symbol_metadata import SymbolFilters, SymbolMetadataCache
+
+BTC_INFO = {
+    "symbol": "BTCUSDT",
+    "filters": [
+        {"filterType": "PRICE_FILTER", "minPrice": "0.10", "maxPrice": "1000000", "tickSize": "0.10"},
+        {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+        {"filterType": "MIN_NOTIONAL", "notional": "5"},
+    ],
+}
+
+
+@pytest.fixture
+def filters():
+    return SymbolFilters.from_exchange_info(BTC_INFO)
+
+
+@pytest.mark.parametrize("quantity, expected", [
+    (0.0129, "0.012"),
+    ("0.0120", "0.012"),
+    (1.9999, "1.999"),
+    (0.0009, "0.000"),
+])
+def test_round_quantity_rounds_down_to_step(filters, quantity, expected):
+    assert filters.round_quantity(quantity) == Decimal(expected)
+
+
+@pytest.mark.parametrize("price, expected", [
+    (100.04, "100.0"),
+    (100.05, "100.1"),
+    ("99.96", "100.0"),
+    (0.1 + 0.2, "0.3"),
+])
+def test_round_price_rounds_to_nearest_tick(filters, price, expected):
+    assert filters.round_price(price) == Decimal(expected)
+
+
+def test_validate_order_checks_min_qty_and_notional(filters):
+    filters.validate_order("0.001", "5000")
+
+    with pytest.raises(ValueError, match="min qty"):
+        filters.validate_order("0.0009", "100000")
+    with pytest.raises(ValueError, match="max qty"):
+        filters.validate_order("1001", "1")
+    with pytest.raises(ValueError, match="min notional"):
+        filters.validate_order("0.001", "4999")
+
+
+def test_unknown_symbol_does_not_refresh_on_every_call(client, fake_exchange):
+    cache = SymbolMetadataCache(ttl=3600, min_refresh_interval=60)
+
+    assert asyncio.run(cache.get_async(client, "BTCUSDT")).tick_size == Decimal("0.1")
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            asyncio.run(cache.get_async(client, "BTCUSTD"))
+
+    assert fake_exchange.requests["/fapi/v1/exchangeInfo"] == 1
+
+
+def test_unknown_symbol_refreshes_after_min_interval(client, fake_exchange):
+    cache = SymbolMetadataCache(ttl=3600, min_refresh_interval=0)
+    cache.get("BTCUSDT", client)
+
+    with pytest.raises(KeyError):
+        cache.get("NEWUSDT", client)
+
+    assert fake_exchange.requests["/fapi/v1/exchangeInfo"] == 2